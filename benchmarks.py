@@ -0,0 +1,620 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Benchmarks Module
+
+Name: Jeremiah Cooper
+
+This module generates large synthetic data files and times the data
+loading code on them, so changes to it can be compared.
+
+Run from the project directory:
+    python benchmarks.py                      (parser and memory checks)
+    python benchmarks.py suite [max_size]     (full suite, saved as JSON)
+    python benchmarks.py compare old.json new.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import platform
+import tempfile
+import tracemalloc
+import game_data
+import character_manager
+
+RESULTS_FILE = "benchmark_results.json"
+SUITE_SIZES = (1000, 10000, 100000, 1000000)
+
+WORDS = (
+    "ancient", "village", "forest", "dragon", "goblin", "orc", "treasure",
+    "sword", "shield", "cave", "mountain", "river", "king", "crystal",
+    "shadow", "fire", "storm", "temple", "hero", "curse", "bandit",
+    "defeat", "protect", "recover", "explore", "escort", "the", "a", "of",
+    "and", "near", "beyond", "hidden", "lost", "brave", "dark",
+)
+
+# ============================================================================
+# SAMPLE DATA
+# ============================================================================
+
+def make_quest_lines(index):
+    """
+    Build the lines of one quest record
+
+    Returns: List of strings, one per field
+    """
+    return [
+        f"QUEST_ID: quest_{index}",
+        f"TITLE: Quest Number {index}",
+        f"DESCRIPTION: Defeat {index % 10 + 1} monsters near the village",
+        f"REWARD_XP: {50 + index % 500}",
+        f"REWARD_GOLD: {25 + index % 250}",
+        f"REQUIRED_LEVEL: {1 + index % 20}",
+        "PREREQUISITE: NONE" if index == 0 else f"PREREQUISITE: quest_{index - 1}",
+    ]
+
+def make_description(rng, min_words=5, max_words=60):
+    """Build a random description sentence"""
+    words = [rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words))]
+    return " ".join(words).capitalize() + "."
+
+
+def generate_quests_file(path, count, seed=0):
+    """
+    Write a valid quests.txt with count quests
+
+    Required levels climb slowly with the quest index (with some spread),
+    and each quest's prerequisite is either NONE or an earlier quest whose
+    required level is not higher, so prerequisites always form a DAG
+    whose chains can actually be completed. About 1 in 10 quests is a new
+    chain root.
+
+    Returns: path
+    """
+    rng = random.Random(seed)
+    levels = []
+    with open(path, "w") as file:
+        for index in range(count):
+            base_level = 1 + index * 50 // max(count, 1)
+            level = max(1, base_level + rng.randint(-2, 2))
+
+            prerequisite = "NONE"
+            if index and rng.random() > 0.1:
+                # Look back a short way so chains stay local, like real content
+                candidate = rng.randint(max(0, index - 50), index - 1)
+                if levels[candidate] <= level:
+                    prerequisite = f"quest_{candidate}"
+            levels.append(level)
+
+            file.write(
+                f"QUEST_ID: quest_{index}\n"
+                f"TITLE: {make_description(rng, 2, 4)[:-1]}\n"
+                f"DESCRIPTION: {make_description(rng)}\n"
+                f"REWARD_XP: {level * rng.randint(20, 60)}\n"
+                f"REWARD_GOLD: {level * rng.randint(5, 30)}\n"
+                f"REQUIRED_LEVEL: {level}\n"
+                f"PREREQUISITE: {prerequisite}\n\n"
+            )
+    return path
+
+
+def generate_items_file(path, count, seed=0):
+    """
+    Write a valid items.txt with count items
+
+    Weapons raise strength or magic, armor raises max_health or magic and
+    consumables restore health or raise a stat, matching the shipped data.
+
+    Returns: path
+    """
+    rng = random.Random(seed)
+    effects = {
+        "weapon": ("strength", "magic"),
+        "armor": ("max_health", "magic"),
+        "consumable": ("health", "strength", "magic"),
+    }
+    with open(path, "w") as file:
+        for index in range(count):
+            item_type = rng.choice(game_data.VALID_ITEM_TYPES)
+            stat = rng.choice(effects[item_type])
+            value = rng.randint(1, 50)
+            file.write(
+                f"ITEM_ID: item_{index}\n"
+                f"NAME: {make_description(rng, 1, 3)[:-1]}\n"
+                f"TYPE: {item_type}\n"
+                f"EFFECT: {stat}:{value}\n"
+                f"COST: {value * rng.randint(5, 15)}\n"
+                f"DESCRIPTION: {make_description(rng)}\n\n"
+            )
+    return path
+
+
+def make_character(rng, index):
+    """Build a mid-game character with some items and quests"""
+    character = character_manager.create_character(
+        f"hero_{index}", rng.choice(("Warrior", "Mage", "Rogue", "Cleric"))
+    )
+    character["level"] = rng.randint(1, 50)
+    character["experience"] = rng.randint(0, character["level"] * 100)
+    character["gold"] = rng.randint(0, 100000)
+    character["inventory"] = [f"item_{rng.randint(0, 500)}" for _ in range(rng.randint(0, 20))]
+    character["active_quests"] = [f"quest_{rng.randint(0, 1000)}" for _ in range(rng.randint(0, 3))]
+    character["completed_quests"] = [f"quest_{rng.randint(0, 1000)}" for _ in range(rng.randint(0, 40))]
+    return character
+
+
+def read_blocks(path):
+    """Split a data file into lists of lines, one list per record"""
+    with open(path) as file:
+        return [block.split("\n") for block in file.read().split("\n\n") if block.strip()]
+
+# ============================================================================
+# BASELINES
+# ============================================================================
+
+def legacy_parse_quest_lines(lines):
+    """
+    The per-record loop load_quests used before the schema parser
+
+    Kept only as a baseline for benchmark_record_parser.
+    """
+    quest_data = {}
+    for line in lines:
+        if ":" not in line:
+            raise ValueError(f"Invalid line format: {line}")
+        key, value = line.split(":", 1)
+        key = key.strip().lower()
+        value = value.strip()
+        quest_data[key] = value
+
+    for num_field in ["reward_xp", "reward_gold", "required_level"]:
+        quest_data[num_field] = int(quest_data[num_field])
+
+    return quest_data
+
+def legacy_load_quests(filename):
+    """
+    The whole load_quests as it was before the schema parser: read the
+    file, split it into blocks and build one dict per quest
+
+    Kept only as a baseline for benchmark_load_quests.
+    """
+    with open(filename, "r") as file:
+        content = file.read()
+
+    quests = {}
+    for block in content.split("\n\n"):
+        block = block.strip()
+        if block:
+            quest_data = legacy_parse_quest_lines(block.split("\n"))
+            quests[quest_data["quest_id"]] = quest_data
+    return quests
+
+def legacy_create_character(name, character_class):
+    """
+    create_character as it was before class templates: a dict of classes
+    rebuilt on every call and a character dict built field by field
+
+    Kept only as a baseline for benchmark_character_creation.
+    """
+    valid_classes = {
+        "Warrior": {"health": 120, "strength": 15, "magic": 5},
+        "Mage": {"health": 80,  "strength": 8,  "magic": 20},
+        "Rogue": {"health": 90,  "strength": 12, "magic": 10},
+        "Cleric": {"health": 100, "strength": 10, "magic": 15}
+    }
+    if character_class not in valid_classes:
+        raise ValueError(f"'{character_class}' is not a valid class.")
+    base_stats = valid_classes[character_class]
+    return {
+        "name": name,
+        "class": character_class,
+        "level": 1,
+        "health": base_stats["health"],
+        "max_health": base_stats["health"],
+        "strength": base_stats["strength"],
+        "magic": base_stats["magic"],
+        "experience": 0,
+        "gold": 100,
+        "inventory": [],
+        "active_quests": [],
+        "completed_quests": []
+    }
+
+# ============================================================================
+# BENCHMARKS
+# ============================================================================
+
+def time_call(function, *args, repeat=1):
+    """
+    Run function(*args) repeat times
+
+    Returns: (fastest time in seconds, return value of the last run)
+    """
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, result
+
+
+def measure_memory(function, *args):
+    """
+    Run function(*args) with tracemalloc on
+
+    Returns: (bytes still allocated when it returns, return value)
+    """
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = function(*args)
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return after - before, result
+
+
+def benchmark_record_parser(record_count=100000, repeat=5):
+    """
+    Compare the compiled quest parser against the old parsing loop
+
+    Both parsers get the same pre-split lines, so only parsing is timed.
+    The best of repeat runs is used to keep noise out of the comparison.
+
+    Returns: Dictionary of records per second for 'legacy' and 'schema'
+    """
+    line_lists = [make_quest_lines(i) for i in range(record_count)]
+    blocks = [
+        [(line_number, None, line) for line_number, line in enumerate(lines, 1)]
+        for lines in line_lists
+    ]
+    parse_quest = game_data.compile_record_parser(
+        game_data.QUEST_SCHEMA, "quest", game_data.Quest
+    )
+
+    def run_legacy():
+        for lines in line_lists:
+            legacy_parse_quest_lines(lines)
+
+    def run_schema():
+        for block in blocks:
+            parse_quest(block)
+
+    legacy_seconds, _ = time_call(run_legacy, repeat=repeat)
+    schema_seconds, _ = time_call(run_schema, repeat=repeat)
+
+    return {
+        "legacy": record_count / legacy_seconds,
+        "schema": record_count / schema_seconds,
+    }
+
+def benchmark_load_quests(record_count=200000, repeat=5, seed=0):
+    """
+    Compare load_quests end to end against the old loader
+
+    Both read the same generated file from disk, so file reading, block
+    splitting and building the result dict are timed along with parsing.
+    The compiled cache is off, so every run parses the text.
+
+    Returns: Dictionary of quests loaded per second for 'legacy' and
+             'load_quests'
+    """
+    with tempfile.TemporaryDirectory() as workdir:
+        path = generate_quests_file(os.path.join(workdir, "quests.txt"), record_count, seed)
+        legacy_seconds, _ = time_call(legacy_load_quests, path, repeat=repeat)
+        load_seconds, _ = time_call(game_data.load_quests, path, False, repeat=repeat)
+
+    return {
+        "legacy": record_count / legacy_seconds,
+        "load_quests": record_count / load_seconds,
+    }
+
+def benchmark_record_memory(record_count=100000):
+    """
+    Compare memory per quest for plain dicts and Quest records
+
+    The input lines are built before tracing starts, so the numbers cover
+    the record objects plus the field values they keep alive.
+
+    Returns: Dictionary of bytes per record for 'dict' and 'record'
+    """
+    line_lists = [make_quest_lines(i) for i in range(record_count)]
+    blocks = [
+        [(line_number, None, line) for line_number, line in enumerate(lines, 1)]
+        for lines in line_lists
+    ]
+    parse_quest = game_data.compile_record_parser(
+        game_data.QUEST_SCHEMA, "quest", game_data.Quest
+    )
+
+    dict_bytes, dicts = measure_memory(
+        lambda: [legacy_parse_quest_lines(lines) for lines in line_lists]
+    )
+    del dicts
+    record_bytes, records = measure_memory(
+        lambda: [parse_quest(block) for block in blocks]
+    )
+    del records
+
+    return {
+        "dict": dict_bytes / record_count,
+        "record": record_bytes / record_count,
+    }
+
+def benchmark_characters(character_count=1000000, repeat=3):
+    """
+    Compare plain dict characters with Character objects
+
+    Memory covers the character objects and their lists; both versions
+    share the same name strings, built before tracing starts. Access
+    reads the level of every character, as c["level"], c.get("level")
+    and (Character only) c.level.
+
+    Returns: Dictionary per version with bytes per character and
+             reads/sec for each kind of access
+    """
+    names = [f"hero_{index}" for index in range(character_count)]
+
+    def make_dicts():
+        return [dict(character_manager.create_character(name, "Mage")) for name in names]
+
+    def make_characters():
+        return [character_manager.create_character(name, "Mage") for name in names]
+
+    def read_item(characters):
+        for character in characters:
+            character["level"]
+
+    def read_get(characters):
+        for character in characters:
+            character.get("level")
+
+    def read_attribute(characters):
+        for character in characters:
+            character.level
+
+    results = {}
+    for version, make, readers in (
+        ("dict", make_dicts, (read_item, read_get)),
+        ("Character", make_characters, (read_item, read_get, read_attribute)),
+    ):
+        memory, characters = measure_memory(make)
+        results[version] = {"bytes/character": memory / character_count}
+        for reader in readers:
+            seconds, _ = time_call(reader, characters, repeat=repeat)
+            results[version][reader.__name__.replace("read_", "") + " reads/sec"] = character_count / seconds
+        del characters
+    return results
+
+def benchmark_character_creation(character_count=1000000, repeat=3):
+    """
+    Compare ways of creating characters
+
+    Every version creates the same characters, cycling through the four
+    classes: the old dict-building create_character, the template-based
+    create_character called once per character, and create_characters
+    given all of them at once.
+
+    Returns: Dictionary of characters created per second for 'legacy',
+             'create_character' and 'create_characters'
+    """
+    classes = ("Warrior", "Mage", "Rogue", "Cleric")
+    specs = [(f"npc_{index}", classes[index % 4]) for index in range(character_count)]
+    create_character = character_manager.create_character
+
+    def run_legacy():
+        return [legacy_create_character(name, character_class) for name, character_class in specs]
+
+    def run_single():
+        return [create_character(name, character_class) for name, character_class in specs]
+
+    def run_bulk():
+        return character_manager.create_characters(specs)
+
+    results = {}
+    for version, run in (("legacy", run_legacy), ("create_character", run_single),
+                         ("create_characters", run_bulk)):
+        seconds, _ = time_call(run, repeat=repeat)
+        results[version] = character_count / seconds
+    return results
+
+def benchmark_save_formats(character_count=20000, seed=0):
+    """
+    Compare the text and binary character save formats
+
+    Each format saves and loads the same characters through the normal
+    save store, in its own temporary directory. Encoding and decoding are
+    also timed on their own, without any file I/O.
+
+    Returns: Dictionary per format with saves/sec, loads/sec, encodes/sec,
+             decodes/sec and bytes_on_disk
+    """
+    rng = random.Random(seed)
+    characters = [make_character(rng, index) for index in range(character_count)]
+    names = [character["name"] for character in characters]
+    states = [character_manager._save_state(character) for character in characters]
+    codecs = {
+        "text": (
+            character_manager._format_save_state,
+            lambda content: character_manager._parse_save_text(content.splitlines()),
+        ),
+        "binary": (
+            character_manager._encode_binary_save,
+            character_manager._decode_binary_save,
+        ),
+    }
+
+    results = {}
+    for save_format, (encode, decode) in codecs.items():
+        with tempfile.TemporaryDirectory() as save_directory:
+            store = character_manager.TextSaveStore(save_directory, save_format=save_format)
+            save_seconds, _ = time_call(lambda: [store.save(c) for c in characters])
+            load_seconds, _ = time_call(lambda: [store.load(name) for name in names])
+            bytes_on_disk = sum(os.path.getsize(store.path_for(name)) for name in names)
+            store.close()
+
+        encode_seconds, contents = time_call(lambda: [encode(state) for state in states], repeat=3)
+        decode_seconds, _ = time_call(lambda: [decode(content) for content in contents], repeat=3)
+        results[save_format] = {
+            "saves/sec": character_count / save_seconds,
+            "loads/sec": character_count / load_seconds,
+            "encodes/sec": character_count / encode_seconds,
+            "decodes/sec": character_count / decode_seconds,
+            "bytes_on_disk": bytes_on_disk,
+        }
+    return results
+
+def measure_operation(function, *args, record_count, peak_memory=True):
+    """
+    Time one operation and optionally measure its peak memory
+
+    The timed run has tracemalloc off because tracing slows Python down a
+    lot; the peak memory comes from a second, traced run.
+
+    Returns: Dictionary with seconds, records_per_sec and peak_bytes
+    """
+    seconds, _ = time_call(function, *args)
+    peak_bytes = None
+    if peak_memory:
+        tracemalloc.start()
+        try:
+            function(*args)
+            peak_bytes = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {
+        "seconds": seconds,
+        "records_per_sec": record_count / seconds if seconds else None,
+        "peak_bytes": peak_bytes,
+    }
+
+
+def run_suite(sizes=SUITE_SIZES, output=RESULTS_FILE, peak_memory=True, seed=0):
+    """
+    Time the game_data loaders, block parsers and validators at each size
+
+    Data files are generated in a temporary directory and loaded with the
+    cache off, so every size measures real parsing.
+
+    Args:
+        sizes: Record counts to test
+        output: JSON file to write the results to (None to skip saving)
+        peak_memory: Also measure peak memory with tracemalloc
+        seed: Seed for the data generator
+
+    Returns: The results dictionary that was saved
+    """
+    results = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": [],
+    }
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in sizes:
+            quests_path = generate_quests_file(os.path.join(workdir, "quests.txt"), size, seed)
+            items_path = generate_items_file(os.path.join(workdir, "items.txt"), size, seed)
+            quest_blocks = read_blocks(quests_path)
+            item_blocks = read_blocks(items_path)
+            quests = game_data.load_quests(quests_path, use_cache=False)
+            items = game_data.load_items(items_path, use_cache=False)
+
+            operations = {
+                "load_quests": lambda: game_data.load_quests(quests_path, use_cache=False),
+                "load_items": lambda: game_data.load_items(items_path, use_cache=False),
+                "parse_quest_block": lambda: [game_data.parse_quest_block(b) for b in quest_blocks],
+                "parse_item_block": lambda: [game_data.parse_item_block(b) for b in item_blocks],
+                "validate_quest_data": lambda: [game_data.validate_quest_data(q) for q in quests.values()],
+                "validate_item_data": lambda: [game_data.validate_item_data(i) for i in items.values()],
+                "validate_catalog_quests": lambda: game_data.validate_catalog(quests, "quest"),
+                "validate_catalog_items": lambda: game_data.validate_catalog(items, "item"),
+            }
+            for name, operation in operations.items():
+                run = measure_operation(operation, record_count=size, peak_memory=peak_memory)
+                run.update({"operation": name, "size": size})
+                results["runs"].append(run)
+                print(f"{name:25} {size:>9,} {run['records_per_sec']:>14,.0f} records/sec")
+
+            del quests, items, quest_blocks, item_blocks
+
+    if output:
+        with open(output, "w") as file:
+            json.dump(results, file, indent=2)
+    return results
+
+
+def compare_results(old_path, new_path):
+    """
+    Compare two saved suite results
+
+    Returns: List of (operation, size, new rate / old rate) for every run
+             that appears in both files
+    """
+    with open(old_path) as file:
+        old = {(run["operation"], run["size"]): run for run in json.load(file)["runs"]}
+    with open(new_path) as file:
+        new = json.load(file)["runs"]
+
+    ratios = []
+    for run in new:
+        key = (run["operation"], run["size"])
+        if key in old and old[key]["records_per_sec"] and run["records_per_sec"]:
+            ratios.append((key[0], key[1], run["records_per_sec"] / old[key]["records_per_sec"]))
+    return ratios
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def print_quick_checks():
+    """Print the record parser, memory per quest and save format comparisons"""
+    print("=== RECORD PARSER ===")
+    rates = benchmark_record_parser()
+    for name, rate in rates.items():
+        print(f"{name:10} {rate:12,.0f} records/sec")
+    print(f"speedup    {rates['schema'] / rates['legacy']:12.2f}x")
+
+    print("\n=== LOAD QUESTS ===")
+    rates = benchmark_load_quests()
+    for name, rate in rates.items():
+        print(f"{name:12} {rate:12,.0f} quests/sec")
+    print(f"speedup      {rates['load_quests'] / rates['legacy']:12.2f}x")
+
+    print("\n=== MEMORY PER QUEST ===")
+    sizes = benchmark_record_memory()
+    for name, size in sizes.items():
+        print(f"{name:10} {size:12,.0f} bytes")
+
+    print("\n=== CHARACTERS IN MEMORY ===")
+    for version, measures in benchmark_characters().items():
+        for measure, value in measures.items():
+            print(f"{version:10} {measure:18} {value:14,.0f}")
+
+    print("\n=== CHARACTER CREATION ===")
+    for version, rate in benchmark_character_creation().items():
+        print(f"{version:18} {rate:14,.0f} characters/sec")
+
+    print("\n=== CHARACTER SAVE FORMATS ===")
+    formats = benchmark_save_formats()
+    for measure in formats["text"]:
+        text, binary = formats["text"][measure], formats["binary"][measure]
+        print(f"{measure:14} text {text:14,.0f}  binary {binary:14,.0f}  ({binary / text:.2f}x)")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "suite":
+        max_size = int(sys.argv[2]) if len(sys.argv) > 2 else SUITE_SIZES[-1]
+        run_suite([size for size in SUITE_SIZES if size <= max_size])
+        print(f"Results saved to {RESULTS_FILE}")
+    elif len(sys.argv) > 3 and sys.argv[1] == "compare":
+        for operation, size, ratio in compare_results(sys.argv[2], sys.argv[3]):
+            print(f"{operation:25} {size:>9,} {ratio:8.2f}x")
+    else:
+        print_quick_checks()
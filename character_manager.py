@@ -19,7 +19,23 @@ This module handles character creation, loading, and saving.
 """
 
 import os
+import math
+import time
+import zlib
+import lzma
+import struct
+import hashlib
+import sqlite3
+import atexit
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
+from game_data import Record, load_classes
 from custom_exceptions import (
+    GameError,
+    MissingDataFileError,
     InvalidCharacterClassError,
     CharacterNotFoundError,
     SaveFileCorruptedError,
@@ -27,113 +43,2041 @@ from custom_exceptions import (
     CharacterDeadError
 )
 
+DEFAULT_SAVE_DIRECTORY = "data/save_games"
+
+# Character classes and their base stats. The built-in classes are used
+# when the classes file does not exist.
+CLASSES_FILE = "data/classes.txt"
+DEFAULT_CLASSES = {
+    "Warrior": {"health": 120, "strength": 15, "magic": 5},
+    "Mage": {"health": 80, "strength": 8, "magic": 20},
+    "Rogue": {"health": 90, "strength": 12, "magic": 10},
+    "Cleric": {"health": 100, "strength": 10, "magic": 15},
+}
+
+# Threads used by load_characters/save_characters. Saves are I/O bound,
+# so this can be well above the CPU count.
+SAVE_IO_WORKERS = 8
+
+# Default age (days since last save) at which archive_cold_saves packs a save
+COLD_AFTER_DAYS = 90
+
+# Default size (characters) and write-back interval (seconds) of the
+# cache enable_save_cache puts in front of a save store
+SAVE_CACHE_SIZE = 256
+SAVE_CACHE_FLUSH_SECONDS = 5.0
+
+# Errors load_characters/save_characters collect per character
+BULK_SAVE_ERRORS = (CharacterNotFoundError, InvalidSaveDataError, SaveFileCorruptedError, OSError)
+
 # ============================================================================
 # CHARACTER MANAGEMENT FUNCTIONS
 # ============================================================================
 
+class Character(Record):
+    """
+    One character, as returned by create_character and load_character
+
+    Stores the twelve saved fields in __slots__ instead of a per-character
+    dict (about half the memory), but behaves like the dictionary
+    characters used to be: c["level"], c.get("gold"), c.setdefault(...),
+    "name" in c, iteration and == against a dict all work, so the
+    inventory, quest and combat code is unchanged. Other keys (such as
+    equipped_weapon) go into the overflow dict. Code that owns a
+    character can also read fields as attributes (c.level), which is as
+    fast as a dict lookup; c["class"] is getattr(c, "class").
+    """
+
+    __slots__ = ("name", "class", "level", "health", "max_health", "strength", "magic",
+                 "experience", "gold", "inventory", "active_quests", "completed_quests")
+    _fields = __slots__
+    _field_set = frozenset(__slots__)
+
+    def __init__(self, name, character_class, level, health, max_health, strength, magic,
+                 experience=0, gold=100, inventory=None, active_quests=None, completed_quests=None):
+        self.name = name
+        setattr(self, "class", character_class)
+        self.level = level
+        self.health = health
+        self.max_health = max_health
+        self.strength = strength
+        self.magic = magic
+        self.experience = experience
+        self.gold = gold
+        self.inventory = [] if inventory is None else inventory
+        self.active_quests = [] if active_quests is None else active_quests
+        self.completed_quests = [] if completed_quests is None else completed_quests
+        self._extra = None
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a character from any mapping of field name -> value"""
+        if len(data) == len(cls._fields):
+            try:
+                return cls(*_character_values(data))
+            except KeyError:
+                pass
+        return super().from_dict(data)
+
+    # Characters never hold LazyText, so these skip Record's check for it
+    def __getitem__(self, key):
+        if key in self._field_set:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        if key in self._field_set:
+            return getattr(self, key, default)
+        if self._extra is not None:
+            return self._extra.get(key, default)
+        return default
+
+    def __contains__(self, key):
+        if key in self._field_set:
+            return hasattr(self, key)
+        return self._extra is not None and key in self._extra
+
+_character_values = itemgetter(*Character._fields)
+
+# Class name -> Character arguments after the name, for a new level 1
+# character of that class. Loaded on first use by _get_class_templates.
+_class_templates = None
+
+def load_class_templates(filename=CLASSES_FILE):
+    """
+    Load the character classes create_character uses
+    
+    Done automatically the first time a character is created; call it
+    again to pick up a changed classes file. DEFAULT_CLASSES is used if
+    the file does not exist.
+    
+    Returns: List of class names, in file order
+    Raises: InvalidDataFormatError if the classes file is malformed
+    """
+    global _class_templates
+    try:
+        classes = load_classes(filename)
+    except MissingDataFileError:
+        classes = DEFAULT_CLASSES
+    _class_templates = {
+        name: (name, 1, stats["health"], stats["health"], stats["strength"], stats["magic"], 0, 100)
+        for name, stats in classes.items()
+    }
+    return list(_class_templates)
+
+def list_character_classes():
+    """Names of the classes a character can be created with"""
+    return list(_get_class_templates())
+
+def _get_class_templates():
+    if _class_templates is None:
+        load_class_templates()
+    return _class_templates
+
 def create_character(name, character_class):
     """
     Create a new character with stats based on class
     
-    Valid classes: Warrior, Mage, Rogue, Cleric
+    Valid classes: those in the classes file (Warrior, Mage, Rogue and
+    Cleric by default)
     
-    Returns: Dictionary with character data including:
+    Returns: Character (a dictionary-like object) with:
             - name, class, level, health, max_health, strength, magic
             - experience, gold, inventory, active_quests, completed_quests
     
     Raises: InvalidCharacterClassError if class is not valid
     """
     
-    valid_classes = {
-        "Warrior": {"health": 120, "strength": 15, "magic": 5},
-        "Mage": {"health": 80,  "strength": 8,  "magic": 20},
-        "Rogue": {"health": 90,  "strength": 12, "magic": 10},
-        "Cleric": {"health": 100, "strength": 10, "magic": 15}
-    }
+    template = _get_class_templates().get(character_class)
     
     # Validate class
-    if character_class not in valid_classes:
+    if template is None:
         raise InvalidCharacterClassError(f"'{character_class}' is not a valid class.")
     
-    base_stats = valid_classes[character_class]
-    
-    character = {
-        "name": name,
-        "class": character_class,
-        "level": 1,
-        "health": base_stats["health"],
-        "max_health": base_stats["health"],
-        "strength": base_stats["strength"],
-        "magic": base_stats["magic"],
-        "experience": 0,
-        "gold": 100,
-        "inventory": [],
-        "active_quests": [],
-        "completed_quests": []
-    }
+    return Character(name, *template)
+
+def create_characters(specs):
+    """
+    Create many characters at once
     
-    return character
+    Args:
+        specs: Iterable of (name, character_class) pairs
+    
+    Returns: List of characters, in the order of specs
+    Raises: InvalidCharacterClassError if any class is not valid
+    """
+    templates = _get_class_templates()
+    try:
+        return [Character(name, *templates[character_class]) for name, character_class in specs]
+    except KeyError as e:
+        raise InvalidCharacterClassError(f"'{e.args[0]}' is not a valid class.") from None
 
-def save_character(character, save_directory="data/save_games"):
+def save_character(character, save_directory=DEFAULT_SAVE_DIRECTORY):
     """
     Save character to file
     
     Filename format: {character_name}_save.txt
+    (or a row in characters.db when the directory uses the sqlite backend)
     """
+    return get_save_store(save_directory).save(character)
 
-    os.makedirs(save_directory, exist_ok=True)
-
-    filename = f"{character['name']}_save.txt"
-    filepath = os.path.join(save_directory, filename)
-
-    # Convert list fields to comma-separated strings
-    inventory_str = ",".join(character.get("inventory", []))
-    active_q_str = ",".join(character.get("active_quests", []))
-    completed_q_str = ",".join(character.get("completed_quests", []))
-
-    # Prepare file content
-    content = (
-        f"NAME: {character['name']}\n"
-        f"CLASS: {character['class']}\n"
-        f"LEVEL: {character['level']}\n"
-        f"HEALTH: {character['health']}\n"
-        f"MAX_HEALTH: {character['max_health']}\n"
-        f"STRENGTH: {character['strength']}\n"
-        f"MAGIC: {character['magic']}\n"
-        f"EXPERIENCE: {character['experience']}\n"
-        f"GOLD: {character['gold']}\n"
-        f"INVENTORY: {inventory_str}\n"
-        f"ACTIVE_QUESTS: {active_q_str}\n"
-        f"COMPLETED_QUESTS: {completed_q_str}\n"
-    )
+def load_character(character_name, save_directory=DEFAULT_SAVE_DIRECTORY):
+    """
+    Load character from save file
+    
+    A save_character_async save of the character that is still queued is
+    written first, so the load sees it.
+    
+    Returns a character dictionary.
+    """
+    _async_writer.wait_for(character_name, save_directory)
+    return Character.from_dict(get_save_store(save_directory).load(character_name))
+
+def list_saved_characters(save_directory=DEFAULT_SAVE_DIRECTORY):
+    """
+    Get list of all saved character names
+    
+    Returns: List of character names (without _save.txt extension)
+    """
+    return get_save_store(save_directory).list_names()
+
+def delete_character(character_name, save_directory=DEFAULT_SAVE_DIRECTORY):
+    """
+    Delete a character's save file
+    
+    A save_character_async save of the character that is still queued is
+    dropped, so flush_saves() does not bring the character back.
+    
+    Returns: True if deleted successfully
+    Raises: CharacterNotFoundError if character doesn't exist
+    """
+    queued = _async_writer.discard(character_name, save_directory)
+    try:
+        return get_save_store(save_directory).delete(character_name)
+    except CharacterNotFoundError:
+        # Only the dropped save had it
+        if queued:
+            return True
+        raise
+
+def list_characters(save_directory=DEFAULT_SAVE_DIRECTORY, character_class=None,
+                    min_level=None, max_level=None, sort_by="name", descending=False):
+    """
+    List saved characters with their details, without opening save files
+    
+    Reads the save manifest that save_character and delete_character keep
+    up to date.
+    
+    Args:
+        character_class: Only list characters of this class
+        min_level, max_level: Only list characters in this level range
+        sort_by: One of name, class, level, gold, saved_at
+        descending: Sort from highest to lowest
+    
+    Returns: List of dictionaries with name, class, level, gold and
+             saved_at (seconds since the epoch)
+    Raises: ValueError if sort_by is not a manifest field
+    """
+    if sort_by not in MANIFEST_FIELDS:
+        raise ValueError(f"Cannot sort by '{sort_by}'")
+    entries = get_save_store(save_directory).manifest(character_class, min_level, max_level)
+    # Saves whose details could not be read go last
+    known = [entry for entry in entries if entry[sort_by] is not None]
+    known.sort(key=itemgetter(sort_by), reverse=descending)
+    return known + [entry for entry in entries if entry[sort_by] is None]
+
+def rebuild_manifest(save_directory=DEFAULT_SAVE_DIRECTORY):
+    """
+    Rebuild the save manifest from the save files themselves
+    
+    Use this when the manifest has drifted, e.g. after save files were
+    copied into the directory by hand.
+    
+    Returns: Number of characters in the rebuilt manifest
+    """
+    return get_save_store(save_directory).rebuild_manifest()
+
+def migrate_save_layout(layout="sharded", save_directory=DEFAULT_SAVE_DIRECTORY):
+    """
+    Move a text save directory to another layout, in place
+    
+    "sharded" spreads saves over ab/cd/ subdirectories named after a hash
+    of the character name, so no single directory holds hundreds of
+    thousands of files; "flat" moves them back. Saving and loading keep
+    working while the move runs.
+    
+    Returns: Number of characters moved
+    Raises: ValueError for an unknown layout or a non-text backend
+    """
+    return _text_store(save_directory, "directory layouts").migrate_layout(layout)
+
+def archive_cold_saves(max_age_days=COLD_AFTER_DAYS, codec="zlib",
+                       save_directory=DEFAULT_SAVE_DIRECTORY):
+    """
+    Compress saves that have not been written for a while into pack files
+    
+    Archived characters still show up in listings, and load_character
+    decompresses them and moves them back to normal save files, so
+    nothing else changes for callers. Meant to be run periodically.
+    
+    Args:
+        max_age_days: Archive saves last written more than this long ago
+        codec: "zlib" (faster) or "lzma" (smaller)
+    
+    Returns: Number of characters archived
+    Raises: ValueError for an unknown codec or a non-text backend
+    """
+    store = _text_store(save_directory, "a cold tier")
+    return store.archive_cold(max_age_days * 24 * 60 * 60, codec)
 
-    # Write the file
-    with open(filepath, "w") as file:
-        file.write(content)
+def load_characters(names, save_directory=DEFAULT_SAVE_DIRECTORY, max_workers=SAVE_IO_WORKERS):
+    """
+    Load many characters, overlapping their file I/O on a thread pool
+    
+    A character that cannot be loaded does not stop the batch; its error
+    is collected instead.
+    
+    Returns: (characters, errors) where characters is a list in the order
+             of names (None for the ones that failed) and errors maps each
+             failed name to its exception (CharacterNotFoundError,
+             InvalidSaveDataError, ...)
+    """
+    store = get_save_store(save_directory)
+    def load(name):
+        _async_writer.wait_for(name, save_directory)
+        return Character.from_dict(store.load(name))
+    return _run_bulk(load, names, names, max_workers)
+
+def save_characters(characters, save_directory=DEFAULT_SAVE_DIRECTORY, max_workers=SAVE_IO_WORKERS):
+    """
+    Save many characters, overlapping their file I/O on a thread pool
+    
+    Returns: (results, errors) where results is a list in the order of
+             characters (True, or None for the ones that failed) and errors
+             maps each failed character's name to its exception
+    """
+    store = get_save_store(save_directory)
+    names = [character.get("name") for character in characters]
+    return _run_bulk(store.save, characters, names, max_workers)
 
+def save_character_async(character, save_directory=DEFAULT_SAVE_DIRECTORY):
+    """
+    Save character in the background and return right away
+    
+    A copy of the character is taken now, so later changes are not part
+    of this save. If the same character is saved again before this save
+    is written, only the newer save is written. Call flush_saves() to wait
+    for the writes (e.g. before exiting).
+    
+    Returns: True once the save is queued
+    Raises: InvalidSaveDataError if required fields are missing
+    """
+    _async_writer.submit(character, save_directory)
     return True
-def load_character(character_name, save_directory="data/save_games"):
+
+def flush_saves(timeout=None):
     """
-    Load character from save file
+    Wait until every save_character_async save has been written
     
-    Returns a character dictionary.
+    Returns: Dictionary of character name -> exception for the saves that
+             failed since the last flush
+    Raises: TimeoutError if saves are still queued after timeout seconds
+    """
+    return _async_writer.flush(timeout)
+
+# ============================================================================
+# SAVE STORAGE
+# ============================================================================
+
+# Every character field, in save file order, as (field, file key, type)
+SAVE_FIELDS = (
+    ("name", "NAME", str),
+    ("class", "CLASS", str),
+    ("level", "LEVEL", int),
+    ("health", "HEALTH", int),
+    ("max_health", "MAX_HEALTH", int),
+    ("strength", "STRENGTH", int),
+    ("magic", "MAGIC", int),
+    ("experience", "EXPERIENCE", int),
+    ("gold", "GOLD", int),
+    ("inventory", "INVENTORY", list),
+    ("active_quests", "ACTIVE_QUESTS", list),
+    ("completed_quests", "COMPLETED_QUESTS", list),
+)
+SAVE_FIELD_NAMES = tuple(field for field, _, _ in SAVE_FIELDS)
+
+
+SAVE_DURABILITY = ("none", "fsync", "group")
+
+# Journal size (bytes) at which TextSaveStore folds it into the save file
+JOURNAL_COMPACT_BYTES = 4096
+
+# Ends every journal entry; a line without it was cut short by a crash
+JOURNAL_ENTRY_END = "\t#\n"
+
+# How TextSaveStore arranges save files: all in the save directory, or
+# spread over ab/cd/ subdirectories named after a hash of the character name
+SAVE_LAYOUTS = ("flat", "sharded")
+
+# Records the layout of a sharded save directory so every later run uses
+# it too (flat directories, the default, have no such file)
+SAVE_LAYOUT_NAME = "save_layout.txt"
+
+# Formats TextSaveStore can write; both are read back automatically
+SAVE_FORMATS = ("text", "binary")
+
+# Binary save format: one fixed header with the magic, version, float
+# flags, the seven numeric stats as 8-byte numbers and the lengths (in
+# characters) of five text sections, followed by the sections as one UTF-8
+# string: name, class, and the inventory/active_quests/completed_quests
+# id lists, each joined with NUL
+BINARY_SAVE_MAGIC = b"QCSAVE"
+BINARY_SAVE_VERSION = 1
+_BINARY_PREFIX = struct.Struct("<6sBB")
+_binary_headers = {}
+
+# Cold tier: compression codecs as (compress, decompress), the index
+# file, and how many saves are compressed together in one block (larger
+# blocks compress better; loading one save decompresses its whole block)
+COLD_CODECS = {
+    "zlib": (lambda data: zlib.compress(data, 9), zlib.decompress),
+    "lzma": (lzma.compress, lzma.decompress),
+}
+COLD_INDEX_NAME = "cold_index.txt"
+COLD_BLOCK_SAVES = 64
+
+# Save manifest file, the fields of its entries, and how many superseded
+# update lines it may collect before it is rewritten
+MANIFEST_NAME = "save_manifest.txt"
+MANIFEST_FIELDS = ("name", "class", "level", "gold", "saved_at")
+MANIFEST_SLACK_LINES = 1000
+
+
+class GroupCommit:
+    """
+    Lets concurrent saves share their rename and directory syncs
+
+    Each save fsyncs its own temp file first, so those syncs run in
+    parallel (the filesystem folds them into a few journal commits). It
+    then hands the file over and waits. The first save to arrive leads the
+    batch: once the previous batch is committed (and after an optional
+    extra window seconds), it fsyncs the shared logs the batch appended to
+    (such as the save manifest), renames the batch's files into place,
+    fsyncs each directory involved once and wakes the whole batch. Saves that
+    arrive while a batch is being committed join the next one, so batches
+    grow by themselves when syncs are slow and a fast disk pays no wait.
+    Only the batch's own files are touched, so a commit never waits on
+    unrelated I/O.
+    """
+
+    def __init__(self, window=0.0):
+        self.window = window
+        self._condition = threading.Condition()
+        self._batch = None
+        self._committing = False
+
+    def commit(self, temp_path, final_path):
+        """Move the synced temp_path to final_path durably; blocks until then"""
+        self._join("renames", (temp_path, final_path))
+
+    def sync_directory(self, path):
+        """Make a newly created file's directory entry durable; blocks until then"""
+        self._join("directories", os.path.dirname(path))
+
+    def sync_file(self, path):
+        """fsync a file many saves append to, once per batch; blocks until then"""
+        self._join("files", path)
+
+    def _join(self, kind, item):
+        with self._condition:
+            batch = self._batch
+            is_leader = batch is None
+            if is_leader:
+                batch = self._batch = {
+                    "renames": [], "files": [], "directories": [],
+                    "done": threading.Event(), "error": None,
+                }
+            batch[kind].append(item)
+            if is_leader:
+                # Others keep joining while the previous batch commits
+                while self._committing:
+                    self._condition.wait()
+
+        if is_leader:
+            if self.window:
+                time.sleep(self.window)
+            with self._condition:
+                self._batch = None
+                self._committing = True
+            try:
+                _replace_and_sync(batch["renames"], batch["files"], batch["directories"])
+            except OSError as e:
+                batch["error"] = e
+            finally:
+                with self._condition:
+                    self._committing = False
+                    self._condition.notify_all()
+                batch["done"].set()
+        else:
+            batch["done"].wait()
+
+        if batch["error"] is not None:
+            raise batch["error"]
+
+
+class TextSaveStore:
+    """
+    The original save format: one {name}_save.txt file per character
+
+    This is the default backend, so existing save directories keep working.
+    Saves are atomic: the file is written under a temporary name and then
+    renamed over the old one, so a crash mid-save leaves the previous save
+    intact instead of a truncated file.
+
+    durability controls when a save counts as done:
+    - "none": after the rename (the OS writes the data out later)
+    - "fsync": after the file and its directory are fsynced
+    - "group": like "fsync", but concurrent saves share their renames and
+      directory syncs through GroupCommit; commit_window adds an extra
+      wait (in seconds) for more saves to join each batch
+
+    With journal=True a save only appends the fields that changed since
+    the character was last saved or loaded to {name}_save.journal, one line
+    per save. Loading replays the journal over the save file, and once a
+    journal grows past compact_threshold bytes a background thread folds
+    it back into the save file.
+
+    Saves and deletes also keep a manifest (save_manifest.txt) with each
+    character's class, level, gold and save time, so characters can be
+    listed and filtered without opening their save files.
+
+    save_format="binary" writes new saves in the compact binary format
+    (see _encode_binary_save) instead of "KEY: value" lines. Loading
+    detects the format of each file, so a directory can hold both.
+
+    archive_cold moves saves that have not been written for a while into
+    compressed pack files (the cold tier). Loading an archived character
+    decompresses it and moves it back to a normal save file. Every move
+    between the tiers deletes the copy it came from, so the new copy is
+    always fsynced first, whatever durability says.
+
+    layout="sharded" spreads save files over hash subdirectories. The
+    layout in use is recorded in the directory (save_layout.txt), so a
+    store opened later without a layout keeps using it.
+    """
+
+    def __init__(self, save_directory, durability="none", commit_window=0.0,
+                 journal=False, compact_threshold=JOURNAL_COMPACT_BYTES, layout=None,
+                 save_format="text"):
+        if durability not in SAVE_DURABILITY:
+            raise ValueError(f"Unknown durability: {durability!r}")
+        if layout is not None and layout not in SAVE_LAYOUTS:
+            raise ValueError(f"Unknown save layout: {layout!r}")
+        if save_format not in SAVE_FORMATS:
+            raise ValueError(f"Unknown save format: {save_format!r}")
+        self.save_directory = save_directory
+        # The directory's own layout unless another one is asked for; that
+        # one is recorded by the first save
+        self._recorded_layout = _read_save_layout(save_directory)
+        self.layout = layout or self._recorded_layout
+        self.save_format = save_format
+        self.durability = durability
+        self._group_commit = GroupCommit(commit_window) if durability == "group" else None
+        self.journal = journal
+        self.compact_threshold = compact_threshold
+
+        # Field values as last written or read, by name, for diffing saves
+        self._saved_states = {}
+        self._name_locks = {}
+        self._lock = threading.Lock()
+        self._compactor = None
+        self._compacting = set()
+
+        # Save manifest: name -> {name, class, level, gold, saved_at}. The
+        # file is an append-only log of updates, loaded on first use.
+        self.manifest_path = os.path.join(save_directory, MANIFEST_NAME)
+        self._manifest = None
+        # Lines in the manifest file; None while the manifest only exists
+        # in memory (built by a read, written by the next save or delete)
+        self._manifest_lines = 0
+        # (inode, size) of the manifest file as far as it has been read, so
+        # lines another process added are picked up
+        self._manifest_file = None
+        self._manifest_lock = threading.Lock()
+
+        # Cold tier: name -> (pack, block offset, block length, start, end,
+        # codec, mtime), an append-only log like the manifest
+        self.cold_index_path = os.path.join(save_directory, COLD_INDEX_NAME)
+        self._cold = None
+        self._cold_pack_saves = {}
+        self._cold_lines = 0
+        self._cold_lock = threading.Lock()
+
+    def path_for(self, character_name, layout=None):
+        return os.path.join(self._directory_for(character_name, layout), f"{character_name}_save.txt")
+
+    def journal_path_for(self, character_name, layout=None):
+        return os.path.join(self._directory_for(character_name, layout), f"{character_name}_save.journal")
+
+    def migrate_layout(self, layout):
+        """
+        Switch to another layout, moving every save file in place
+
+        Saves keep working during the move: new saves go to the new layout
+        and reads fall back to the old one until a character is moved.
+
+        Returns: Number of characters moved
+        """
+        if layout not in SAVE_LAYOUTS:
+            raise ValueError(f"Unknown save layout: {layout!r}")
+        self.layout = layout
+        self._record_layout()
+        moved = 0
+        for name in self._scan_names():
+            with self._name_lock(name):
+                moved += self._relocate(name)
+
+        if layout == "flat" and os.path.isdir(self.save_directory):
+            # Remove the shard directories the move emptied
+            for entry in os.scandir(self.save_directory):
+                if entry.is_dir() and _is_shard_name(entry.name):
+                    for shard in os.scandir(entry.path):
+                        if shard.is_dir():
+                            _remove_directory_if_empty(shard.path)
+                    _remove_directory_if_empty(entry.path)
+        return moved
+
+    def save(self, character):
+        try:
+            state = _save_state(character)
+        except KeyError as e:
+            raise InvalidSaveDataError(f"Missing required field: {e}")
+        name = character["name"]
+        os.makedirs(self._directory_for(name), exist_ok=True)
+        if self.layout != self._recorded_layout:
+            self._record_layout()
+
+        with self._name_lock(name):
+            self._relocate(name)
+            previous = self._saved_states.get(name)
+            if self.journal and (previous is not None or os.path.exists(self.path_for(name))):
+                changed = [
+                    index for index, value in enumerate(state)
+                    if previous is None or value != previous[index]
+                ]
+                if changed:
+                    journal_size = self._append_journal(name, state, changed)
+                    if journal_size > self.compact_threshold:
+                        self._schedule_compaction(name)
+            elif os.path.exists(self.journal_path_for(name)):
+                # Journal the full state before replacing the save file, so
+                # a crash in between still replays to this state
+                self._append_journal(name, state, range(len(state)))
+                self._write_snapshot(name, state)
+            elif self._cold_entry(name) is not None:
+                # Replaces an archived copy, which may take its pack along
+                self._write_snapshot(name, state, keep_journal=True, durability=self._tier_durability())
+            else:
+                self._write_snapshot(name, state, keep_journal=True)
+
+            if self.journal:
+                self._saved_states[name] = state
+            # A new hot save replaces any archived copy
+            self._drop_cold(name)
+            self._update_manifest(name, _manifest_entry(character, time.time()))
+        return True
+
+    def load(self, character_name):
+        with self._name_lock(character_name):
+            character = self._load_unlocked(character_name, promote=True)
+            if self.journal:
+                self._saved_states[character_name] = _save_state(character)
+        return character
+
+    def list_names(self):
+        with self._manifest_lock:
+            return list(self._load_manifest())
+
+    def manifest(self, character_class=None, min_level=None, max_level=None):
+        with self._manifest_lock:
+            entries = list(self._load_manifest().values())
+        return [
+            dict(entry) for entry in entries
+            if _manifest_matches(entry, character_class, min_level, max_level)
+        ]
+
+    def rebuild_manifest(self):
+        with self._manifest_lock:
+            return len(self._rebuild_manifest_locked())
+
+    def _scan_names(self):
+        if not os.path.exists(self.save_directory):
+            return []
+
+        saved_characters = set()
+
+        # Flat saves, then the two levels of shard directories
+        directories = [self.save_directory]
+        for _ in range(2):
+            subdirectories = []
+            for directory in directories:
+                for entry in os.scandir(directory):
+                    if entry.name.endswith("_save.txt"):
+                        # Remove the suffix
+                        saved_characters.add(entry.name[:-len("_save.txt")])
+                    elif entry.is_dir() and _is_shard_name(entry.name):
+                        subdirectories.append(entry.path)
+            directories = subdirectories
+        for directory in directories:
+            for filename in os.listdir(directory):
+                if filename.endswith("_save.txt"):
+                    saved_characters.add(filename[:-len("_save.txt")])
+
+        return sorted(saved_characters)
+
+    def delete(self, character_name):
+        with self._name_lock(character_name):
+            # Check if file exists
+            layout = self._layout_of(character_name)
+            if layout is None:
+                if self._cold_entry(character_name) is not None:
+                    self._drop_cold(character_name)
+                else:
+                    with self._manifest_lock:
+                        listed = character_name in self._load_manifest()
+                    if not listed:
+                        raise CharacterNotFoundError(f"No save file found for '{character_name}'.")
+                    # Listed, but the save file is gone: only the entry goes
+            else:
+                # Try deleting file
+                os.remove(self.path_for(character_name, layout))
+                _remove_if_exists(self.journal_path_for(character_name, layout))
+                self._drop_cold(character_name)
+            self._saved_states.pop(character_name, None)
+            self._update_manifest(character_name, None)
+
+        return True
+
+    def close(self):
+        if self._compactor is not None:
+            self._compactor.shutdown(wait=True)
+            self._compactor = None
+
+    def version(self, character_name):
+        """Something that changes whenever the character's save changes"""
+        layout = self._layout_of(character_name)
+        if layout is None:
+            entry = self._cold_entry(character_name)
+            return None if entry is None else ("cold",) + entry
+        try:
+            stat = os.stat(self.path_for(character_name, layout))
+        except OSError:
+            return None
+        try:
+            journal = os.stat(self.journal_path_for(character_name, layout)).st_size
+        except OSError:
+            journal = None
+        return (stat.st_mtime_ns, stat.st_size, journal)
+
+    def compact(self, character_name):
+        """Fold a character's journal back into its save file"""
+        with self._name_lock(character_name):
+            self._compacting.discard(character_name)
+            self._relocate(character_name)
+            if os.path.exists(self.journal_path_for(character_name)):
+                state = _save_state(self._load_unlocked(character_name))
+                self._write_snapshot(character_name, state)
+
+    def _name_lock(self, character_name):
+        lock = self._name_locks.get(character_name)
+        if lock is None:
+            with self._lock:
+                lock = self._name_locks.setdefault(character_name, threading.Lock())
+        return lock
+
+    def _directory_for(self, character_name, layout=None):
+        if (layout or self.layout) == "flat":
+            return self.save_directory
+        digest = hashlib.blake2b(character_name.encode(), digest_size=2).hexdigest()
+        return os.path.join(self.save_directory, digest[:2], digest[2:])
+
+    def _record_layout(self):
+        path = os.path.join(self.save_directory, SAVE_LAYOUT_NAME)
+        if self.layout == "flat":
+            _remove_if_exists(path)
+        else:
+            os.makedirs(self.save_directory, exist_ok=True)
+            _write_atomic(path, self.layout + "\n", self.durability, self._group_commit)
+        self._recorded_layout = self.layout
+
+    def _layout_of(self, character_name):
+        # Where the character's save file is: the current layout, or the
+        # other one for characters not moved yet (None if neither)
+        for layout in sorted(SAVE_LAYOUTS, key=lambda layout: layout != self.layout):
+            if os.path.exists(self.path_for(character_name, layout)):
+                return layout
+        return None
+
+    def _relocate(self, character_name):
+        # Called with the name lock held. Moves a save (and its journal)
+        # left in the other layout to the current one.
+        layout = self._layout_of(character_name)
+        if layout is None or layout == self.layout:
+            return False
+        os.makedirs(self._directory_for(character_name), exist_ok=True)
+        old_journal = self.journal_path_for(character_name, layout)
+        if os.path.exists(old_journal):
+            os.replace(old_journal, self.journal_path_for(character_name))
+        os.replace(self.path_for(character_name, layout), self.path_for(character_name))
+        if layout == "sharded":
+            # Leave no empty ab/cd/ directories behind
+            shard = self._directory_for(character_name, layout)
+            _remove_directory_if_empty(shard)
+            _remove_directory_if_empty(os.path.dirname(shard))
+        return True
+
+    def _load_unlocked(self, character_name, promote=False):
+        # 1. Check if file exists (hot, or archived in the cold tier)
+        layout = self._layout_of(character_name)
+        if layout is None:
+            data = self._read_cold(character_name)
+            character = _decode_save_data(data)
+            if promote:
+                # Back to the hot tier, byte for byte, and on disk before
+                # the cold copy (maybe its whole pack) is dropped
+                os.makedirs(self._directory_for(character_name), exist_ok=True)
+                _write_atomic(self.path_for(character_name), data, self._tier_durability(),
+                              self._group_commit)
+                self._drop_cold(character_name)
+            return character
+        filepath = self.path_for(character_name, layout)
+
+        # 2. Try reading file
+        try:
+            with open(filepath, "rb") as file:
+                data = file.read()
+        except Exception as e:
+            raise SaveFileCorruptedError(f"Unable to read save file: {e}")
+
+        # 3. Parse file content, then replay the changes saved since
+        character = _decode_save_data(data)
+        for changes in _read_journal(self.journal_path_for(character_name, layout)):
+            character.update(changes)
+        return character
+
+    def archive_cold(self, max_age, codec="zlib"):
+        """
+        Move saves not written for max_age seconds into a cold pack file
+
+        Returns: Number of characters archived
+        """
+        if codec not in COLD_CODECS:
+            raise ValueError(f"Unknown compression codec: {codec!r}")
+        compress = COLD_CODECS[codec][0]
+        cutoff = time.time() - max_age
+
+        candidates = []
+        for name in self._scan_names():
+            layout = self._layout_of(name)
+            if layout is None:
+                continue
+            try:
+                mtime = max(
+                    os.path.getmtime(path)
+                    for path in (self.path_for(name, layout), self.journal_path_for(name, layout))
+                    if os.path.exists(path)
+                )
+            except (OSError, ValueError):
+                continue
+            if mtime < cutoff:
+                candidates.append(name)
+        if not candidates:
+            return 0
+
+        pack_name = f"cold_{time.time_ns()}.pack"
+        pack_path = os.path.join(self.save_directory, pack_name)
+        index_lines = []
+        archived = {}
+        with open(pack_path, "wb") as pack:
+            for first in range(0, len(candidates), COLD_BLOCK_SAVES):
+                block = []
+                block_entries = []
+                block_size = 0
+                for name in candidates[first:first + COLD_BLOCK_SAVES]:
+                    # Fold any journal in, so the pack holds the whole save
+                    self.compact(name)
+                    with self._name_lock(name):
+                        layout = self._layout_of(name)
+                        if layout is None:
+                            continue
+                        path = self.path_for(name, layout)
+                        try:
+                            with open(path, "rb") as file:
+                                data = file.read()
+                            stat = os.stat(path)
+                        except OSError:
+                            continue
+                    block.append(data)
+                    block_entries.append((name, block_size, block_size + len(data), stat.st_mtime))
+                    block_size += len(data)
+                    archived[name] = (path, stat.st_mtime_ns, stat.st_size)
+                if not block:
+                    continue
+
+                block_offset = pack.tell()
+                compressed = compress(b"".join(block))
+                pack.write(compressed)
+                for name, start, end, mtime in block_entries:
+                    index_lines.append("\t".join(
+                        ["+", name, pack_name, str(block_offset), str(len(compressed)),
+                         str(start), str(end), codec, str(mtime)]
+                    ) + "\n")
+            pack.flush()
+            os.fsync(pack.fileno())
+
+        if not archived:
+            os.remove(pack_path)
+            return 0
+        with self._cold_lock:
+            cold = self._load_cold_index()
+            _append_line(self.cold_index_path, "".join(index_lines), True)
+            for line in index_lines:
+                self._apply_cold_line(cold, line[:-1].split("\t"))
+            self._cold_lines += len(index_lines)
+        # The new pack (and maybe the index) must also be in the directory
+        _fsync_directory(self.save_directory)
+
+        # The pack and index are on disk, so the hot files can go, unless
+        # the character was saved again in the meantime (then the hot
+        # file is newer and the cold copy is dropped instead)
+        count = 0
+        for name, (path, mtime_ns, size) in archived.items():
+            with self._name_lock(name):
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    stat = None
+                if stat is not None and (stat.st_mtime_ns, stat.st_size) == (mtime_ns, size):
+                    os.remove(path)
+                    self._saved_states.pop(name, None)
+                    count += 1
+                else:
+                    self._drop_cold(name)
+        return count
+
+    def _load_cold_index(self):
+        # Called with _cold_lock held
+        if self._cold is None:
+            self._cold = {}
+            self._cold_pack_saves = {}
+            try:
+                with open(self.cold_index_path, "r") as file:
+                    lines = file.readlines()
+            except FileNotFoundError:
+                lines = []
+            except Exception as e:
+                raise SaveFileCorruptedError(f"Unable to read cold save index: {e}")
+            for line in lines:
+                if line.endswith("\n"):
+                    self._apply_cold_line(self._cold, line[:-1].split("\t"))
+            self._cold_lines = len(lines)
+        return self._cold
+
+    def _apply_cold_line(self, cold, parts):
+        # "+" adds (name, pack, block offset, block length, start, end,
+        # codec, mtime); "-" removes a name. Bad lines are skipped.
+        name = parts[1] if len(parts) > 1 else None
+        if parts[0] == "+" and len(parts) == 9 and parts[7] in COLD_CODECS:
+            try:
+                entry = (parts[2], int(parts[3]), int(parts[4]), int(parts[5]),
+                         int(parts[6]), parts[7], float(parts[8]))
+            except ValueError:
+                return
+            self._remove_cold_entry(cold, name)
+            cold[name] = entry
+            self._cold_pack_saves[entry[0]] = self._cold_pack_saves.get(entry[0], 0) + 1
+        elif parts[0] == "-" and len(parts) == 2:
+            self._remove_cold_entry(cold, name)
+
+    def _remove_cold_entry(self, cold, character_name):
+        entry = cold.pop(character_name, None)
+        if entry is not None:
+            self._cold_pack_saves[entry[0]] -= 1
+        return entry
+
+    def _cold_entry(self, character_name):
+        with self._cold_lock:
+            return self._load_cold_index().get(character_name)
+
+    def _read_cold(self, character_name):
+        entry = self._cold_entry(character_name)
+        if entry is None:
+            raise CharacterNotFoundError(f"No save file found for '{character_name}'.")
+        pack_name, block_offset, block_length, start, end, codec, _ = entry
+        try:
+            with open(os.path.join(self.save_directory, pack_name), "rb") as pack:
+                pack.seek(block_offset)
+                block = COLD_CODECS[codec][1](pack.read(block_length))
+        except Exception as e:
+            raise SaveFileCorruptedError(f"Unable to read cold save pack: {e}")
+        return block[start:end]
+
+    def _drop_cold(self, character_name):
+        # Forget the cold copy of a character; delete packs nothing uses.
+        # The index is synced first, so it never points into a deleted pack.
+        with self._cold_lock:
+            cold = self._load_cold_index()
+            entry = self._remove_cold_entry(cold, character_name)
+            if entry is None:
+                return
+            self._cold_lines += 1
+            if self._cold_lines > 2 * len(cold) + MANIFEST_SLACK_LINES:
+                lines = [
+                    "\t".join(["+", name] + [str(value) for value in cold_entry]) + "\n"
+                    for name, cold_entry in cold.items()
+                ]
+                _write_atomic(self.cold_index_path, "".join(lines), self._tier_durability(),
+                              self._group_commit)
+                self._cold_lines = len(lines)
+            else:
+                _append_line(self.cold_index_path, f"-\t{character_name}\n", True)
+            if self._cold_pack_saves[entry[0]] == 0:
+                del self._cold_pack_saves[entry[0]]
+                _remove_if_exists(os.path.join(self.save_directory, entry[0]))
+
+    def _tier_durability(self):
+        # Moves between the hot and cold tiers are always synced
+        return "fsync" if self.durability == "none" else self.durability
+
+    def _write_snapshot(self, character_name, state, keep_journal=False, durability=None):
+        if self.save_format == "binary":
+            content = _encode_binary_save(state)
+        else:
+            content = _format_save_state(state)
+        _write_atomic(self.path_for(character_name), content, durability or self.durability,
+                      self._group_commit)
+        # Every journal entry is now part of the save file; replaying them
+        # again (if the removal is lost in a crash) ends at the same state
+        if not keep_journal:
+            _remove_if_exists(self.journal_path_for(character_name))
+
+    def _append_journal(self, character_name, state, indexes):
+        entry = "\t".join(_format_save_field(index, state[index]) for index in indexes)
+        path = self.journal_path_for(character_name)
+        created = not os.path.exists(path)
+        size = _append_line(path, entry + JOURNAL_ENTRY_END, self.durability != "none")
+        if created and self.durability != "none":
+            # A new journal only survives a crash once its directory is synced
+            self._sync_directory_of(path)
+        return size
+
+    def _sync_directory_of(self, path):
+        if self._group_commit is not None:
+            self._group_commit.sync_directory(path)
+        else:
+            _fsync_directory(os.path.dirname(path))
+
+    def _load_manifest(self):
+        # Called with _manifest_lock held. Other processes may have added
+        # lines to the file or rewritten it since it was last read.
+        identity = _file_identity(self.manifest_path)
+        if self._manifest is not None and identity == self._manifest_file:
+            return self._manifest
+        if identity is None:
+            if not os.path.isdir(self.save_directory):
+                # Nothing saved yet; a read must not create the directory
+                return {}
+            if self._manifest is not None and self._manifest_file is None:
+                # Built in memory and not written yet
+                return self._manifest
+            # First use in this directory (or the file was removed): build
+            # it from the save files
+            return self._rebuild_manifest_locked(persist=False)
+
+        manifest, offset, line_count = {}, 0, 0
+        if (self._manifest is not None and self._manifest_file is not None
+                and identity[0] == self._manifest_file[0] and identity[1] > self._manifest_file[1]):
+            # Only appended to: apply just the new lines
+            manifest, offset, line_count = self._manifest, self._manifest_file[1], self._manifest_lines
+        try:
+            with open(self.manifest_path, "rb") as file:
+                inode = os.fstat(file.fileno()).st_ino
+                file.seek(offset)
+                data = file.read()
+            # A line still being written is read next time
+            data = data[:data.rfind(b"\n") + 1]
+            lines = data.decode("utf-8").split("\n")[:-1]
+        except FileNotFoundError:
+            self._manifest = self._manifest_file = None
+            return self._load_manifest()
+        except Exception as e:
+            raise SaveFileCorruptedError(f"Unable to read save manifest: {e}")
+
+        for line in lines:
+            _apply_manifest_line(manifest, line.split("\t"))
+        self._manifest = manifest
+        self._manifest_lines = line_count + len(lines)
+        self._manifest_file = (inode, offset + len(data))
+        return manifest
+
+    def _update_manifest(self, character_name, entry):
+        with self._manifest_lock:
+            manifest = self._load_manifest()
+            if entry is None:
+                manifest.pop(character_name, None)
+                line = f"-\t{character_name}\n"
+            else:
+                manifest[character_name] = entry
+                line = "\t".join(["+"] + [_format_manifest_value(entry[field]) for field in MANIFEST_FIELDS]) + "\n"
+
+            if not manifest:
+                # Last character deleted: leave no file behind
+                _remove_if_exists(self.manifest_path)
+                self._manifest_lines = None
+                self._manifest_file = None
+                return
+            if self._manifest_lines is None:
+                self._write_manifest()
+                return
+            self._manifest_lines += 1
+            if self._manifest_lines > 2 * len(manifest) + MANIFEST_SLACK_LINES:
+                self._write_manifest()
+                return
+            known = self._manifest_file
+            size = _append_line(self.manifest_path, line)
+            if known is not None and size == known[1] + len(line.encode()):
+                self._manifest_file = (known[0], size)
+            # Otherwise another process appended too; the next read picks
+            # its lines up (re-applying this one does no harm)
+
+        if self.durability != "none":
+            # Synced outside the lock, so concurrent saves sync it together
+            self._sync_shared_file(self.manifest_path)
+
+    def _sync_shared_file(self, path):
+        if self._group_commit is not None:
+            self._group_commit.sync_file(path)
+        else:
+            _fsync_file(path)
+
+    def _write_manifest(self):
+        # Called with _manifest_lock held; replaces the update log with one
+        # line per character
+        content = "".join(
+            "\t".join(["+"] + [_format_manifest_value(entry[field]) for field in MANIFEST_FIELDS]) + "\n"
+            for entry in self._manifest.values()
+        ).encode()
+        os.makedirs(self.save_directory, exist_ok=True)
+        _write_atomic(self.manifest_path, content, self.durability, self._group_commit)
+        self._manifest_lines = len(self._manifest)
+        # Anything another process appends after the rename is read later
+        self._manifest_file = (os.stat(self.manifest_path).st_ino, len(content))
+
+    def _rebuild_manifest_locked(self, persist=True):
+        with self._cold_lock:
+            cold = dict(self._load_cold_index())
+        names = sorted(set(self._scan_names()) | cold.keys())
+        characters, _ = _run_bulk(self._load_unlocked, names, names, SAVE_IO_WORKERS)
+        manifest = {}
+        for name, character in zip(names, characters):
+            layout = self._layout_of(name)
+            if layout is None and name in cold:
+                saved_at = cold[name][-1]
+            else:
+                try:
+                    saved_at = os.path.getmtime(self.path_for(name, layout))
+                except (OSError, TypeError):
+                    continue
+            # Saves that cannot be read are still listed, without details
+            manifest[name] = _manifest_entry(character or {"name": name}, saved_at)
+        self._manifest = manifest
+        if persist:
+            self._write_manifest()
+        else:
+            self._manifest_lines = None
+            self._manifest_file = None
+        return manifest
+
+    def _schedule_compaction(self, character_name):
+        with self._lock:
+            if character_name in self._compacting:
+                return
+            self._compacting.add(character_name)
+            if self._compactor is None:
+                self._compactor = ThreadPoolExecutor(max_workers=1)
+            self._compactor.submit(self.compact, character_name)
+
+
+class SQLiteSaveStore:
+    """
+    All characters of a save directory in one SQLite database
+
+    Meant for directories holding far more characters than one file each
+    can handle: names are the table's primary key (an index lookup instead
+    of a directory scan), the database runs in WAL mode so reads do not
+    wait on writes, and every query is a fixed SQL string with parameters,
+    which sqlite3 prepares once and then reuses from its statement cache.
+    """
+
+    DATABASE_NAME = "characters.db"
+    COLUMNS = tuple(field for field, _, _ in SAVE_FIELDS)
+
+    def __init__(self, save_directory):
+        self.save_directory = save_directory
+        self.path = os.path.join(save_directory, self.DATABASE_NAME)
+        self._lock = threading.Lock()
+        os.makedirs(save_directory, exist_ok=True)
+        try:
+            # Shared between threads, so every use goes through _lock
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS characters ("
+                "name TEXT PRIMARY KEY, class TEXT, level INTEGER, health INTEGER, "
+                "max_health INTEGER, strength INTEGER, magic INTEGER, "
+                "experience INTEGER, gold INTEGER, inventory TEXT, "
+                "active_quests TEXT, completed_quests TEXT, saved_at REAL) WITHOUT ROWID"
+            )
+            columns = {row[1] for row in self._connection.execute("PRAGMA table_info(characters)")}
+            if "saved_at" not in columns:
+                self._connection.execute("ALTER TABLE characters ADD COLUMN saved_at REAL")
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS characters_by_class_level ON characters (class, level)"
+            )
+            self._connection.commit()
+        except sqlite3.DatabaseError as e:
+            raise SaveFileCorruptedError(f"Unable to open save database: {e}")
+
+        columns = ", ".join(f'"{column}"' for column in self.COLUMNS)
+        placeholders = ", ".join("?" for _ in self.COLUMNS)
+        self._save_sql = (
+            f"INSERT OR REPLACE INTO characters ({columns}, saved_at) VALUES ({placeholders}, ?)"
+        )
+        self._load_sql = f"SELECT {columns} FROM characters WHERE name = ?"
+
+    def _row_for(self, character):
+        try:
+            return tuple(
+                ",".join(character.get(field, [])) if field_type is list else character[field]
+                for field, _, field_type in SAVE_FIELDS
+            ) + (time.time(),)
+        except KeyError as e:
+            raise InvalidSaveDataError(f"Missing required field: {e}")
+
+    def save(self, character):
+        row = self._row_for(character)
+        with self._lock:
+            try:
+                with self._connection:
+                    self._connection.execute(self._save_sql, row)
+            except sqlite3.DatabaseError as e:
+                raise SaveFileCorruptedError(f"Unable to write save database: {e}")
+        return True
+
+    def load(self, character_name):
+        with self._lock:
+            try:
+                row = self._connection.execute(self._load_sql, (character_name,)).fetchone()
+            except sqlite3.DatabaseError as e:
+                raise SaveFileCorruptedError(f"Unable to read save database: {e}")
+        if row is None:
+            raise CharacterNotFoundError(f"No save file found for '{character_name}'.")
+
+        character = {}
+        for (field, _, field_type), value in zip(SAVE_FIELDS, row):
+            if field_type is list:
+                value = value.split(",") if value else []
+            character[field] = value
+        return character
+
+    def list_names(self):
+        with self._lock:
+            return [name for name, in self._connection.execute("SELECT name FROM characters")]
+
+    def manifest(self, character_class=None, min_level=None, max_level=None):
+        # The class/level filters run on the characters_by_class_level index
+        conditions = []
+        parameters = []
+        for condition, value in (("class = ?", character_class), ("level >= ?", min_level),
+                                 ("level <= ?", max_level)):
+            if value is not None:
+                conditions.append(condition)
+                parameters.append(value)
+        sql = 'SELECT name, class, level, gold, saved_at FROM characters'
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        with self._lock:
+            rows = self._connection.execute(sql, parameters).fetchall()
+        return [dict(zip(MANIFEST_FIELDS, row)) for row in rows]
+
+    def version(self, character_name):
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT saved_at FROM characters WHERE name = ?", (character_name,)
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def rebuild_manifest(self):
+        # The table is the manifest; there is nothing to drift
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM characters").fetchone()[0]
+
+    def delete(self, character_name):
+        with self._lock:
+            with self._connection:
+                cursor = self._connection.execute(
+                    "DELETE FROM characters WHERE name = ?", (character_name,)
+                )
+        if cursor.rowcount == 0:
+            raise CharacterNotFoundError(f"No save file found for '{character_name}'.")
+        return True
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class CachedSaveStore:
+    """
+    Size-bounded LRU cache of characters in front of another save store
+
+    Loads are served from memory while the save underneath is unchanged
+    (checked with the store's version(), i.e. the file's mtime and size
+    for text saves). Saves only update the cache; the character is written
+    to the store later: when it is evicted, every flush_interval seconds,
+    on flush(), or on close(). hits, misses, evictions and writes are
+    counted for sizing the cache (see stats()).
+
+    Callers get copies, so changing a loaded character does not change
+    the cached one until it is saved. Like the store, the cache keeps only
+    the saved fields (not e.g. equipped_weapon).
+    """
+
+    def __init__(self, store, capacity=SAVE_CACHE_SIZE, flush_interval=SAVE_CACHE_FLUSH_SECONDS):
+        self.store = store
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.writes = 0
+
+        # name -> {"character", "version", "dirty", "generation"}
+        self._entries = OrderedDict()
+        self._generation = 0
+        self._deleted = {}
+        self._lock = threading.Lock()
+        # Write-backs run one at a time so an older copy of a character
+        # can never be written after a newer one
+        self._write_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._flusher = None
+        if flush_interval:
+            self._flusher = threading.Thread(target=self._flush_periodically, daemon=True)
+            self._flusher.start()
+
+    def load(self, character_name):
+        with self._lock:
+            entry = self._entries.get(character_name)
+            if entry is not None and entry["dirty"]:
+                # Newer than anything on disk
+                self._entries.move_to_end(character_name)
+                self.hits += 1
+                return _copy_character(entry["character"])
+
+        version = self.store.version(character_name)
+        with self._lock:
+            entry = self._entries.get(character_name)
+            if entry is not None and (entry["dirty"] or entry["version"] == version):
+                self._entries.move_to_end(character_name)
+                self.hits += 1
+                return _copy_character(entry["character"])
+            self.misses += 1
+            seen_generation = self._generation
+
+        character = self.store.load(character_name)
+        self._put(character_name, _copy_character(character), self.store.version(character_name), False,
+                  seen_generation)
+        return character
+
+    def save(self, character):
+        # Reject incomplete characters now rather than at write-back
+        try:
+            state = _save_state(character)
+        except KeyError as e:
+            raise InvalidSaveDataError(f"Missing required field: {e}")
+        # Only what the store would write, so a cached load matches a disk load
+        self._put(character["name"], _character_from_state(state), None, True)
+        return True
+
+    def delete(self, character_name):
+        with self._write_lock:
+            with self._lock:
+                entry = self._entries.pop(character_name, None)
+                # Write-backs of copies from before this point are dropped
+                self._generation += 1
+                self._deleted[character_name] = self._generation
+            try:
+                return self.store.delete(character_name)
+            except CharacterNotFoundError:
+                # Saved, but never written out before being deleted
+                if entry is not None and entry["dirty"]:
+                    return True
+                raise
+
+    def list_names(self):
+        self.flush()
+        return self.store.list_names()
+
+    def manifest(self, character_class=None, min_level=None, max_level=None):
+        self.flush()
+        return self.store.manifest(character_class, min_level, max_level)
+
+    def rebuild_manifest(self):
+        self.flush()
+        return self.store.rebuild_manifest()
+
+    def version(self, character_name):
+        return self.store.version(character_name)
+
+    def stats(self):
+        """Counters for sizing the cache"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "writes": self.writes,
+                "size": len(self._entries),
+                "dirty": sum(entry["dirty"] for entry in self._entries.values()),
+            }
+
+    def flush(self):
+        """Write every saved-but-unwritten character to the store"""
+        with self._lock:
+            pending = [
+                (name, entry["character"], entry["generation"])
+                for name, entry in self._entries.items() if entry["dirty"]
+            ]
+        for name, character, generation in pending:
+            self._write_back(name, character, generation)
+
+    def close(self):
+        self._stopped.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        self.flush()
+        self.store.close()
+
+    def _put(self, character_name, character, version, dirty, seen_generation=None):
+        # seen_generation is set for copies read from the store: such a copy
+        # is not cached if the character was saved or deleted since the read
+        evicted = []
+        with self._lock:
+            if seen_generation is not None:
+                entry = self._entries.get(character_name)
+                if entry is not None and (entry["dirty"] or entry["generation"] > seen_generation):
+                    return
+                if self._deleted.get(character_name, 0) > seen_generation:
+                    return
+            self._generation += 1
+            self._entries[character_name] = {
+                "character": character, "version": version,
+                "dirty": dirty, "generation": self._generation,
+            }
+            self._entries.move_to_end(character_name)
+            while len(self._entries) > self.capacity:
+                name, entry = self._entries.popitem(last=False)
+                self.evictions += 1
+                if entry["dirty"]:
+                    evicted.append((name, entry["character"], entry["generation"]))
+        for name, evicted_character, generation in evicted:
+            self._write_back(name, evicted_character, generation)
+
+    def _write_back(self, character_name, character, generation):
+        with self._write_lock:
+            with self._lock:
+                entry = self._entries.get(character_name)
+                if entry is not None and entry["generation"] != generation:
+                    # A newer copy is cached and will be written instead
+                    return
+                if generation < self._deleted.get(character_name, 0):
+                    return
+            self.store.save(character)
+            version = self.store.version(character_name)
+            with self._lock:
+                self.writes += 1
+                entry = self._entries.get(character_name)
+                if entry is not None and entry["generation"] == generation:
+                    entry["dirty"] = False
+                    entry["version"] = version
+
+    def _flush_periodically(self):
+        while not self._stopped.wait(self.flush_interval):
+            try:
+                self.flush()
+            except (GameError, OSError):
+                # Still dirty; the next flush or close() tries again
+                pass
+
+
+class AsyncSaveWriter:
+    """
+    Background thread that writes the saves handed to save_character_async
+
+    submit() only copies the character and queues the copy, so the caller
+    never waits on the disk. Queued saves are keyed by save directory and
+    character name: saving a character again before its last save was
+    written replaces the queued copy, so only the newest one is written.
+    The thread writes each batch one save at a time with the store's
+    save(), without a thread pool: close_save_stores runs at interpreter
+    exit, when concurrent.futures no longer accepts new work.
+    """
+
+    def __init__(self):
+        self.submitted = 0
+        self.written = 0
+        self.discarded = 0
+        # (absolute directory, name) -> (save_directory, character copy)
+        self._pending = {}
+        # The batch the thread is writing, keyed the same way
+        self._writing = {}
+        self._errors = {}
+        self._condition = threading.Condition()
+        self._thread = None
+
+    @property
+    def coalesced(self):
+        """Saves replaced by a newer save of the same character before being written"""
+        with self._condition:
+            return (self.submitted - self.written - self.discarded
+                    - len(self._pending) - len(self._writing))
+
+    def submit(self, character, save_directory=DEFAULT_SAVE_DIRECTORY):
+        try:
+            _save_state(character)
+        except KeyError as e:
+            raise InvalidSaveDataError(f"Missing required field: {e}")
+        snapshot = _copy_character(character)
+        key = (os.path.abspath(save_directory), snapshot["name"])
+        with self._condition:
+            self.submitted += 1
+            self._pending[key] = (save_directory, snapshot)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+
+    def wait_for(self, character_name, save_directory=DEFAULT_SAVE_DIRECTORY):
+        """Wait until the queued save of character_name, if any, is written"""
+        key = (os.path.abspath(save_directory), character_name)
+        with self._condition:
+            self._condition.wait_for(lambda: key not in self._pending and key not in self._writing)
+
+    def discard(self, character_name, save_directory=DEFAULT_SAVE_DIRECTORY):
+        """
+        Drop the queued save of character_name
+
+        A save of it the thread has already started is waited for instead.
+
+        Returns: True if a queued save was dropped
+        """
+        key = (os.path.abspath(save_directory), character_name)
+        with self._condition:
+            dropped = self._pending.pop(key, None) is not None
+            if dropped:
+                self.discarded += 1
+            self._condition.wait_for(lambda: key not in self._writing)
+        return dropped
+
+    def flush(self, timeout=None):
+        """
+        Wait until every queued save is written
+
+        Returns: Dictionary of character name -> exception for the saves
+                 that failed since the last flush
+        Raises: TimeoutError if saves are still queued after timeout seconds
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: not self._pending and not self._writing, timeout):
+                raise TimeoutError("Saves are still being written.")
+            errors, self._errors = self._errors, {}
+        return errors
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending)
+                batch, self._pending = self._pending, {}
+                self._writing = batch
+
+            errors = {}
+            for save_directory, snapshot in batch.values():
+                try:
+                    get_save_store(save_directory).save(snapshot)
+                except Exception as e:
+                    errors[snapshot["name"]] = e
+
+            with self._condition:
+                self._errors.update(errors)
+                self.written += len(batch)
+                self._writing = {}
+                self._condition.notify_all()
+
+
+SAVE_BACKENDS = {
+    "text": TextSaveStore,
+    "sqlite": SQLiteSaveStore,
+}
+
+# Open stores by absolute save directory path
+_save_stores = {}
+_save_stores_lock = threading.Lock()
+
+
+def get_save_store(save_directory=DEFAULT_SAVE_DIRECTORY):
+    """
+    Get the store that holds the saves in save_directory
+
+    Directories use the text backend unless set_save_backend chose another.
+    The choice carries over to later runs: a directory holding
+    characters.db opens with the sqlite backend, and a text directory
+    keeps the layout it was saved or migrated with.
+    """
+    key = os.path.abspath(save_directory)
+    store = _save_stores.get(key)
+    if store is None:
+        with _save_stores_lock:
+            store = _save_stores.get(key)
+            if store is None:
+                if os.path.exists(os.path.join(save_directory, SQLiteSaveStore.DATABASE_NAME)):
+                    store = SQLiteSaveStore(save_directory)
+                else:
+                    store = TextSaveStore(save_directory)
+                _save_stores[key] = store
+    return store
+
+def set_save_backend(backend, save_directory=DEFAULT_SAVE_DIRECTORY, **options):
+    """
+    Choose how the characters in save_directory are stored
+
+    Args:
+        backend: A name from SAVE_BACKENDS ("text" or "sqlite")
+        save_directory: Directory the backend keeps its files in
+        **options: Backend settings, e.g. durability="group" for "text"
+
+    Returns: The new store
+    Raises: ValueError if backend is not a known backend name
+    """
+    if backend not in SAVE_BACKENDS:
+        raise ValueError(f"Unknown save backend: {backend!r}")
+    store = SAVE_BACKENDS[backend](save_directory, **options)
+    key = os.path.abspath(save_directory)
+    with _save_stores_lock:
+        old_store = _save_stores.pop(key, None)
+        if old_store is not None:
+            old_store.close()
+        _save_stores[key] = store
+    return store
+
+def enable_save_cache(save_directory=DEFAULT_SAVE_DIRECTORY, capacity=SAVE_CACHE_SIZE,
+                      flush_interval=SAVE_CACHE_FLUSH_SECONDS):
+    """
+    Put a write-back LRU cache (CachedSaveStore) in front of a save store
+
+    Saved characters are written out on eviction, every flush_interval
+    seconds (0 to turn that off), and by close_save_stores(), which also
+    runs when the interpreter exits.
+
+    Returns: The cache
     """
+    key = os.path.abspath(save_directory)
+    store = get_save_store(save_directory)
+    with _save_stores_lock:
+        if isinstance(store, CachedSaveStore):
+            store.capacity = capacity
+            return store
+        cache = _save_stores[key] = CachedSaveStore(store, capacity, flush_interval)
+    return cache
+
+def get_save_cache_stats(save_directory=DEFAULT_SAVE_DIRECTORY):
+    """
+    Get the hit/miss/eviction/write counters of a directory's save cache
+
+    Returns: Dictionary of counters, or None if the cache is not enabled
+    """
+    store = get_save_store(save_directory)
+    if isinstance(store, CachedSaveStore):
+        return store.stats()
+    return None
+
+_async_writer = AsyncSaveWriter()
+
+def close_save_stores():
+    """
+    Close every open save store, writing out queued and cached saves (call on shutdown)
+    
+    Raises: GameError naming the characters whose queued saves could not be
+            written (the stores are still closed)
+    """
+    errors = _async_writer.flush()
+    with _save_stores_lock:
+        for store in _save_stores.values():
+            store.close()
+        _save_stores.clear()
+    if errors:
+        names = ", ".join(sorted(errors))
+        raise GameError(f"Unable to write saves for: {names}") from next(iter(errors.values()))
+
+atexit.register(close_save_stores)
+
+def _text_store(save_directory, feature):
+    """Get the TextSaveStore of a directory, writing out any cached saves first"""
+    store = get_save_store(save_directory)
+    if isinstance(store, CachedSaveStore):
+        store.flush()
+        store = store.store
+    if not isinstance(store, TextSaveStore):
+        raise ValueError(f"Only the text save backend has {feature}.")
+    return store
+
+def _copy_character(character):
+    """Copy a character so the copy shares no lists with the original"""
+    copy = {key: list(value) if type(value) is list else value for key, value in character.items()}
+    return Character.from_dict(copy) if type(character) is Character else copy
+
+def _run_bulk(function, arguments, names, max_workers):
+    """Call function on every argument in a thread pool, collecting errors by name"""
+    def call(argument):
+        try:
+            return function(argument), None
+        except BULK_SAVE_ERRORS as e:
+            return None, e
+
+    arguments = list(arguments)
+    if max_workers == 1 or len(arguments) <= 1:
+        outcomes = list(map(call, arguments))
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            outcomes = list(executor.map(call, arguments))
+
+    results = []
+    errors = {}
+    for name, (result, error) in zip(names, outcomes):
+        results.append(result)
+        if error is not None:
+            errors[name] = error
+    return results, errors
+
+def _write_atomic(path, content, durability="none", group_commit=None):
+    """
+    Replace path with content without ever leaving a partial file
+
+    The content goes to a temporary file next to path, which is then
+    renamed over path; see TextSaveStore for the durability modes.
+    """
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_path, "wb" if isinstance(content, bytes) else "w") as file:
+            file.write(content)
+            if durability != "none":
+                # In group mode too: each writer syncs its own file, in parallel
+                file.flush()
+                os.fsync(file.fileno())
+        if durability == "group":
+            group_commit.commit(temp_path, path)
+        else:
+            os.replace(temp_path, path)
+            if durability == "fsync":
+                _fsync_directory(os.path.dirname(path))
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+def _replace_and_sync(renames, files=(), directories=()):
+    """
+    fsync each of files once, rename a batch of synced (temp path, final
+    path) files into place, then fsync every directory involved once
+    """
+    for path in set(files):
+        _fsync_file(path)
+    for temp_path, final_path in renames:
+        os.replace(temp_path, final_path)
+    directories = set(directories)
+    directories.update(os.path.dirname(final_path) for _, final_path in renames)
+    for directory in directories:
+        _fsync_directory(directory)
+
+def _fsync_file(path):
+    """fsync a file by name (it may have been written through another descriptor)"""
+    descriptor = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+def _file_identity(path):
+    """(inode, size) of a file, or None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_size)
+
+def _fsync_directory(directory):
+    """Make renames in directory durable (directories cannot be opened on Windows)"""
+    if os.name != "posix":
+        return
+    descriptor = os.open(directory or ".", os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+def _append_line(path, line, sync=False):
+    """
+    Append one complete line to a log file
+
+    If the file does not end in a newline (a crash cut the last append
+    short), the broken line is ended first so readers can skip it.
+
+    Returns: New size of the file in bytes
+    """
+    with open(path, "a+b") as file:
+        size = file.seek(0, os.SEEK_END)
+        if size:
+            file.seek(size - 1)
+            if file.read(1) != b"\n":
+                line = "\n" + line
+        data = line.encode()
+        file.write(data)
+        if sync:
+            file.flush()
+            os.fsync(file.fileno())
+    return size + len(data)
+
+def _manifest_entry(character, saved_at):
+    """Build a save manifest entry from a character"""
+    return {
+        "name": character["name"],
+        "class": character.get("class"),
+        "level": character.get("level"),
+        "gold": character.get("gold"),
+        "saved_at": saved_at,
+    }
+
+def _format_manifest_value(value):
+    return "" if value is None else str(value)
+
+def _apply_manifest_line(manifest, parts):
+    """Apply one manifest log line ("+" entry or "-" removal), skipping bad lines"""
+    if parts[0] == "+" and len(parts) == len(MANIFEST_FIELDS) + 1:
+        name, character_class, level, gold, saved_at = parts[1:]
+        try:
+            manifest[name] = {
+                "name": name,
+                "class": character_class or None,
+                "level": int(level) if level else None,
+                "gold": int(gold) if gold else None,
+                "saved_at": float(saved_at),
+            }
+        except ValueError:
+            pass
+    elif parts[0] == "-" and len(parts) == 2:
+        manifest.pop(parts[1], None)
+
+def _manifest_matches(entry, character_class, min_level, max_level):
+    if character_class is not None and entry["class"] != character_class:
+        return False
+    if min_level is None and max_level is None:
+        return True
+    level = entry["level"]
+    if level is None:
+        return False
+    return (min_level is None or level >= min_level) and (max_level is None or level <= max_level)
+
+def _total_xp_for_level(level):
+    """XP needed to go from level 1 to level (100 + 200 + ... + (level - 1) * 100)"""
+    return 50 * level * (level - 1)
+
+def _level_for_total_xp(total_xp):
+    """
+    Highest level whose _total_xp_for_level is at most total_xp
     
-    filename = f"{character_name}_save.txt"
-    filepath = os.path.join(save_directory, filename)
+    Solves 50 * n * (n - 1) <= total_xp for the largest whole n, using the
+    integer square root so large totals are exact.
+    """
+    units = int(total_xp // 50)
+    if units < 0:
+        return 1
+    return (math.isqrt(4 * units + 1) + 1) // 2
+
+def _apply_experience(character, xp_amount):
+    """Add XP to a living character and apply every level up it pays for"""
+    level = character["level"]
+    experience = character["experience"] + xp_amount
+    total_xp = _total_xp_for_level(level) + experience
+    levels_gained = _level_for_total_xp(total_xp) - level
+    if levels_gained <= 0:
+        character["experience"] = experience
+        return
+
+    character["level"] = level + levels_gained
+    character["experience"] = total_xp - _total_xp_for_level(level + levels_gained)
+    character["max_health"] += 10 * levels_gained
+    character["strength"] += 2 * levels_gained
+    character["magic"] += 2 * levels_gained
+    character["health"] = character["max_health"]
+
+def _read_save_layout(save_directory):
+    """The layout recorded in a save directory ("flat" if none is)"""
+    try:
+        with open(os.path.join(save_directory, SAVE_LAYOUT_NAME), "r") as file:
+            layout = file.read().strip()
+    except OSError:
+        return "flat"
+    return layout if layout in SAVE_LAYOUTS else "flat"
 
-    # 1. Check if file exists
-    if not os.path.exists(filepath):
-        raise CharacterNotFoundError(f"No save file found for '{character_name}'.")
+def _is_shard_name(name):
+    return len(name) == 2 and all(char in "0123456789abcdef" for char in name)
 
-    # 2. Try reading file
+def _remove_directory_if_empty(path):
     try:
-        with open(filepath, "r") as file:
+        os.rmdir(path)
+    except OSError:
+        pass
+
+def _remove_if_exists(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def _save_state(character):
+    """Snapshot of a character's saved fields, used to find what changed"""
+    return tuple(
+        tuple(character.get(field, ())) if field_type is list else character[field]
+        for field, _, field_type in SAVE_FIELDS
+    )
+
+def _character_from_state(state):
+    """The character a save of state loads back as (saved fields only)"""
+    return Character(*(list(value) if type(value) is tuple else value for value in state))
+
+def _binary_header(float_flags):
+    # Stats are int64 except those flagged as floats (health after a
+    # revive can be fractional), which are stored as doubles
+    header = _binary_headers.get(float_flags)
+    if header is None:
+        stat_format = "".join("d" if float_flags >> bit & 1 else "q" for bit in range(7))
+        header = _binary_headers[float_flags] = struct.Struct(
+            _BINARY_PREFIX.format + stat_format + "5I"
+        )
+    return header
+
+def _encode_binary_save(state):
+    """Build a binary save file from a _save_state tuple"""
+    stats = state[2:9]
+    float_flags = 0
+    for bit, value in enumerate(stats):
+        if isinstance(value, float):
+            float_flags |= 1 << bit
+
+    try:
+        texts = (state[0], state[1], "\0".join(state[9]), "\0".join(state[10]), "\0".join(state[11]))
+        for ids, joined in zip(state[9:], texts[2:]):
+            if ids and joined.count("\0") != len(ids) - 1:
+                raise InvalidSaveDataError("Item and quest ids cannot contain NUL characters.")
+        header = _binary_header(float_flags).pack(
+            BINARY_SAVE_MAGIC, BINARY_SAVE_VERSION, float_flags, *stats, *map(len, texts)
+        )
+        return header + "".join(texts).encode()
+    except (struct.error, TypeError) as e:
+        raise InvalidSaveDataError(f"Cannot store character in binary format: {e}")
+
+def _decode_binary_save(data):
+    """Parse a binary save file into a character dictionary"""
+    try:
+        _, version, float_flags = _BINARY_PREFIX.unpack_from(data)
+        if version != BINARY_SAVE_VERSION:
+            raise InvalidSaveDataError(f"Unsupported binary save version: {version}")
+        header = _binary_header(float_flags)
+        values = header.unpack_from(data)
+        text = data[header.size:].decode()
+    except (struct.error, UnicodeDecodeError) as e:
+        raise InvalidSaveDataError(f"Invalid save data: {e}")
+
+    (_, _, _, level, health, max_health, strength, magic, experience, gold,
+     name_end, class_length, inventory_length, active_length, completed_length) = values
+    class_end = name_end + class_length
+    inventory_end = class_end + inventory_length
+    active_end = inventory_end + active_length
+    if active_end + completed_length != len(text):
+        raise InvalidSaveDataError("Invalid save data: text section has the wrong length")
+
+    return {
+        "name": text[:name_end],
+        "class": text[name_end:class_end],
+        "level": level,
+        "health": health,
+        "max_health": max_health,
+        "strength": strength,
+        "magic": magic,
+        "experience": experience,
+        "gold": gold,
+        "inventory": text[class_end:inventory_end].split("\0") if inventory_length else [],
+        "active_quests": text[inventory_end:active_end].split("\0") if active_length else [],
+        "completed_quests": text[active_end:].split("\0") if completed_length else [],
+    }
+
+def _decode_save_data(data):
+    """Parse the bytes of a save file, text or binary"""
+    if data.startswith(BINARY_SAVE_MAGIC):
+        return _decode_binary_save(data)
+    try:
+        lines = data.decode().splitlines()
+    except UnicodeDecodeError as e:
+        raise InvalidSaveDataError(f"Invalid save data: {e}")
+    return _parse_save_text(lines)
+
+def _format_save_field(index, value):
+    """One "KEY: value" save line (without newline) for SAVE_FIELDS[index]"""
+    _, key, field_type = SAVE_FIELDS[index]
+    if field_type is list:
+        value = ",".join(value)
+    return f"{key}: {value}"
+
+def _format_save_state(state):
+    """Build the text save file content from a _save_state tuple"""
+    return "".join(_format_save_field(index, value) + "\n" for index, value in enumerate(state))
+
+def _read_journal(path):
+    """Get the complete entries of a save journal as dictionaries of changes"""
+    try:
+        with open(path, "r") as file:
             lines = file.readlines()
+    except FileNotFoundError:
+        return []
     except Exception as e:
-        raise SaveFileCorruptedError(f"Unable to read save file: {e}")
+        raise SaveFileCorruptedError(f"Unable to read save journal: {e}")
 
-    # 3. Parse file content
+    return [
+        _parse_save_text(line[:-len(JOURNAL_ENTRY_END)].split("\t"))
+        for line in lines
+        if line.endswith(JOURNAL_ENTRY_END)
+    ]
+
+def _parse_save_text(lines):
+    """Parse the lines of a text save file into a character dictionary"""
     character = {}
     try:
         for line in lines:
@@ -175,46 +2119,6 @@ def load_character(character_name, save_directory="data/save_games"):
 
     return character
 
-def list_saved_characters(save_directory="data/save_games"):
-    """
-    Get list of all saved character names
-    
-    Returns: List of character names (without _save.txt extension)
-    """
-
-    if not os.path.exists(save_directory):
-        return []
-
-    saved_characters = []
-
-    for filename in os.listdir(save_directory):
-        if filename.endswith("_save.txt"):
-            # Remove the suffix
-            name = filename.replace("_save.txt", "")
-            saved_characters.append(name)
-
-    return saved_characters
-
-def delete_character(character_name, save_directory="data/save_games"):
-    """
-    Delete a character's save file
-    
-    Returns: True if deleted successfully
-    Raises: CharacterNotFoundError if character doesn't exist
-    """
-
-    filename = f"{character_name}_save.txt"
-    filepath = os.path.join(save_directory, filename)
-
-    # Check if file exists
-    if not os.path.exists(filepath):
-        raise CharacterNotFoundError(f"No save file found for '{character_name}'.")
-
-    # Try deleting file
-    os.remove(filepath)
-
-    return True
-
 # ============================================================================
 # CHARACTER OPERATIONS
 # ============================================================================
@@ -224,39 +2128,47 @@ def gain_experience(character, xp_amount):
     Add experience to character and handle level ups
     
     Level up formula: level_up_xp = current_level * 100
+    
+    Any number of level ups is worked out at once (see
+    _level_for_total_xp), so huge XP grants cost the same as small ones.
     """
 
     # 1. Check if character is dead
     if character["health"] <= 0:
         raise CharacterDeadError("Character is dead and cannot gain experience.")
 
-    # 2. Add experience
-    character["experience"] += xp_amount
-
-    # 3. Handle multiple possible level-ups
-    leveled_up = True
-    while leveled_up:
-        leveled_up = False
-
-        level_up_requirement = character["level"] * 100
-
-        if character["experience"] >= level_up_requirement:
-            # Deduct required XP and level up
-            character["experience"] -= level_up_requirement
-            character["level"] += 1
-
-            # Increase stats
-            character["max_health"] += 10
-            character["strength"] += 2
-            character["magic"] += 2
-
-            # Restore HP to full
-            character["health"] = character["max_health"]
-
-            leveled_up = True  # Continue loop in case they can level again
+    # 2. Add experience and handle every level up it pays for
+    _apply_experience(character, xp_amount)
 
     return character
 
+def gain_experience_batch(characters, xp_amounts):
+    """
+    Add experience to many characters
+    
+    Args:
+        characters: List of characters
+        xp_amounts: One XP amount for every character, or a list with an
+                    amount per character
+    
+    Returns: Dictionary of character name -> CharacterDeadError for the
+             dead characters, which are left unchanged
+    """
+    if isinstance(xp_amounts, (int, float)):
+        xp_amounts = [xp_amounts] * len(characters)
+    elif len(xp_amounts) != len(characters):
+        raise ValueError("xp_amounts must have one amount per character.")
+
+    errors = {}
+    for character, xp_amount in zip(characters, xp_amounts):
+        if character["health"] <= 0:
+            errors[character.get("name")] = CharacterDeadError(
+                "Character is dead and cannot gain experience."
+            )
+        else:
+            _apply_experience(character, xp_amount)
+    return errors
+
 def add_gold(character, amount):
     """
     Add gold to character's inventory
@@ -353,8 +2265,8 @@ def validate_character_data(character):
         "completed_quests": list,
     }
 
-    # Ensure the argument is a dictionary
-    if not isinstance(character, dict):
+    # Ensure the argument is a dictionary (or a Character)
+    if not isinstance(character, Mapping):
         raise InvalidSaveDataError("Character data must be a dictionary.")
 
     # Check for required fields and type validation
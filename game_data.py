@@ -11,99 +11,672 @@ Assistance was used to structure and clarify game data loading, parsing, and val
 This module handles loading and validating game data from text files.
 """
 
+import gc
 import os
+import re
+import sys
+import glob
+import mmap
+import pickle
+import hashlib
+from contextlib import contextmanager
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from bisect import bisect_left
+from itertools import count, repeat, starmap
+from operator import attrgetter, itemgetter
+from collections.abc import Mapping, MutableMapping
 from custom_exceptions import (
     InvalidDataFormatError,
     MissingDataFileError,
-    CorruptedDataError
+    CorruptedDataError,
+    QuestNotFoundError,
+    ItemNotFoundError
 )
 
+try:
+    import numpy
+except ImportError:  # numpy is optional; columns fall back to array('q')
+    numpy = None
+
 # ============================================================================
-# DATA LOADING FUNCTIONS
+# RECORD SCHEMAS
 # ============================================================================
 
-def load_quests(filename="data/quests.txt"):
+def intern_str(value):
     """
-    Load quest data from file and return a dict with lowercase keys.
-    Numeric fields are converted to int.
+    Converter for string fields whose values repeat across many records
+
+    Every record with the same value shares one string object.
     """
-    if not os.path.exists(filename):
-        raise MissingDataFileError(f"Quest file not found: {filename}")
+    return sys.intern(value.strip())
 
-    quests = {}
-    try:
-        with open(filename, "r") as file:
-            content = file.read()
-    except Exception as e:
-        raise CorruptedDataError(f"Unable to read quest file: {e}")
-
-    quest_blocks = [block.strip() for block in content.split("\n\n") if block.strip()]
-
-    for block in quest_blocks:
-        quest_data = {}
-        lines = block.split("\n")
-        for line in lines:
-            if ":" not in line:
-                raise InvalidDataFormatError(f"Invalid line format: {line}")
-            key, value = line.split(":", 1)
-            key = key.strip().lower()
-            value = value.strip()
-            quest_data[key] = value
-
-        # Convert numeric fields to int
-        for num_field in ["reward_xp", "reward_gold", "required_level"]:
+
+# Every field a record can have, as (field name, converter, required).
+# The first field is the record id. Fields not listed here are kept as
+# stripped strings. Ids are interned so prerequisite values share the
+# string object of the quest they point at.
+QUEST_SCHEMA = (
+    ("quest_id", intern_str, True),
+    ("title", str, True),
+    ("description", str, True),
+    ("reward_xp", int, True),
+    ("reward_gold", int, True),
+    ("required_level", int, True),
+    ("prerequisite", intern_str, True),
+)
+
+ITEM_SCHEMA = (
+    ("item_id", intern_str, True),
+    ("name", str, True),
+    ("type", intern_str, True),
+    ("effect", intern_str, True),
+    ("cost", int, True),
+    ("description", str, True),
+)
+
+VALID_ITEM_TYPES = ("weapon", "armor", "consumable")
+
+# Character classes: the base stats a new character of the class starts with
+CLASS_SCHEMA = (
+    ("name", intern_str, True),
+    ("health", int, True),
+    ("strength", int, True),
+    ("magic", int, True),
+)
+
+# Parsed effects by effect string. Items share a handful of distinct
+# effects, so every item with "strength:5" shares one tuple.
+_parsed_effects = {}
+
+
+def parse_effect(effect):
+    """
+    Split an item effect like "strength:5" into ("strength", 5)
+
+    Returns: (stat name, value) tuple, or None if the effect is malformed
+    """
+    parsed = _parsed_effects.get(effect)
+    if parsed is None and isinstance(effect, str):
+        parts = effect.split(":")
+        if len(parts) != 2:
+            return None
+        try:
+            parsed = (sys.intern(parts[0].strip().lower()), int(parts[1]))
+        except ValueError:
+            return None
+        _parsed_effects[effect] = parsed
+    return parsed
+
+
+# ============================================================================
+# RECORD TYPES
+# ============================================================================
+
+class LazyText:
+    """
+    Handle to a text field that is still in the data file
+
+    Holds only a byte offset and a text_source tuple of (filename, size,
+    mtime_ns) shared by every handle from the same load. load() reads the
+    field's line and returns its value. Records replace the handle with
+    the loaded string the first time the field is accessed.
+    """
+
+    __slots__ = ("text_source", "offset")
+
+    def __init__(self, text_source, offset):
+        self.text_source = text_source
+        self.offset = offset
+
+    def load(self):
+        """
+        Read the field value from the data file
+
+        Returns: The stripped text after the field's ':'
+        Raises: CorruptedDataError if the file changed since it was loaded
+        """
+        filename, size, mtime_ns = self.text_source
+        try:
+            with open(filename, "rb") as file:
+                stat = os.fstat(file.fileno())
+                if (stat.st_size, stat.st_mtime_ns) != (size, mtime_ns):
+                    raise CorruptedDataError(
+                        f"{filename} changed after it was loaded; reload it to read this field"
+                    )
+                file.seek(self.offset)
+                line = file.readline().decode("utf-8")
+        except (OSError, UnicodeDecodeError) as e:
+            raise CorruptedDataError(f"Unable to read deferred field from {filename}: {e}")
+        return line.partition(":")[2].strip()
+
+    def __repr__(self):
+        return f"LazyText({self.text_source[0]!r}, {self.offset})"
+
+
+class Record(MutableMapping):
+    """
+    Compact base class for quest and item records
+
+    Records store their schema fields in __slots__ instead of a per-record
+    dict, but behave like the dicts the loaders used to return: r["title"],
+    r.get("title"), "title" in r, iteration, len() and == against a dict
+    all work. Fields that are not in the schema go into a small overflow
+    dict that only exists when needed.
+    """
+
+    __slots__ = ("_extra",)
+    _fields = ()
+    _field_set = frozenset()
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a record from any mapping of field name -> value"""
+        record = cls.__new__(cls)
+        record._extra = None
+        for key, value in data.items():
+            record[key] = value
+        return record
+
+    def __getitem__(self, key):
+        if key in self._field_set:
+            try:
+                value = getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+            if type(value) is LazyText:
+                value = value.load()
+                setattr(self, key, value)
+            return value
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __setitem__(self, key, value):
+        if key in self._field_set:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self._field_set:
             try:
-                quest_data[num_field] = int(quest_data[num_field])
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        elif self._extra is not None and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def __iter__(self):
+        for field in self._fields:
+            if hasattr(self, field):
+                yield field
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self)!r})"
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Reads all schema fields in one call for __reduce__; raises
+        # AttributeError if any of them is unset
+        cls._field_values = attrgetter(*cls._fields)
+
+    def __reduce__(self):
+        if self._extra is None:
+            try:
+                return (type(self), self._field_values(self))
+            except AttributeError:
+                pass
+        return (type(self).from_dict, (dict(self),))
+
+
+class Quest(Record):
+    """One quest; fields follow QUEST_SCHEMA"""
+
+    __slots__ = tuple(field for field, _, _ in QUEST_SCHEMA)
+    _fields = __slots__
+    _field_set = frozenset(__slots__)
+
+    def __init__(self, quest_id, title, description, reward_xp, reward_gold,
+                 required_level, prerequisite):
+        self.quest_id = quest_id
+        self.title = title
+        self.description = description
+        self.reward_xp = reward_xp
+        self.reward_gold = reward_gold
+        self.required_level = required_level
+        self.prerequisite = prerequisite
+        self._extra = None
+
+
+class Item(Record):
+    """
+    One item; fields follow ITEM_SCHEMA
+
+    effect_stats holds the effect already parsed into a (stat, value)
+    tuple (None if the effect string is malformed), so the inventory code
+    does not re-split the string on every use, equip and unequip. It is
+    not a mapping key and is kept in step when "effect" is set.
+    """
+
+    _fields = tuple(field for field, _, _ in ITEM_SCHEMA)
+    _field_set = frozenset(_fields)
+    __slots__ = _fields + ("effect_stats",)
+
+    def __init__(self, item_id, name, type, effect, cost, description):
+        self.item_id = item_id
+        self.name = name
+        self.type = type
+        self.effect = effect
+        self.effect_stats = parse_effect(effect)
+        self.cost = cost
+        self.description = description
+        self._extra = None
+
+    def __setitem__(self, key, value):
+        Record.__setitem__(self, key, value)
+        if key == "effect":
+            self.effect_stats = parse_effect(value)
+
+    def __delitem__(self, key):
+        Record.__delitem__(self, key)
+        if key == "effect":
+            self.effect_stats = None
+
+def compile_record_parser(schema, kind, record_type=dict, lazy_fields=()):
+    """
+    Build the parse function for one record type from its schema
+
+    The returned function has two paths:
+    - A fast path generated from the schema (the same way
+      collections.namedtuple builds its classes) for the layout every
+      data file uses: one line per schema field, in schema order, with
+      upper-case keys. It builds the record in one expression, no loop.
+    - A general table-driven loop for anything else (extra fields, other
+      field order, odd spacing) and for reporting errors with line numbers.
+
+    Args:
+        schema: Tuple of (field name, converter, required) tuples
+        kind: "quest" or "item", used in error messages
+        record_type: dict, or a Record subclass whose __init__ takes the
+                     schema fields in order
+        lazy_fields: str fields to leave in the file. They are stored as
+                     LazyText handles pointing at their line instead of
+                     being copied into the record.
+
+    Returns: Function taking a list of (line_number, offset, line) tuples
+             (and, when lazy_fields is used, the text_source tuple the
+             LazyText handles share) and returning the record. Without
+             lazy_fields it also has a parse_text(first_line, text)
+             attribute taking the block as one string.
+    """
+    # Raw keys as written in the file map straight to (field, converter).
+    # str fields are only stripped; int() strips whitespace by itself.
+    field_specs = {}
+    for field, converter, _ in schema:
+        spec = (field, str.strip if converter is str else converter)
+        field_specs[field.upper()] = spec
+        field_specs[field] = spec
+    required = frozenset(field for field, _, is_required in schema if is_required)
+    field_order = [field for field, _, _ in schema]
+
+    def parse_record_slow(block, text_source=None):
+        record = {}
+        for line_number, offset, line in block:
+            raw_key, sep, value = line.partition(":")
+            if not sep:
+                raise InvalidDataFormatError(
+                    f"Invalid line format on line {line_number}: {line}"
+                )
+            spec = field_specs.get(raw_key) or field_specs.get(raw_key.strip().lower())
+            if spec is None:
+                record[raw_key.strip().lower()] = value.strip()
+                continue
+            if spec[0] in lazy_fields:
+                record[spec[0]] = LazyText(text_source, offset)
+                continue
+            try:
+                record[spec[0]] = spec[1](value)
             except ValueError:
                 raise InvalidDataFormatError(
-                    f"Numeric field has invalid value in quest '{quest_data.get('quest_id', '')}'"
+                    f"Field '{spec[0]}' has invalid value '{value.strip()}' on line {line_number}"
                 )
 
-        quests[quest_data["quest_id"]] = quest_data
+        if not required <= record.keys():
+            missing = [field for field in field_order if field not in record]
+            raise InvalidDataFormatError(
+                f"Missing required field '{missing[0]}' in {kind} starting on line {block[0][0]}"
+            )
+        if record_type is dict:
+            return record
+        return record_type.from_dict(record)
+
+    names = [f"line_{i}" for i in range(len(schema))]
+    unpack = []
+    checks = []
+    values = []
+    text_values = []
+    converters = {}
+    for i, (name, (field, converter, _)) in enumerate(zip(names, schema)):
+        prefix = field.upper() + ":"
+        checks.append(f"{name}.startswith({prefix!r})")
+        unpack.append(f"(_, offset_{i}, {name})" if field in lazy_fields else f"(_, _, {name})")
+        # The same conversion, applied to the whole line (value) or to the
+        # text after the key matched by block_pattern (text_value)
+        for raw, target in ((f"{name}[{len(prefix)}:]", values), (name, text_values)):
+            if field in lazy_fields:
+                value = f"LazyText(text_source, offset_{i})"
+            elif converter is str:
+                value = f"{raw}.strip()"
+            elif converter is intern_str:
+                # Inlined to save a Python-level call per field
+                value = f"intern({raw}.strip())"
+            else:
+                converters[f"convert_{field}"] = converter
+                value = f"convert_{field}({raw})"
+            if record_type is dict:
+                value = f"{field!r}: {value}"
+            target.append(value)
+
+    def build_expression(values):
+        if record_type is dict:
+            return "{" + ", ".join(values) + "}"
+        return "record_type(" + ", ".join(values) + ")"
+
+    build = build_expression(values)
+    block_pattern = re.compile("\n".join(
+        re.escape(field.upper()) + ":([^\n]*)" for field, _, _ in schema
+    ))
 
-    return quests
+    text_source_code = "\n".join([
+        "def parse_text(first_line, text):",
+        "    match = match_block(text)",
+        "    if match is not None:",
+        "        " + ", ".join(names) + " = match.groups()",
+        "        try:",
+        "            return " + build_expression(text_values),
+        "        except ValueError:",
+        "            pass",
+        "    lines = text.split('\\n')",
+        "    return parse_record_slow(list(zip(count(first_line), repeat(None), lines)))",
+    ])
+    source = "\n".join([
+        "def parse_record(block, text_source=None):",
+        f"    if len(block) == {len(schema)}:",
+        "        " + ", ".join(unpack) + " = block",
+        "        if " + " and ".join(checks) + ":",
+        "            try:",
+        "                return " + build,
+        "            except ValueError:",
+        "                pass",
+        "    return parse_record_slow(block, text_source)",
+    ])
+    namespace = {
+        "parse_record_slow": parse_record_slow,
+        "record_type": record_type,
+        "LazyText": LazyText,
+        "count": count,
+        "repeat": repeat,
+        "intern": sys.intern,
+        "match_block": block_pattern.fullmatch,
+        **converters,
+    }
+    exec(compile(source, f"<{kind} record parser>", "exec"), namespace)
+    if not lazy_fields:
+        exec(compile(text_source_code, f"<{kind} record parser>", "exec"), namespace)
+
+    parse_record = namespace["parse_record"]
+    parse_record.kind = kind
+    parse_record.id_field = schema[0][0]
+    parse_record.lazy_fields = tuple(lazy_fields)
+    parse_record.source = source
+    # parse_text(first_line, text) takes the block as one string and
+    # matches every field with a single regular expression, skipping the
+    # per-line tuples and checks (no lazy fields only)
+    parse_record.parse_text = namespace.get("parse_text")
+    return parse_record
+
+
+def compile_record_validator(schema, kind, record_type, choices=None):
+    """
+    Build the check function for one record type from its schema
+
+    Every required field must be present with the right type: int fields
+    accept int or float, everything else must be a str. choices maps a
+    field to the values it may take.
 
+    The check for a valid record is a single getter call that pulls all
+    required fields at once (attrgetter for record_type instances,
+    itemgetter for plain dicts) followed by one isinstance pass over
+    them. Only an invalid record goes through the field-by-field path,
+    which builds the error message.
 
-def load_items(filename="data/items.txt"):
+    The returned function also has a check_all(records) attribute that
+    checks a whole list field by field with map(), so the loop over
+    records runs in C. It returns True if every record is valid.
+
+    Returns: Function taking a record and returning None if it is valid,
+             otherwise the error message for its first problem
     """
-    Load item data from file and return a dict with lowercase keys.
+    choices = choices or {}
+    checks = [
+        (field, (int, float) if converter is int else (str, LazyText))
+        for field, converter, is_required in schema
+        if is_required
+    ]
+    fields = [field for field, _ in checks]
+    expected_types = [expected for _, expected in checks]
+    choice_checks = [(fields.index(field), frozenset(values)) for field, values in choices.items()]
+
+    if len(fields) == 1:
+        get_attributes = lambda record: (getattr(record, fields[0]),)
+        get_items = lambda record: (record[fields[0]],)
+    else:
+        get_attributes = attrgetter(*fields)
+        get_items = itemgetter(*fields)
+
+    def describe_error(record):
+        if not isinstance(record, Mapping):
+            return f"{kind.capitalize()} data must be a dictionary."
+        for field, expected_type in checks:
+            if field not in record:
+                return f"Missing required field: '{field}'"
+            if not isinstance(record[field], expected_type):
+                return (
+                    f"Invalid type for '{field}': expected {expected_type}, "
+                    f"got {type(record[field])}"
+                )
+        for position, allowed in choice_checks:
+            if record[fields[position]] not in allowed:
+                return f"Invalid {kind} {fields[position]}: {record[fields[position]]}"
+        return None
+
+    def check_record(record):
+        try:
+            if type(record) is record_type:
+                values = get_attributes(record)
+            else:
+                values = get_items(record)
+        except (AttributeError, KeyError, TypeError):
+            return describe_error(record)
+
+        if not all(map(isinstance, values, expected_types)):
+            return describe_error(record)
+        for position, allowed in choice_checks:
+            if values[position] not in allowed:
+                return describe_error(record)
+        return None
+
+    def check_all(records):
+        if all(map(isinstance, records, repeat(record_type))):
+            make_getter = attrgetter
+        elif all(map(isinstance, records, repeat(Mapping))):
+            make_getter = itemgetter
+        else:
+            return False
+        try:
+            for field, expected_type in checks:
+                values = map(make_getter(field), records)
+                if not all(map(isinstance, values, repeat(expected_type))):
+                    return False
+            for position, allowed in choice_checks:
+                if not allowed.issuperset(map(make_getter(fields[position]), records)):
+                    return False
+        except (AttributeError, KeyError, TypeError):
+            return False
+        return True
+
+    check_record.check_all = check_all
+    return check_record
+
+
+_parse_quest_record = compile_record_parser(QUEST_SCHEMA, "quest", Quest)
+_parse_item_record = compile_record_parser(ITEM_SCHEMA, "item", Item)
+_parse_quest_record_lazy = compile_record_parser(
+    QUEST_SCHEMA, "quest", Quest, lazy_fields=("description",)
+)
+_parse_item_record_lazy = compile_record_parser(
+    ITEM_SCHEMA, "item", Item, lazy_fields=("description",)
+)
+_parse_class_record = compile_record_parser(CLASS_SCHEMA, "class")
+_check_quest = compile_record_validator(QUEST_SCHEMA, "quest", Quest)
+_check_item = compile_record_validator(ITEM_SCHEMA, "item", Item, {"type": VALID_ITEM_TYPES})
+
+# ============================================================================
+# DATA LOADING FUNCTIONS
+# ============================================================================
+
+# Compiled catalogs are stored next to the text file as <filename>.cache,
+# with the hash of every record block (for CatalogWatcher) in
+# <filename>.hashes. Bump CACHE_VERSION whenever the shape of loaded
+# records changes.
+CACHE_SUFFIX = ".cache"
+HASHES_SUFFIX = ".hashes"
+INDEX_SUFFIX = ".idx"
+CACHE_VERSION = 3
+
+
+def load_quests(filename="data/quests.txt", use_cache=True, max_workers=None,
+                lazy_descriptions=False):
+    """
+    Load quest data from file and return a dict of quest_id -> Quest.
+    Quest records act like dicts with lowercase keys.
+    Numeric fields are converted to int.
+
+    When use_cache is True the parsed quests are also written to a
+    compiled sidecar file, and later loads read that instead of
+    re-parsing the text as long as the text file has not changed. A
+    cached load skips parsing but still builds every Quest, so it is
+    about 3-4x faster than parsing (around a second for 500k quests),
+    not instant. To look up a few quests in a large file without building
+    all of them, use open_quest_catalog.
+
+    filename may also be a directory (every *.txt file in it is loaded)
+    or a glob pattern such as "data/quests/*.txt". The shard files are
+    parsed in parallel with up to max_workers processes and merged in
+    sorted filename order.
+
+    With lazy_descriptions=True, descriptions are left in the file as
+    LazyText handles and only read the first time a quest's description
+    is accessed. The compiled cache is not used in that mode.
+
+    Raises: InvalidDataFormatError if two shards define the same quest_id
+    """
+    if _is_shard_source(filename):
+        return _load_shards(filename, "quest", "quest_id", use_cache, max_workers,
+                            lazy_descriptions)
+    if lazy_descriptions:
+        return _load_catalog(filename, _parse_quest_record_lazy, False)
+    return _load_catalog(filename, _parse_quest_record, use_cache)
+
+
+def load_items(filename="data/items.txt", use_cache=True, max_workers=None,
+               lazy_descriptions=False):
+    """
+    Load item data from file and return a dict of item_id -> Item.
+    Item records act like dicts with lowercase keys.
     Effect remains a string.
     Numeric fields are converted to int.
+
+    Supports the same compiled cache, sharded directories or glob
+    patterns and lazy_descriptions mode as load_quests.
+
+    Raises: InvalidDataFormatError if two shards define the same item_id
     """
-    if not os.path.exists(filename):
-        raise MissingDataFileError(f"Item file not found: {filename}")
+    if _is_shard_source(filename):
+        return _load_shards(filename, "item", "item_id", use_cache, max_workers,
+                            lazy_descriptions)
+    if lazy_descriptions:
+        return _load_catalog(filename, _parse_item_record_lazy, False)
+    return _load_catalog(filename, _parse_item_record, use_cache)
+
+
+def load_classes(filename="data/classes.txt"):
+    """
+    Load character class data from file and return a dict of name -> class
+
+    Each class is a dict with name, health, strength and magic, in the
+    same "KEY: value" block format as the quest and item files. The file
+    is small, so it is always parsed directly (no cache or shards).
+
+    Raises:
+        MissingDataFileError if the file does not exist
+        InvalidDataFormatError if a field is malformed or a name repeats
+    """
+    classes = {}
+    for record in _iter_records(filename, _parse_class_record):
+        if record["name"] in classes:
+            raise InvalidDataFormatError(f"Duplicate class name: {record['name']}")
+        classes[record["name"]] = record
+    return classes
+
+
+def iter_quests(filename="data/quests.txt", lazy_descriptions=False):
+    """
+    Stream quest records from file one at a time
+
+    Only the block currently being parsed is held in memory, so this
+    works the same for a 7-quest file and a multi-GB generated catalog.
+    lazy_descriptions works as in load_quests.
+
+    Yields: Quest records (same as load_quests values)
+    Raises:
+        MissingDataFileError if the file does not exist
+        CorruptedDataError if the file cannot be read or decoded
+        InvalidDataFormatError if a line or field is malformed
+    """
+    if lazy_descriptions:
+        yield from _iter_records(filename, _parse_quest_record_lazy)
+    else:
+        yield from _iter_records(filename, _parse_quest_record)
 
-    items = {}
-    try:
-        with open(filename, "r") as file:
-            content = file.read()
-    except Exception as e:
-        raise CorruptedDataError(f"Unable to read item file: {e}")
-
-    item_blocks = [block.strip() for block in content.split("\n\n") if block.strip()]
-
-    for block in item_blocks:
-        item_data = {}
-        lines = block.split("\n")
-        for line in lines:
-            if ":" not in line:
-                raise InvalidDataFormatError(f"Invalid line format: {line}")
-            key, value = line.split(":", 1)
-            key = key.strip().lower()
-            value = value.strip()
-            item_data[key] = value
-
-        # Convert numeric fields
-        try:
-            item_data["cost"] = int(item_data["cost"])
-        except ValueError:
-            raise InvalidDataFormatError(
-                f"COST field has invalid value in item '{item_data.get('item_id', '')}'"
-            )
 
-        items[item_data["item_id"]] = item_data
+def iter_items(filename="data/items.txt", lazy_descriptions=False):
+    """
+    Stream item records from file one at a time
 
-    return items
+    Yields: Item records (same as load_items values)
+    Raises: Same exceptions as iter_quests
+    """
+    if lazy_descriptions:
+        yield from _iter_records(filename, _parse_item_record_lazy)
+    else:
+        yield from _iter_records(filename, _parse_item_record)
 
 
 def validate_quest_data(quest_dict):
@@ -116,57 +689,69 @@ def validate_quest_data(quest_dict):
     Returns: True if valid
     Raises: InvalidDataFormatError if missing required fields or wrong types
     """
-    
-    required_fields = {
-        "quest_id": str,
-        "title": str,
-        "description": str,
-        "reward_xp": (int, float),
-        "reward_gold": (int, float),
-        "required_level": (int, float),
-        "prerequisite": str,
-    }
+    error = _check_quest(quest_dict)
+    if error is not None:
+        raise InvalidDataFormatError(error)
+    return True
 
-    if not isinstance(quest_dict, dict):
-        raise InvalidDataFormatError("Quest data must be a dictionary.")
+def validate_item_data(item_dict):
+    """
+    Validate that item dictionary has all required fields and a valid type
 
-    for field, expected_type in required_fields.items():
-        if field not in quest_dict:
-            raise InvalidDataFormatError(f"Missing required field: '{field}'")
-        if not isinstance(quest_dict[field], expected_type):
-            raise InvalidDataFormatError(
-                f"Invalid type for '{field}': expected {expected_type}, got {type(quest_dict[field])}"
-            )
+    Required fields: item_id, name, type, effect, cost, description
 
+    Returns: True if valid
+    Raises: InvalidDataFormatError if missing required fields or wrong types
+    """
+    error = _check_item(item_dict)
+    if error is not None:
+        raise InvalidDataFormatError(error)
     return True
 
-def validate_item_data(item_dict):
-    required_fields = {
-        "item_id": str,
-        "name": str,
-        "type": str,
-        "effect": str,  # <-- change from dict to str
-        "cost": (int, float),
-        "description": str
-    }
-    
-    valid_types = {"weapon", "armor", "consumable"}
+def validate_catalog(records, kind, fail_fast=True):
+    """
+    Validate every quest or item of a catalog in one pass
 
-    if not isinstance(item_dict, dict):
-        raise InvalidDataFormatError("Item data must be a dictionary.")
+    Args:
+        records: Dictionary of id -> record (from load_quests/load_items),
+                 or any iterable of records
+        kind: "quest" or "item"
+        fail_fast: If True, raise on the first invalid record. If False,
+                   check everything and return all the errors.
 
-    for field, expected_type in required_fields.items():
-        if field not in item_dict:
-            raise InvalidDataFormatError(f"Missing required field: '{field}'")
-        if not isinstance(item_dict[field], expected_type):
-            raise InvalidDataFormatError(
-                f"Invalid type for '{field}': expected {expected_type}, got {type(item_dict[field])}"
-            )
+    Returns: List of (record_id, error message) tuples; empty if valid
+    Raises:
+        InvalidDataFormatError on the first invalid record when fail_fast
+        ValueError if kind is not "quest" or "item"
+    """
+    if kind == "quest":
+        check, id_field = _check_quest, "quest_id"
+    elif kind == "item":
+        check, id_field = _check_item, "item_id"
+    else:
+        raise ValueError(f"Unknown catalog kind: {kind}")
 
-    if item_dict["type"] not in valid_types:
-        raise InvalidDataFormatError(f"Invalid item type: {item_dict['type']}")
+    if isinstance(records, Mapping):
+        if check.check_all(list(records.values())):
+            return []
+        pairs = records.items()
+    else:
+        records = list(records)
+        if check.check_all(records):
+            return []
+        pairs = (
+            (record.get(id_field) if isinstance(record, Mapping) else None, record)
+            for record in records
+        )
 
-    return True
+    errors = []
+    for record_id, record in pairs:
+        error = check(record)
+        if error is not None:
+            if fail_fast:
+                raise InvalidDataFormatError(f"{kind.capitalize()} '{record_id}': {error}")
+            errors.append((record_id, error))
+    return errors
 
 
 def create_default_data_files():
@@ -179,6 +764,7 @@ def create_default_data_files():
     data_dir = "data"
     quests_file = os.path.join(data_dir, "quests.txt")
     items_file = os.path.join(data_dir, "items.txt")
+    classes_file = os.path.join(data_dir, "classes.txt")
 
     try:
         # Ensure data directory exists
@@ -215,6 +801,16 @@ def create_default_data_files():
                     "DESCRIPTION: Restores a small amount of health.\n\n"
                 )
 
+        # Create default classes.txt if missing
+        if not os.path.exists(classes_file):
+            with open(classes_file, "w") as f:
+                f.write(
+                    "NAME: Warrior\nHEALTH: 120\nSTRENGTH: 15\nMAGIC: 5\n\n"
+                    "NAME: Mage\nHEALTH: 80\nSTRENGTH: 8\nMAGIC: 20\n\n"
+                    "NAME: Rogue\nHEALTH: 90\nSTRENGTH: 12\nMAGIC: 10\n\n"
+                    "NAME: Cleric\nHEALTH: 100\nSTRENGTH: 10\nMAGIC: 15\n\n"
+                )
+
         print("Default data files created successfully (if they were missing).")
 
     except PermissionError as e:
@@ -222,103 +818,410 @@ def create_default_data_files():
     except OSError as e:
         print(f"OS error while creating data files: {e}")
 
+# ============================================================================
+# INDEXED CATALOG ACCESS
+# ============================================================================
+
+class CatalogIndex(Mapping):
+    """
+    Read-only mapping of id -> record backed by a memory-mapped data file
+
+    Only a compact id -> byte offset index is kept in memory. A record is
+    parsed the first time it is looked up and remembered after that, so a
+    session that touches five items never parses the other million.
+    Iteration follows the order of the records in the file, like the dicts
+    returned by load_quests/load_items.
+
+    A catalog stays usable after its file changes: records already parsed
+    are still returned, but looking up a new one raises CorruptedDataError
+    because the stored offsets no longer match the file. Open the file
+    again for a view of the new content.
+    """
+
+    def __init__(self, filename, parse_record):
+        kind = parse_record.kind
+        if not os.path.exists(filename):
+            raise MissingDataFileError(f"{kind.capitalize()} file not found: {filename}")
+
+        self.filename = filename
+        self.kind = kind
+        self._parse_record = parse_record
+
+        stat = os.stat(filename)
+        self._size = stat.st_size
+        self._mtime_ns = stat.st_mtime_ns
+
+        index = _read_sidecar(filename, INDEX_SUFFIX, f"{kind}_index")
+        if index is None:
+            index = _build_catalog_index(filename, kind, parse_record.id_field)
+            _write_sidecar(filename, INDEX_SUFFIX, f"{kind}_index", index, stat)
+
+        self._ids = index["ids"]
+        self._order = index["order"]
+        self._starts = index["starts"]
+        self._ends = index["ends"]
+        self._line_numbers = index["line_numbers"]
+        self._records = {}
+
+        self._file = open(filename, "rb")
+        self._map = None
+        if self._size:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __getitem__(self, record_id):
+        if type(record_id) is not str:
+            raise KeyError(record_id)
+        record = self._records.get(record_id)
+        if record is not None:
+            return record
+
+        ids = self._ids
+        slot = bisect_left(self._order, record_id, key=ids.__getitem__)
+        if slot == len(self._order) or ids[self._order[slot]] != record_id:
+            raise KeyError(record_id)
+        position = self._order[slot]
+
+        if self._map is None:
+            raise CorruptedDataError(f"The {self.kind} catalog for {self.filename} is closed")
+        if not self.is_current():
+            raise CorruptedDataError(
+                f"{self.kind.capitalize()} file changed since it was opened: {self.filename}"
+            )
+        raw = self._map[self._starts[position]:self._ends[position]]
+        try:
+            text = raw.decode("utf-8")
+        except UnicodeDecodeError as e:
+            raise CorruptedDataError(
+                f"Unreadable data in {self.kind} file on line {self._line_numbers[position]}: {e}"
+            )
+        first_line = self._line_numbers[position]
+        block = [(first_line + i, None, line) for i, line in enumerate(text.splitlines())]
+
+        record = self._parse_record(block)
+        self._records[record_id] = record
+        return record
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, record_id):
+        if type(record_id) is not str:
+            return False
+        ids = self._ids
+        slot = bisect_left(self._order, record_id, key=ids.__getitem__)
+        return slot < len(self._order) and ids[self._order[slot]] == record_id
+
+    def is_current(self):
+        """Return True if the data file has not changed since it was opened"""
+        try:
+            stat = os.stat(self.filename)
+        except OSError:
+            return False
+        return (stat.st_size, stat.st_mtime_ns) == (self._size, self._mtime_ns)
+
+    def close(self):
+        """
+        Release the memory map and the file handle
+
+        Only call this on a catalog nothing else is using; catalogs that
+        are simply dropped are closed when they are garbage collected.
+        """
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+
+# Open catalogs, keyed on (absolute filename, kind)
+_open_catalogs = {}
+
+
+def open_quest_catalog(filename="data/quests.txt"):
+    """
+    Open an indexed, read-only view of a quest file
+
+    The returned CatalogIndex can be passed anywhere a quest dict from
+    load_quests is expected. Opening the same file again returns the same
+    view unless the file has changed.
+    """
+    return _open_catalog(filename, _parse_quest_record)
+
+
+def open_item_catalog(filename="data/items.txt"):
+    """
+    Open an indexed, read-only view of an item file
+
+    See open_quest_catalog.
+    """
+    return _open_catalog(filename, _parse_item_record)
+
+
+def get_quest(quest_id, filename="data/quests.txt"):
+    """
+    Look up a single quest without loading the whole quest file
+
+    Returns: Quest record
+    Raises: QuestNotFoundError if quest_id is not in the file
+    """
+    try:
+        return open_quest_catalog(filename)[quest_id]
+    except KeyError:
+        raise QuestNotFoundError(f"Quest '{quest_id}' not found in {filename}.")
+
+
+def get_item(item_id, filename="data/items.txt"):
+    """
+    Look up a single item without loading the whole item file
+
+    Returns: Item record
+    Raises: ItemNotFoundError if item_id is not in the file
+    """
+    try:
+        return open_item_catalog(filename)[item_id]
+    except KeyError:
+        raise ItemNotFoundError(f"Item '{item_id}' not found in {filename}.")
+
+# ============================================================================
+# COLUMNAR VIEWS
+# ============================================================================
+
+QUEST_NUMERIC_COLUMNS = ("reward_xp", "reward_gold", "required_level")
+ITEM_NUMERIC_COLUMNS = ("cost",)
+
+
+class CatalogColumns:
+    """
+    Column-oriented copy of the numeric fields of a quest or item catalog
+
+    ids holds the record ids in catalog order and each column holds one
+    numeric field aligned to it. Columns are NumPy int64 arrays when NumPy
+    is installed and array('q') otherwise, so range filters and sums run
+    over packed integers instead of looking up fields record by record.
+
+    The view is a snapshot; build a new one after the catalog changes.
+    """
+
+    def __init__(self, records, fields):
+        self.ids = list(records)
+        self._positions = {record_id: i for i, record_id in enumerate(self.ids)}
+        self.columns = {}
+        for field in fields:
+            column = array("q", (records[record_id][field] for record_id in self.ids))
+            if numpy is not None:
+                column = numpy.frombuffer(column, dtype=numpy.int64)
+            self.columns[field] = column
+
+    def __len__(self):
+        return len(self.ids)
+
+    def select_range(self, field, low, high):
+        """
+        Get the ids whose field value is between low and high (inclusive)
+
+        Returns: List of ids in catalog order
+        """
+        column = self.columns[field]
+        ids = self.ids
+        if numpy is not None:
+            matches = numpy.flatnonzero((column >= low) & (column <= high))
+            return [ids[i] for i in matches.tolist()]
+        return [ids[i] for i, value in enumerate(column) if low <= value <= high]
+
+    def total(self, field, ids=None):
+        """
+        Sum a column, either over every record or only over the given ids
+
+        Ids that are not in the catalog are skipped.
+
+        Returns: Integer total
+        """
+        column = self.columns[field]
+        if ids is None:
+            return int(column.sum()) if numpy is not None else sum(column)
+
+        positions = self._positions
+        selected = [positions[record_id] for record_id in ids if record_id in positions]
+        if numpy is not None:
+            return int(column[selected].sum())
+        return sum(column[i] for i in selected)
+
+
+def build_quest_columns(quests):
+    """
+    Build a columnar view of reward_xp, reward_gold and required_level
+
+    Args:
+        quests: Dictionary of quest_id -> quest (from load_quests)
+
+    Returns: CatalogColumns
+    """
+    return CatalogColumns(quests, QUEST_NUMERIC_COLUMNS)
+
+
+def build_item_columns(items):
+    """
+    Build a columnar view of item cost
+
+    Args:
+        items: Dictionary of item_id -> item (from load_items)
+
+    Returns: CatalogColumns
+    """
+    return CatalogColumns(items, ITEM_NUMERIC_COLUMNS)
+
+# ============================================================================
+# HOT RELOAD
+# ============================================================================
+
+class CatalogWatcher:
+    """
+    Keep a live quest or item dict in sync with its data file
+
+    The watcher remembers a hash of every record block. poll() checks the
+    file's size and mtime, and when they changed it re-reads the file,
+    parses only the blocks whose hash changed and patches the live dict in
+    place, so everything holding a reference to it sees the new data.
+
+    When given an already loaded dict, the watcher takes the block hashes
+    from the .hashes sidecar load_quests/load_items wrote with the compiled
+    cache, so startup does not pay for an extra pass over the file. If
+    there is no up-to-date sidecar (the dict was loaded with
+    use_cache=False), the first poll that finds a change parses every
+    block and compares it with the live dict; later polls use the hashes.
+    """
+
+    def __init__(self, filename, kind, records=None):
+        """
+        Args:
+            filename: Data file to watch
+            kind: "quest" or "item"
+            records: The live dict to keep updated. If it is None, an empty
+                     dict is created and filled by the first poll(). If it
+                     is given, it is assumed to match the current file.
+        """
+        self.filename = filename
+        self.kind = kind
+        self._parse_record = _parse_quest_record if kind == "quest" else _parse_item_record
+        self._fingerprint = None
+
+        if records is None:
+            records = {}
+            self._block_hashes = {}
+        else:
+            self._fingerprint = self._current_fingerprint()
+            # None if missing or stale: the first poll that sees a change
+            # then compares every block with the live dict
+            self._block_hashes = _read_sidecar(filename, HASHES_SUFFIX, f"{kind}_hashes")
+        self.records = records
+
+    def _current_fingerprint(self):
+        try:
+            stat = os.stat(self.filename)
+        except OSError:
+            raise MissingDataFileError(f"{self.kind.capitalize()} file not found: {self.filename}")
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def poll(self):
+        """
+        Apply any changes made to the file since the last poll
+
+        If any changed block fails to parse, nothing is applied and the
+        error is raised; the next poll tries again.
+
+        Returns: None if the file is unchanged, otherwise a dictionary with
+                 'added', 'removed' and 'changed' lists of record ids
+        Raises:
+            MissingDataFileError if the file was removed
+            InvalidDataFormatError if a changed block is malformed
+        """
+        fingerprint = self._current_fingerprint()
+        if fingerprint == self._fingerprint:
+            return None
+
+        id_field = self._parse_record.id_field
+        parse_text = self._parse_record.parse_text
+        old_hashes = self._block_hashes
+        new_hashes = {}
+        new_blocks = {}
+        updated = {}
+        with _gc_paused():
+            ids_by_hash = {}
+            if old_hashes is not None:
+                ids_by_hash = {block_hash: record_id for record_id, block_hash in old_hashes.items()}
+            for first_line, text in _iter_text_blocks(self.filename, self.kind):
+                block_hash = _text_digest(text)
+                # An unchanged block is matched by its hash alone; only new
+                # text has its id read
+                record_id = ids_by_hash.get(block_hash)
+                if record_id is None:
+                    record_id = _text_record_id(first_line, text, self.kind, id_field)
+                    if old_hashes is not None:
+                        new_blocks[block_hash] = (first_line, text)
+                    else:
+                        record = parse_text(first_line, text)
+                        if self.records.get(record_id) != record:
+                            updated[record_id] = record
+                        else:
+                            # A later block with a repeated id wins
+                            updated.pop(record_id, None)
+                new_hashes[record_id] = block_hash
+
+        if old_hashes is not None:
+            # Parse the last block of each id whose text changed
+            for record_id, block_hash in new_hashes.items():
+                if old_hashes.get(record_id) != block_hash:
+                    updated[record_id] = parse_text(*new_blocks[block_hash])
+
+        known = self.records if old_hashes is None else old_hashes
+        removed = [record_id for record_id in known if record_id not in new_hashes]
+        added = [record_id for record_id in updated if record_id not in known]
+        changed = [record_id for record_id in updated if record_id in known]
+
+        for record_id in removed:
+            self.records.pop(record_id, None)
+        self.records.update(updated)
+
+        self._block_hashes = new_hashes
+        self._fingerprint = fingerprint
+        return {"added": added, "removed": removed, "changed": changed}
+
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
 
 def parse_quest_block(lines):
     """
-    Parse a block of lines into a quest dictionary
+    Parse a block of lines into a quest record
     
     Args:
         lines: List of strings representing one quest
     
-    Returns: Dictionary with quest data
+    Returns: Quest record
     Raises: InvalidDataFormatError if parsing fails
     """
-    from custom_exceptions import InvalidDataFormatError
-
-    quest = {}
-    numeric_fields = ["REWARD_XP", "REWARD_GOLD", "REQUIRED_LEVEL"]
-
     try:
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue  # Skip empty lines
-
-            if ": " not in line:
-                raise InvalidDataFormatError(f"Line missing ': ': {line}")
-
-            key, value = line.split(": ", 1)
-            key = key.strip()
-            value = value.strip()
-
-            if key in numeric_fields:
-                try:
-                    quest[key.lower()] = int(value)
-                except ValueError:
-                    raise InvalidDataFormatError(f"Expected numeric value for {key}, got '{value}'")
-            else:
-                quest[key.lower()] = value
-
-        # Ensure all required fields exist
-        required_fields = ["quest_id", "title", "description", "reward_xp",
-                           "reward_gold", "required_level", "prerequisite"]
-        for field in required_fields:
-            if field not in quest:
-                raise InvalidDataFormatError(f"Missing required field: {field}")
-
+        return _parse_quest_record(_lines_to_block(lines))
     except Exception as e:
         raise InvalidDataFormatError(f"Error parsing quest block: {e}")
 
-    return quest
-
 def parse_item_block(lines):
     """
-    Parse a block of lines into an item dictionary
+    Parse a block of lines into an item record
     
     Args:
         lines: List of strings representing one item
     
-    Returns: Dictionary with item data
+    Returns: Item record
     Raises: InvalidDataFormatError if parsing fails
     """
-    from custom_exceptions import InvalidDataFormatError
-
-    item = {}
-    numeric_fields = ["COST"]
-    valid_types = ["weapon", "armor", "consumable"]
-
     try:
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue  # Skip empty lines
-
-            if ": " not in line:
-                raise InvalidDataFormatError(f"Line missing ': ': {line}")
-
-            key, value = line.split(": ", 1)
-            key = key.strip()
-            value = value.strip()
-
-            if key in numeric_fields:
-                try:
-                    item[key.lower()] = int(value)
-                except ValueError:
-                    raise InvalidDataFormatError(f"Expected numeric value for {key}, got '{value}'")
-            else:
-                item[key.lower()] = value
-
-        # Ensure all required fields exist
-        required_fields = ["item_id", "name", "type", "effect", "cost", "description"]
-        for field in required_fields:
-            if field not in item:
-                raise InvalidDataFormatError(f"Missing required field: {field}")
+        item = _parse_item_record(_lines_to_block(lines))
 
         # Validate item type
-        if item["type"].lower() not in valid_types:
+        if item["type"].lower() not in VALID_ITEM_TYPES:
             raise InvalidDataFormatError(f"Invalid item type: {item['type']}")
 
     except Exception as e:
@@ -326,6 +1229,439 @@ def parse_item_block(lines):
 
     return item
 
+def _lines_to_block(lines):
+    """Turn a list of line strings into the block format the parsers expect"""
+    return [
+        (line_number, None, line.strip())
+        for line_number, line in enumerate(lines, 1)
+        if line.strip()
+    ]
+
+def _iter_blocks(filename, kind):
+    """
+    Yield the raw blocks of a data file, one block at a time
+
+    A block is a run of non-blank lines. Each block is returned as a list
+    of (line_number, offset, line) tuples where offset is the byte offset
+    of the line in the file and line has its newline stripped.
+    """
+    if not os.path.exists(filename):
+        raise MissingDataFileError(f"{kind.capitalize()} file not found: {filename}")
+
+    try:
+        file = open(filename, "rb")
+    except OSError as e:
+        raise CorruptedDataError(f"Unable to read {kind} file: {e}")
+
+    with file:
+        block = []
+        line_number = 0
+        offset = 0
+        try:
+            for raw_line in file:
+                line_number += 1
+                if raw_line.isspace():
+                    if block:
+                        yield block
+                        block = []
+                else:
+                    try:
+                        line = raw_line.decode("utf-8").rstrip("\r\n")
+                    except UnicodeDecodeError as e:
+                        raise CorruptedDataError(
+                            f"Unreadable data in {kind} file on line {line_number}: {e}"
+                        )
+                    block.append((line_number, offset, line))
+                offset += len(raw_line)
+        except OSError as e:
+            raise CorruptedDataError(
+                f"Unable to read {kind} file after line {line_number}: {e}"
+            )
+
+        if block:
+            yield block
+
+
+# Bytes read at a time by _iter_text_blocks
+READ_CHUNK_BYTES = 1 << 22
+
+# Carriage returns at the end of a line (stripped like rstrip("\r\n"))
+_strip_line_end_cr = re.compile(r"\r+(?=\n)|\r+$").sub
+
+# A line starting with whitespace other than a newline. Text without one
+# (and without three newlines in a row) has no whitespace-only lines
+# except the single blank lines between blocks.
+_indented_line = re.compile(r"\n[^\S\n]").search
+
+
+def _iter_text_blocks(filename, kind, digest=None):
+    """
+    Yield the blocks of a data file as (first line number, text) pairs
+
+    For loading whole files: unlike _iter_blocks there are no byte offsets
+    and no per-line tuples. The file is read in large chunks that are
+    split into blocks with str.split, so there is no Python-level work
+    per line. Only blocks next to extra blank or whitespace-only lines go
+    through a per-line loop.
+
+    If digest is given it is updated with every chunk read, so once the
+    blocks are exhausted it holds the hash of the whole file.
+    """
+    if not os.path.exists(filename):
+        raise MissingDataFileError(f"{kind.capitalize()} file not found: {filename}")
+
+    try:
+        file = open(filename, "rb")
+    except OSError as e:
+        raise CorruptedDataError(f"Unable to read {kind} file: {e}")
+
+    with file:
+        line_number = 1  # first line of pending
+        pending = ""
+        tail = b""
+        while True:
+            try:
+                chunk = file.read(READ_CHUNK_BYTES)
+            except OSError as e:
+                raise CorruptedDataError(
+                    f"Unable to read {kind} file after line {line_number}: {e}"
+                )
+            if digest is not None:
+                digest.update(chunk)
+            data = tail + chunk
+            if chunk:
+                # Only decode whole lines; the rest waits for the next chunk
+                cut = data.rfind(b"\n") + 1
+                data, tail = data[:cut], data[cut:]
+            try:
+                text = data.decode("utf-8")
+            except UnicodeDecodeError as e:
+                bad_line = line_number + pending.count("\n") + data.count(b"\n", 0, e.start)
+                raise CorruptedDataError(
+                    f"Unreadable data in {kind} file on line {bad_line}: {e}"
+                )
+            if "\r" in text:
+                text = _strip_line_end_cr("", text)
+
+            text = pending + text
+            simple = not (text[:1].isspace() or "\n\n\n" in text or _indented_line(text))
+            pieces = text.split("\n\n")
+            # The last piece may continue in the next chunk
+            pending = pieces.pop() if chunk else ""
+            for piece in pieces:
+                if simple and piece and piece[0] != "\n" and piece[-1] != "\n":
+                    yield line_number, piece
+                else:
+                    lines = piece.split("\n")
+                    start = None
+                    for index, line in enumerate(lines):
+                        if line and not line.isspace():
+                            if start is None:
+                                start = index
+                        elif start is not None:
+                            yield line_number + start, "\n".join(lines[start:index])
+                            start = None
+                    if start is not None:
+                        yield line_number + start, "\n".join(lines[start:])
+                line_number += piece.count("\n") + 2
+            if not chunk:
+                return
+
+
+def _iter_records(filename, parse_record, digest=None):
+    """
+    Parse each block of a data file into a record as it is read
+
+    digest is passed on to _iter_text_blocks (parsers without lazy fields
+    only).
+    """
+    kind = parse_record.kind
+    if not parse_record.lazy_fields:
+        yield from starmap(parse_record.parse_text, _iter_text_blocks(filename, kind, digest))
+        return
+
+    # Deferred fields remember which version of the file they point into
+    if not os.path.exists(filename):
+        raise MissingDataFileError(f"{kind.capitalize()} file not found: {filename}")
+    stat = os.stat(filename)
+    text_source = (filename, stat.st_size, stat.st_mtime_ns)
+    for block in _iter_blocks(filename, kind):
+        yield parse_record(block, text_source)
+
+
+def _open_catalog(filename, parse_record):
+    """Return the open CatalogIndex for filename, reopening it if stale"""
+    key = (os.path.abspath(filename), parse_record.kind)
+    catalog = _open_catalogs.get(key)
+    if catalog is not None:
+        if catalog.is_current():
+            return catalog
+        # Not closed: callers may still hold it. It is closed once unused.
+        del _open_catalogs[key]
+
+    catalog = CatalogIndex(filename, parse_record)
+    _open_catalogs[key] = catalog
+    return catalog
+
+
+def _build_catalog_index(filename, kind, id_field):
+    """
+    Scan a data file once and record where each block starts and ends
+
+    Only the id line of each block is looked at; the other fields are
+    parsed later, when the record is actually requested. When an id is
+    defined more than once, the last block wins and the id keeps the
+    position of its first block, the same as the dicts load_quests and
+    load_items build.
+
+    Returns: Dictionary with the ids in file order, an 'order' array that
+             sorts them (for binary search), and arrays with the byte
+             start, byte end and first line number of each block
+    """
+    positions = {}
+    starts = array("q")
+    ends = array("q")
+    line_numbers = array("q")
+
+    for block in _iter_blocks(filename, kind):
+        record_id = _block_record_id(block, kind, id_field)
+        last_offset, last_line = block[-1][1], block[-1][2]
+        positions[record_id] = len(starts)
+        starts.append(block[0][1])
+        ends.append(last_offset + len(last_line.encode("utf-8")))
+        line_numbers.append(block[0][0])
+
+    ids = list(positions)
+    if len(ids) != len(starts):
+        keep = list(positions.values())
+        starts = array("q", (starts[position] for position in keep))
+        ends = array("q", (ends[position] for position in keep))
+        line_numbers = array("q", (line_numbers[position] for position in keep))
+
+    order = array("q", sorted(range(len(ids)), key=ids.__getitem__))
+    return {
+        "ids": ids,
+        "order": order,
+        "starts": starts,
+        "ends": ends,
+        "line_numbers": line_numbers,
+    }
+
+
+def _block_record_id(block, kind, id_field):
+    """Find the id of a block without parsing the rest of it"""
+    for _, _, line in block:
+        key, sep, value = line.partition(":")
+        if sep and key.strip().lower() == id_field:
+            return value.strip()
+    raise InvalidDataFormatError(
+        f"{kind.capitalize()} starting on line {block[0][0]} is missing '{id_field}'"
+    )
+
+
+def _text_record_id(first_line, text, kind, id_field):
+    """Find the id of a block given as text without parsing the rest of it"""
+    key, sep, value = text.partition("\n")[0].partition(":")
+    if sep and key.strip().lower() == id_field:
+        return value.strip()
+    block = list(zip(count(first_line), repeat(None), text.split("\n")))
+    return _block_record_id(block, kind, id_field)
+
+
+def _text_digest(text):
+    """Hash the text of a block so unchanged blocks can be skipped"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def _load_catalog(filename, parse_record, use_cache):
+    """
+    Build an id -> record dict, going through the compiled cache if allowed
+    """
+    kind = parse_record.kind
+    stat = digest = None
+    if use_cache:
+        records = _read_sidecar(filename, CACHE_SUFFIX, kind)
+        if records is not None:
+            return records
+        if os.path.exists(filename):
+            stat = os.stat(filename)
+            # Hashed while it is parsed, so writing the cache needs no second read
+            digest = _new_file_digest()
+
+    # Ids are never deferred, so they can be read straight off the record
+    get_id = attrgetter(parse_record.id_field)
+    if stat is None:
+        with _gc_paused():
+            return {get_id(record): record for record in _iter_records(filename, parse_record)}
+
+    # Going to the cache: also hash every block for CatalogWatcher
+    parse_text = parse_record.parse_text
+    records = {}
+    block_hashes = {}
+    with _gc_paused():
+        for first_line, text in _iter_text_blocks(filename, kind, digest):
+            record = parse_text(first_line, text)
+            record_id = get_id(record)
+            records[record_id] = record
+            block_hashes[record_id] = _text_digest(text)
+
+    digest = digest.hexdigest()
+    _write_sidecar(filename, HASHES_SUFFIX, f"{kind}_hashes", block_hashes, stat, digest)
+    _write_sidecar(filename, CACHE_SUFFIX, kind, records, stat, digest)
+    return records
+
+
+@contextmanager
+def _gc_paused():
+    """
+    Turn the cyclic garbage collector off for a bulk load
+
+    Every record built is kept, so collector passes during the load would
+    walk the growing dict over and over without freeing anything.
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def _is_shard_source(filename):
+    """Return True if filename names a shard directory or glob pattern"""
+    if os.path.isfile(filename):
+        # An existing file is never a pattern, even with [ or ? in its name
+        return False
+    return os.path.isdir(filename) or any(char in filename for char in "*?[")
+
+
+def _load_shards(source, kind, id_field, use_cache, max_workers, lazy_descriptions=False):
+    """
+    Load every shard file of a directory or glob and merge them
+
+    Each shard goes through the normal single-file loader (and its cache)
+    in a worker process. Results come back in sorted filename order, so the
+    merged dict is ordered the same way on every run.
+    """
+    if os.path.isdir(source):
+        paths = sorted(glob.glob(os.path.join(source, "*.txt")))
+    else:
+        paths = sorted(glob.glob(source))
+    if not paths:
+        raise MissingDataFileError(f"No {kind} files found for: {source}")
+
+    if len(paths) == 1 or max_workers == 1:
+        shards = [_load_shard(path, kind, use_cache, lazy_descriptions) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            shards = list(executor.map(
+                _load_shard, paths, repeat(kind), repeat(use_cache), repeat(lazy_descriptions)
+            ))
+
+    merged = {}
+    for path, shard in zip(paths, shards):
+        for record_id, record in shard.items():
+            if record_id in merged:
+                first_path = next(
+                    other for other, other_shard in zip(paths, shards)
+                    if record_id in other_shard
+                )
+                raise InvalidDataFormatError(
+                    f"Duplicate {id_field} '{record_id}' in {first_path} and {path}"
+                )
+            merged[record_id] = record
+    return merged
+
+
+def _load_shard(path, kind, use_cache, lazy_descriptions):
+    """Load one shard file (runs in a worker process)"""
+    if kind == "quest":
+        return load_quests(path, use_cache, lazy_descriptions=lazy_descriptions)
+    return load_items(path, use_cache, lazy_descriptions=lazy_descriptions)
+
+
+def _new_file_digest():
+    """Return an empty hash object of the kind sidecar headers store"""
+    return hashlib.blake2b(digest_size=16)
+
+
+def _file_digest(filename):
+    """Return a content hash of a file, read in chunks"""
+    digest = _new_file_digest()
+    with open(filename, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _read_sidecar(filename, suffix, kind):
+    """
+    Return the payload stored in filename + suffix, or None if the sidecar
+    is missing, unreadable or stale
+
+    The sidecar header stores the size, mtime and content hash of the text
+    file it was built from. Size and mtime are checked first; the hash is
+    only computed when the mtime moved, so a file that was touched but not
+    edited still hits the sidecar.
+    """
+    try:
+        stat = os.stat(filename)
+        with open(filename + suffix, "rb") as sidecar:
+            header = pickle.load(sidecar)
+            if (header.get("version") != CACHE_VERSION
+                    or header.get("kind") != kind
+                    or header.get("size") != stat.st_size):
+                return None
+            if header.get("mtime_ns") != stat.st_mtime_ns:
+                if header.get("digest") != _file_digest(filename):
+                    return None
+                # Same content under a new mtime: rewrite the header
+                with _gc_paused():
+                    payload = pickle.load(sidecar)
+                _write_sidecar(filename, suffix, kind, payload, stat, header["digest"])
+                return payload
+            with _gc_paused():
+                return pickle.load(sidecar)
+    except Exception:
+        return None
+
+
+def _write_sidecar(filename, suffix, kind, payload, stat, digest=None):
+    """
+    Write payload to the sidecar file filename + suffix
+
+    stat is the os.stat of the text file taken before it was parsed. If
+    the file changed while it was being parsed the sidecar is not written.
+
+    The header and the payload are two separate pickles so a stale sidecar
+    can be rejected without unpickling the whole payload. The file is
+    written to a temporary name and moved into place so a reader never
+    sees a half-written sidecar. Failing to write it is not an error.
+    """
+    sidecar_path = filename + suffix
+    temp_path = f"{sidecar_path}.{os.getpid()}.tmp"
+    try:
+        if digest is None:
+            digest = _file_digest(filename)
+        current = os.stat(filename)
+        if (current.st_size, current.st_mtime_ns) != (stat.st_size, stat.st_mtime_ns):
+            return
+        header = {
+            "version": CACHE_VERSION,
+            "kind": kind,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "digest": digest,
+        }
+        with open(temp_path, "wb") as sidecar:
+            pickle.dump(header, sidecar, pickle.HIGHEST_PROTOCOL)
+            pickle.dump(payload, sidecar, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, sidecar_path)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
 # ============================================================================
 # TESTING
 # ============================================================================
@@ -18,6 +18,7 @@ from custom_exceptions import (
 )
 
 MAX_INVENTORY_SIZE = 20
+VALID_STATS = frozenset(("health", "max_health", "strength", "magic"))
 
 # ============================================================================
 # INVENTORY MANAGEMENT
@@ -63,15 +64,19 @@ def use_item(character, item_id, item_data):
     item_info = item_data
     if item_info.get("type") != "consumable":
         raise InvalidItemTypeError(f"Item '{item_id}' is not a consumable.")
-    effect_str = item_info.get("effect", "")
-    if ":" not in effect_str:
-        raise InvalidItemTypeError(f"Item effect format invalid: '{effect_str}'")
-    stat_name, value_str = effect_str.split(":", 1)
-    stat_name = stat_name.strip().lower()
-    try:
-        value = int(value_str.strip())
-    except ValueError:
-        raise InvalidItemTypeError(f"Effect value is not an integer: '{value_str}'")
+    effect = getattr(item_info, "effect_stats", None)
+    if effect is None:
+        effect_str = item_info.get("effect", "")
+        if ":" not in effect_str:
+            raise InvalidItemTypeError(f"Item effect format invalid: '{effect_str}'")
+        stat_name, value_str = effect_str.split(":", 1)
+        stat_name = stat_name.strip().lower()
+        try:
+            value = int(value_str.strip())
+        except ValueError:
+            raise InvalidItemTypeError(f"Effect value is not an integer: '{value_str}'")
+    else:
+        stat_name, value = effect
     if stat_name not in character:
         raise InvalidItemTypeError(f"Character has no stat '{stat_name}'")
     if stat_name == "health":
@@ -97,12 +102,12 @@ def equip_weapon(character, item_id, item_data):
         old_weapon_id = character["equipped_weapon"]
         old_weapon_info = item_data if old_weapon_id == item_id else {}
         if old_weapon_info:
-            stat, val = parse_item_effect(old_weapon_info.get("effect", ""))
+            stat, val = get_item_effect(old_weapon_info)
             if stat in character:
                 character[stat] -= val
         character["inventory"].append(old_weapon_id)
         result_msg += f"Unequipped {old_weapon_info.get('name', old_weapon_id)}. "
-    stat, val = parse_item_effect(item_info.get("effect", ""))
+    stat, val = get_item_effect(item_info)
     if stat in character:
         character[stat] += val
     character["equipped_weapon"] = item_id
@@ -121,12 +126,12 @@ def equip_armor(character, item_id, item_data):
         old_armor = character["equipped_armor"]
         old_info = item_data if old_armor == item_id else {}
         if old_info:
-            stat, val = parse_item_effect(old_info.get("effect", ""))
+            stat, val = get_item_effect(old_info)
             if stat in character:
                 character[stat] -= val
         character["inventory"].append(old_armor)
         result_msg += f"Unequipped {old_info.get('name', old_armor)}. "
-    stat, val = parse_item_effect(item_info.get("effect", ""))
+    stat, val = get_item_effect(item_info)
     if stat in character:
         character[stat] += val
     character["equipped_armor"] = item_id
@@ -141,7 +146,7 @@ def unequip_weapon(character, item_data=None, max_inventory_size=MAX_INVENTORY_S
     if len(character.get("inventory", [])) >= max_inventory_size:
         raise InventoryFullError("Cannot unequip weapon: inventory is full.")
     if item_data:
-        stat, val = parse_item_effect(item_data.get("effect", ""))
+        stat, val = get_item_effect(item_data)
         if stat in character:
             character[stat] -= val
     character.setdefault("inventory", []).append(weapon)
@@ -155,7 +160,7 @@ def unequip_armor(character, item_data=None, max_inventory_size=MAX_INVENTORY_SI
     if len(character.get("inventory", [])) >= max_inventory_size:
         raise InventoryFullError("Cannot unequip armor: inventory is full.")
     if item_data:
-        stat, val = parse_item_effect(item_data.get("effect", ""))
+        stat, val = get_item_effect(item_data)
         if stat in character:
             character[stat] -= val
     character.setdefault("inventory", []).append(armor)
@@ -195,8 +200,16 @@ def parse_item_effect(effect_string):
     except Exception as e:
         raise ValueError(f"Invalid effect string '{effect_string}': {e}")
 
+# Items loaded by game_data carry their effect already parsed as (stat, value);
+# plain dictionaries have the effect string parsed here.
+def get_item_effect(item_data):
+    effect = getattr(item_data, "effect_stats", None)
+    if effect is not None:
+        return effect
+    return parse_item_effect(item_data.get("effect", ""))
+
 def apply_stat_effect(character, stat_name, value):
-    if stat_name not in ["health", "max_health", "strength", "magic"]:
+    if stat_name not in VALID_STATS:
         raise ValueError(f"Invalid stat name: {stat_name}")
     character[stat_name] += value
     if stat_name == "health":
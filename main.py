@@ -30,6 +30,14 @@ all_quests = {}
 all_items = {}
 game_running = False
 
+QUESTS_FILE = "data/quests.txt"
+ITEMS_FILE = "data/items.txt"
+CLASSES_FILE = "data/classes.txt"
+
+# Watchers that keep all_quests/all_items in sync with the data files
+quest_watcher = None
+item_watcher = None
+
 # ============================================================================
 # MAIN MENU
 # ============================================================================
@@ -74,19 +82,18 @@ def new_game():
     name = input("Enter your character's name: ").strip()
 
     # Get character class
+    classes = character_manager.list_character_classes()
     while True:
         print("Choose your class:")
-        print("1. Warrior")
-        print("2. Mage")
-        print("3. Rogue")
-        print("4. Cleric")
+        for number, class_name in enumerate(classes, 1):
+            print(f"{number}. {class_name}")
         class_choice = input("Enter the number corresponding to your class: ").strip()
-        class_map = {"1": "Warrior", "2": "Mage", "3": "Rogue", "4": "Cleric"}
+        class_map = {str(number): class_name for number, class_name in enumerate(classes, 1)}
         if class_choice in class_map:
             char_class = class_map[class_choice]
             break
         else:
-            print("Invalid choice. Please enter a number between 1 and 4.")
+            print(f"Invalid choice. Please enter a number between 1 and {len(classes)}.")
 
     # Create character (handle exceptions if needed)
     try:
@@ -108,16 +115,21 @@ def load_game():
     """
     global current_character
 
-    # Get list of saved characters
-    saved_characters = character_manager.list_saved_characters()
+    # Get list of saved characters (from the save manifest, so no save
+    # file has to be opened to show class and level)
+    saved_entries = character_manager.list_characters()
+    saved_characters = [entry["name"] for entry in saved_entries]
     if not saved_characters:
         print("No saved characters found.")
         return
 
     # Display saved characters
     print("\nSaved Characters:")
-    for idx, char_name in enumerate(saved_characters, 1):
-        print(f"{idx}. {char_name}")
+    for idx, entry in enumerate(saved_entries, 1):
+        if entry["class"] is None:
+            print(f"{idx}. {entry['name']}")
+        else:
+            print(f"{idx}. {entry['name']} - Level {entry['level']} {entry['class']}")
 
     # Get user choice
     while True:
@@ -156,6 +168,9 @@ def game_loop():
     game_running = True
 
     while game_running:
+        # Pick up any edits to the data files
+        reload_game_data()
+
         # Display game menu
         print("\n=== Game Menu ===")
         print("1. View Character")
@@ -182,12 +197,13 @@ def game_loop():
         elif choice == "5":
             # Save character
             try:
-                character_manager.save_character(current_character)
-                print(f"Character '{current_character['name']}' saved successfully.")
+                character_manager.save_character_async(current_character)
+                print(f"Character '{current_character['name']}' queued for saving.")
             except Exception as e:
                 print(f"Error saving character: {e}")
         elif choice == "6":
             print("Exiting to main menu...")
+            report_save_errors()
             game_running = False
         else:
             print("Invalid choice. Please enter a number between 1 and 6.")
@@ -496,69 +512,57 @@ def save_game():
         return
 
     try:
-        character_manager.save_character(current_character)
-        print(f"Game saved successfully for '{current_character.get('name', 'Unknown')}'.")
+        # Written in the background so the player never waits on the disk
+        character_manager.save_character_async(current_character)
+        print(f"Game queued for saving for '{current_character.get('name', 'Unknown')}'.")
     except Exception as e:
         print(f"Error saving game: {e}")
 
-def load_game_data():
-    """Shop menu for buying/selling items"""
-    global current_character, all_items
-
-    if not current_character:
-        print("No character loaded.")
-        return
-
-    while True:
-        print("\n=== Shop ===")
-        print(f"Gold: {current_character.get('gold', 0)}")
-        print("Available items:")
+def report_save_errors():
+    """Wait for background saves to finish and report any that failed"""
+    for name, error in character_manager.flush_saves().items():
+        print(f"Error saving character '{name}': {error}")
 
-        # Display all items for purchase
-        for item_id, info in all_items.items():
-            cost = info.get("cost", 0)
-            name = info.get("name", item_id)
-            print(f"- {name} (ID: {item_id}) - {cost} gold")
-
-        print("\nOptions:")
-        print("1. Buy Item")
-        print("2. Sell Item")
-        print("3. Exit Shop")
+def load_game_data():
+    """
+    Load all quest and item data from files
 
-        choice = input("Enter your choice (1-3): ").strip()
+    Also starts watching both files so edits made while the game is
+    running can be picked up by reload_game_data().
 
-        if choice == "1":
-            item_id = input("Enter the ID of the item to buy: ").strip()
-            try:
-                inventory_system.purchase_item(current_character, item_id, all_items)
-                print(f"Purchased {all_items[item_id].get('name', item_id)}!")
-            except (inventory_system.InsufficientResourcesError, inventory_system.InventoryFullError) as e:
-                print(f"Cannot purchase item: {e}")
-            except KeyError:
-                print(f"Item '{item_id}' does not exist.")
+    Raises:
+        MissingDataFileError if files not found
+        InvalidDataFormatError if data format incorrect
+    """
+    global all_quests, all_items, quest_watcher, item_watcher
 
-        elif choice == "2":
-            if not current_character.get("inventory"):
-                print("Your inventory is empty. Nothing to sell.")
-                continue
+    all_quests = game_data.load_quests(QUESTS_FILE)
+    all_items = game_data.load_items(ITEMS_FILE)
+    character_manager.load_class_templates(CLASSES_FILE)
 
-            print("\nYour inventory:")
-            inventory_system.display_inventory(current_character, all_items)
+    quest_watcher = game_data.CatalogWatcher(QUESTS_FILE, "quest", all_quests)
+    item_watcher = game_data.CatalogWatcher(ITEMS_FILE, "item", all_items)
 
-            item_id = input("Enter the ID of the item to sell: ").strip()
-            try:
-                gold_received = inventory_system.sell_item(current_character, item_id, all_items)
-                print(f"Sold {item_id} for {gold_received} gold.")
-            except inventory_system.ItemNotFoundError as e:
-                print(f"Cannot sell item: {e}")
-            except KeyError:
-                print(f"Item '{item_id}' does not exist.")
+def reload_game_data():
+    """
+    Apply changes made to the data files since they were loaded
 
-        elif choice == "3":
-            print("Exiting shop...")
-            break
-        else:
-            print("Invalid choice. Enter 1, 2, or 3.")
+    Only the quests and items that changed are re-parsed; all_quests and
+    all_items are updated in place.
+    """
+    for label, watcher in (("quests", quest_watcher), ("items", item_watcher)):
+        if watcher is None:
+            continue
+        try:
+            changes = watcher.poll()
+        except (MissingDataFileError, InvalidDataFormatError, CorruptedDataError) as e:
+            print(f"Could not reload {label}: {e}")
+            continue
+        if changes:
+            print(
+                f"Reloaded {label}: {len(changes['added'])} added, "
+                f"{len(changes['changed'])} changed, {len(changes['removed'])} removed."
+            )
 
 def handle_character_death():
     """Handle character death"""
@@ -638,6 +642,8 @@ def main():
             load_game()
         elif choice == 3:
             print("\nThanks for playing Quest Chronicles!")
+            report_save_errors()
+            character_manager.close_save_stores()
             break
         else:
             print("Invalid choice. Please select 1-3.")
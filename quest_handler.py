@@ -343,12 +343,22 @@ def get_quest_completion_percentage(character, quest_data_dict):
     percentage = (completed_quests / total_quests) * 100
     return round(percentage, 2)  # Round to 2 decimal places for clarity
 
-def get_total_quest_rewards_earned(character, quest_data_dict):
+def get_total_quest_rewards_earned(character, quest_data_dict, columns=None):
     """
     Calculate total XP and gold earned from completed quests
+
+    If columns (from game_data.build_quest_columns) is given, the totals
+    are summed over its reward columns instead of quest by quest.
     
     Returns: Dictionary with 'total_xp' and 'total_gold'
     """
+    if columns is not None:
+        completed_quests = character.get("completed_quests", [])
+        return {
+            "total_xp": columns.total("reward_xp", completed_quests),
+            "total_gold": columns.total("reward_gold", completed_quests),
+        }
+
     total_xp = 0
     total_gold = 0
 
@@ -362,12 +372,19 @@ def get_total_quest_rewards_earned(character, quest_data_dict):
 
     return {"total_xp": total_xp, "total_gold": total_gold}
 
-def get_quests_by_level(quest_data_dict, min_level, max_level):
+def get_quests_by_level(quest_data_dict, min_level, max_level, columns=None):
     """
     Get all quests within a level range
+
+    If columns (from game_data.build_quest_columns) is given, the range
+    filter runs over its required_level column.
     
     Returns: List of quest dictionaries
     """
+    if columns is not None:
+        quest_ids = columns.select_range("required_level", min_level, max_level)
+        return [quest_data_dict[quest_id] for quest_id in quest_ids]
+
     filtered_quests = []
 
     for quest_id, quest_info in quest_data_dict.items():
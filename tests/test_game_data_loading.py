@@ -0,0 +1,493 @@
+"""
+Test Game Data Loading
+Tests streaming, caching and catalog features of the game_data module
+"""
+
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import game_data
+import quest_handler
+import inventory_system
+from custom_exceptions import (
+    InvalidDataFormatError,
+    CorruptedDataError,
+    QuestNotFoundError,
+    InvalidItemTypeError
+)
+
+QUEST_TEXT = (
+    "QUEST_ID: first_quest\n"
+    "TITLE: First Quest\n"
+    "DESCRIPTION: The very first quest\n"
+    "REWARD_XP: 50\n"
+    "REWARD_GOLD: 25\n"
+    "REQUIRED_LEVEL: 1\n"
+    "PREREQUISITE: NONE\n"
+    "\n"
+    "QUEST_ID: second_quest\n"
+    "TITLE: Second Quest\n"
+    "DESCRIPTION: Follows the first quest\n"
+    "REWARD_XP: 100\n"
+    "REWARD_GOLD: 75\n"
+    "REQUIRED_LEVEL: 2\n"
+    "PREREQUISITE: first_quest\n"
+)
+
+# ============================================================================
+# STREAMING LOADER TESTS
+# ============================================================================
+
+def test_iter_quests_streams_records(tmp_path):
+    """Test that iter_quests yields one parsed quest at a time"""
+    path = tmp_path / "quests.txt"
+    path.write_text(QUEST_TEXT)
+
+    stream = game_data.iter_quests(str(path))
+    first = next(stream)
+    assert first["quest_id"] == "first_quest"
+    assert first["reward_xp"] == 50
+
+    rest = list(stream)
+    assert [q["quest_id"] for q in rest] == ["second_quest"]
+
+def test_streaming_errors_include_line_number(tmp_path):
+    """Test that format errors report the offending line"""
+    path = tmp_path / "quests.txt"
+    path.write_text(QUEST_TEXT.replace("REWARD_GOLD: 75", "REWARD_GOLD: lots"))
+
+    with pytest.raises(InvalidDataFormatError, match="line 13"):
+        game_data.load_quests(str(path))
+
+def test_irregular_layout_loads_the_same(tmp_path):
+    """Test that CRLF endings, extra blank lines and reordered keys still parse"""
+    first, second = QUEST_TEXT.split("\n\n")
+    second_lines = second.splitlines()
+    second_lines[1], second_lines[2] = second_lines[2], second_lines[1]
+    messy = "\n  \n" + first.replace("\n", "\r\n") + "\r\n \t\n\n\n" + "\n".join(second_lines)
+    clean_path = tmp_path / "clean.txt"
+    clean_path.write_text(QUEST_TEXT)
+    messy_path = tmp_path / "messy.txt"
+    messy_path.write_bytes(messy.encode())
+
+    clean = game_data.load_quests(str(clean_path), use_cache=False)
+    assert game_data.load_quests(str(messy_path), use_cache=False) == clean
+
+    messy_path.write_bytes(messy.replace("REWARD_GOLD: 75", "REWARD_GOLD: lots").encode())
+    with pytest.raises(InvalidDataFormatError, match="line 17"):
+        game_data.load_quests(str(messy_path), use_cache=False)
+
+def test_undecodable_file_is_corrupted(tmp_path):
+    """Test that binary garbage raises CorruptedDataError"""
+    path = tmp_path / "items.txt"
+    path.write_bytes(b"ITEM_ID: \xff\xfe\n")
+
+    with pytest.raises(CorruptedDataError, match="line 1"):
+        game_data.load_items(str(path))
+
+# ============================================================================
+# COMPILED CACHE TESTS
+# ============================================================================
+
+def test_second_load_comes_from_cache(tmp_path, monkeypatch):
+    """Test that an unchanged file is not re-parsed"""
+    path = tmp_path / "quests.txt"
+    path.write_text(QUEST_TEXT)
+
+    first = game_data.load_quests(str(path))
+    assert os.path.exists(str(path) + game_data.CACHE_SUFFIX)
+
+    def fail_parse(*args):
+        raise AssertionError("text file should not be parsed again")
+
+    monkeypatch.setattr(game_data, "_iter_records", fail_parse)
+    assert game_data.load_quests(str(path)) == first
+
+def test_first_load_reads_file_once(tmp_path, monkeypatch):
+    """Test that writing the cache reuses the hash taken while parsing"""
+    path = tmp_path / "quests.txt"
+    path.write_text(QUEST_TEXT)
+
+    def fail_digest(filename):
+        raise AssertionError("file should not be read again to hash it")
+
+    monkeypatch.setattr(game_data, "_file_digest", fail_digest)
+    first = game_data.load_quests(str(path))
+    monkeypatch.undo()
+
+    os.utime(path)  # new mtime, same content: the stored hash is checked
+    assert game_data.load_quests(str(path)) == first
+    with open(str(path) + game_data.CACHE_SUFFIX, "rb") as sidecar:
+        header = game_data.pickle.load(sidecar)
+    assert header["digest"] == game_data._file_digest(str(path))
+
+def test_stale_cache_is_rebuilt(tmp_path):
+    """Test that editing the text file invalidates the cache"""
+    path = tmp_path / "quests.txt"
+    path.write_text(QUEST_TEXT)
+    game_data.load_quests(str(path))
+
+    path.write_text(QUEST_TEXT.replace("REWARD_XP: 100", "REWARD_XP: 999"))
+    quests = game_data.load_quests(str(path))
+    assert quests["second_quest"]["reward_xp"] == 999
+
+# ============================================================================
+# INDEXED CATALOG TESTS
+# ============================================================================
+
+def test_quest_catalog_matches_load_quests(tmp_path):
+    """Test that the indexed catalog acts like the loaded dict"""
+    path = tmp_path / "quests.txt"
+    path.write_text(QUEST_TEXT)
+
+    catalog = game_data.open_quest_catalog(str(path))
+    loaded = game_data.load_quests(str(path), use_cache=False)
+
+    assert list(catalog) == list(loaded)
+    assert "second_quest" in catalog
+    assert "missing_quest" not in catalog
+    assert catalog["second_quest"] == loaded["second_quest"]
+    assert game_data.get_quest("first_quest", str(path))["reward_gold"] == 25
+
+    with pytest.raises(QuestNotFoundError):
+        game_data.get_quest("missing_quest", str(path))
+
+def test_quest_catalog_reopens_changed_file(tmp_path):
+    """Test that get_quest sees edits made after the catalog was opened"""
+    path = tmp_path / "quests.txt"
+    path.write_text(QUEST_TEXT)
+    assert game_data.get_quest("first_quest", str(path))["title"] == "First Quest"
+
+    path.write_text(QUEST_TEXT.replace("TITLE: First Quest", "TITLE: Renamed Quest"))
+    assert game_data.get_quest("first_quest", str(path))["title"] == "Renamed Quest"
+
+def test_catalog_duplicate_ids_match_load_quests(tmp_path):
+    """Test that a repeated quest id is counted once and the last block wins"""
+    path = tmp_path / "quests.txt"
+    path.write_text(QUEST_TEXT + "\n\n" + QUEST_TEXT.split("\n\n")[0].replace("First Quest", "Second Copy"))
+
+    catalog = game_data.open_quest_catalog(str(path))
+    loaded = game_data.load_quests(str(path), use_cache=False)
+    assert len(catalog) == len(loaded) == 2
+    assert list(catalog) == list(loaded)
+    assert catalog["first_quest"]["title"] == loaded["first_quest"]["title"] == "Second Copy"
+
+def test_held_catalog_after_file_changes(tmp_path):
+    """Test that a held catalog keeps working or fails cleanly after an edit"""
+    path = tmp_path / "quests.txt"
+    path.write_text(QUEST_TEXT)
+    held = game_data.open_quest_catalog(str(path))
+    assert held["first_quest"]["title"] == "First Quest"
+    assert held.get(5) is None and 5 not in held
+
+    path.write_text(QUEST_TEXT.replace("TITLE: First Quest", "TITLE: Renamed Quest"))
+    assert game_data.get_quest("first_quest", str(path))["title"] == "Renamed Quest"
+
+    assert held["first_quest"]["title"] == "First Quest"
+    assert "second_quest" in held
+    with pytest.raises(CorruptedDataError):
+        held["second_quest"]
+
+# ============================================================================
+# SCHEMA PARSER TESTS
+# ============================================================================
+
+def test_block_parser_and_loader_agree(tmp_path):
+    """Test that parse_quest_block and load_quests share one parser"""
+    lines = QUEST_TEXT.split("\n\n")[0].split("\n")
+    lines[1] = "TITLE:First Quest"  # no space after the colon
+    path = tmp_path / "quests.txt"
+    path.write_text("\n".join(lines) + "\n")
+
+    from_block = game_data.parse_quest_block(lines)
+    from_file = game_data.load_quests(str(path), use_cache=False)["first_quest"]
+    assert from_block == from_file
+    assert from_block["title"] == "First Quest"
+
+def test_loader_requires_schema_fields(tmp_path):
+    """Test that load_quests rejects a quest missing a required field"""
+    path = tmp_path / "quests.txt"
+    path.write_text(QUEST_TEXT.replace("TITLE: Second Quest\n", ""))
+
+    with pytest.raises(InvalidDataFormatError, match="title"):
+        game_data.load_quests(str(path))
+
+# ============================================================================
+# SHARDED CATALOG TESTS
+# ============================================================================
+
+def test_load_quests_from_shard_directory(tmp_path):
+    """Test that a directory of shards is merged in filename order"""
+    first, second = QUEST_TEXT.split("\n\n")
+    (tmp_path / "b.txt").write_text(first + "\n")
+    (tmp_path / "a.txt").write_text(second)
+
+    quests = game_data.load_quests(str(tmp_path), use_cache=False)
+    assert list(quests) == ["second_quest", "first_quest"]
+
+def test_file_name_with_pattern_characters(tmp_path):
+    """Test that an existing file is loaded even if its name looks like a glob"""
+    path = tmp_path / "quests[v2].txt"
+    path.write_text(QUEST_TEXT)
+    assert set(game_data.load_quests(str(path), use_cache=False)) == {"first_quest", "second_quest"}
+
+def test_duplicate_ids_across_shards(tmp_path):
+    """Test that the same quest_id in two shards is rejected"""
+    (tmp_path / "a.txt").write_text(QUEST_TEXT)
+    (tmp_path / "b.txt").write_text(QUEST_TEXT.split("\n\n")[0] + "\n")
+
+    with pytest.raises(InvalidDataFormatError, match="Duplicate quest_id 'first_quest'"):
+        game_data.load_quests(str(tmp_path / "*.txt"), use_cache=False)
+
+# ============================================================================
+# HOT RELOAD TESTS
+# ============================================================================
+
+def test_catalog_watcher_patches_live_dict(tmp_path):
+    """Test that poll() applies only the changed quests in place"""
+    path = tmp_path / "quests.txt"
+    path.write_text(QUEST_TEXT)
+    quests = game_data.load_quests(str(path), use_cache=False)
+    untouched = quests["first_quest"]
+
+    watcher = game_data.CatalogWatcher(str(path), "quest", quests)
+    assert watcher.poll() is None
+
+    new_quest = QUEST_TEXT.split("\n\n")[1].replace("second_quest", "third_quest")
+    edited = QUEST_TEXT.replace("REWARD_XP: 50", "REWARD_XP: 60").split("\n\n")[0]
+    path.write_text(edited + "\n\n" + new_quest)
+
+    changes = watcher.poll()
+    assert changes == {"added": ["third_quest"], "removed": ["second_quest"], "changed": ["first_quest"]}
+    assert quests["first_quest"]["reward_xp"] == 60
+    assert quests["first_quest"] is not untouched
+    assert set(quests) == {"first_quest", "third_quest"}
+
+    # Later polls compare block hashes
+    path.write_text(edited.replace("REWARD_XP: 60", "REWARD_XP: 70") + "\n\n" + new_quest)
+    os.utime(path, ns=(0, 0))
+    assert watcher.poll() == {"added": [], "removed": [], "changed": ["first_quest"]}
+    assert quests["first_quest"]["reward_xp"] == 70
+
+def test_first_poll_uses_cached_block_hashes(tmp_path, monkeypatch):
+    """Test that a watcher over a cached load parses only the edited block"""
+    path = tmp_path / "quests.txt"
+    path.write_text(QUEST_TEXT)
+    quests = game_data.load_quests(str(path))
+    watcher = game_data.CatalogWatcher(str(path), "quest", quests)
+
+    parsed = []
+    parse_text = game_data._parse_quest_record.parse_text
+
+    def counting_parse(first_line, text):
+        parsed.append(first_line)
+        return parse_text(first_line, text)
+
+    monkeypatch.setattr(game_data._parse_quest_record, "parse_text", counting_parse)
+    path.write_text(QUEST_TEXT.replace("REWARD_XP: 100", "REWARD_XP: 150"))
+    assert watcher.poll() == {"added": [], "removed": [], "changed": ["second_quest"]}
+    assert parsed == [9]
+    assert quests["second_quest"]["reward_xp"] == 150
+
+def test_catalog_watcher_does_not_read_file_at_start(tmp_path, monkeypatch):
+    """Test that watching a loaded dict does not re-read the data file"""
+    path = tmp_path / "quests.txt"
+    path.write_text(QUEST_TEXT)
+    quests = game_data.load_quests(str(path), use_cache=False)
+
+    def fail(*args):
+        raise AssertionError("data file was read")
+
+    monkeypatch.setattr(game_data, "_iter_blocks", fail)
+    monkeypatch.setattr(game_data, "_iter_text_blocks", fail)
+    watcher = game_data.CatalogWatcher(str(path), "quest", quests)
+    assert watcher.poll() is None
+
+# ============================================================================
+# RECORD TYPE TESTS
+# ============================================================================
+
+def test_quest_records_act_like_dicts(tmp_path):
+    """Test that loaded Quest records support the dict operations callers use"""
+    path = tmp_path / "quests.txt"
+    path.write_text(QUEST_TEXT)
+    quest = game_data.load_quests(str(path), use_cache=False)["second_quest"]
+
+    assert isinstance(quest, game_data.Quest)
+    assert quest["reward_gold"] == 75
+    assert quest.get("missing_field", "default") == "default"
+    assert "prerequisite" in quest
+    assert dict(quest)["title"] == "Second Quest"
+    assert game_data.validate_quest_data(quest)
+
+def test_repeated_values_are_interned(tmp_path):
+    """Test that prerequisites share the string object of the quest id"""
+    path = tmp_path / "quests.txt"
+    path.write_text(QUEST_TEXT)
+    quests = game_data.load_quests(str(path), use_cache=False)
+
+    assert quests["second_quest"]["prerequisite"] is quests["first_quest"]["quest_id"]
+
+# ============================================================================
+# COLUMNAR VIEW TESTS
+# ============================================================================
+
+def test_quest_columns_match_record_loops():
+    """Test that columnar filters and sums agree with the per-quest loops"""
+    quests = game_data.load_quests("data/quests.txt")
+    columns = game_data.build_quest_columns(quests)
+    character = {"completed_quests": ["first_steps", "goblin_hunter", "not_a_quest"]}
+
+    assert len(columns) == len(quests)
+    assert (quest_handler.get_quests_by_level(quests, 2, 3, columns)
+            == quest_handler.get_quests_by_level(quests, 2, 3))
+    assert (quest_handler.get_total_quest_rewards_earned(character, quests, columns)
+            == quest_handler.get_total_quest_rewards_earned(character, quests))
+    assert columns.total("reward_gold") == sum(q["reward_gold"] for q in quests.values())
+
+# ============================================================================
+# CATALOG VALIDATION TESTS
+# ============================================================================
+
+def test_validate_catalog_passes_loaded_data():
+    """Test that the shipped data files validate cleanly"""
+    assert game_data.validate_catalog(game_data.load_quests("data/quests.txt"), "quest") == []
+    assert game_data.validate_catalog(game_data.load_items("data/items.txt"), "item") == []
+
+def test_validate_catalog_collects_every_error():
+    """Test that fail_fast=False reports each bad record with its id"""
+    items = dict(game_data.load_items("data/items.txt"))
+    items["bad_type"] = dict(items["iron_sword"], item_id="bad_type", type="shield")
+    items["bad_cost"] = dict(items["iron_sword"], item_id="bad_cost", cost="free")
+
+    errors = game_data.validate_catalog(items, "item", fail_fast=False)
+    assert [record_id for record_id, _ in errors] == ["bad_type", "bad_cost"]
+
+    with pytest.raises(InvalidDataFormatError, match="bad_type"):
+        game_data.validate_catalog(items, "item")
+
+# ============================================================================
+# DEFERRED DESCRIPTION TESTS
+# ============================================================================
+
+def test_lazy_descriptions_load_on_first_access(tmp_path):
+    """Test that descriptions are read from the file only when accessed"""
+    path = tmp_path / "quests.txt"
+    path.write_text(QUEST_TEXT)
+    quests = game_data.load_quests(str(path), lazy_descriptions=True)
+    quest = quests["second_quest"]
+
+    assert isinstance(quest.description, game_data.LazyText)
+    assert quest["reward_xp"] == 100
+    assert game_data.validate_catalog(quests, "quest") == []
+    assert isinstance(quest.description, game_data.LazyText)
+
+    assert quest["description"] == "Follows the first quest"
+    assert quest.description == "Follows the first quest"
+
+def test_lazy_description_of_changed_file(tmp_path):
+    """Test that a deferred field is not read from an edited file"""
+    path = tmp_path / "quests.txt"
+    path.write_text(QUEST_TEXT)
+    quests = game_data.load_quests(str(path), lazy_descriptions=True)
+
+    path.write_text("QUEST_ID: replaced\n" + QUEST_TEXT)
+    with pytest.raises(CorruptedDataError):
+        quests["first_quest"]["description"]
+
+# ============================================================================
+# PRE-PARSED EFFECT TESTS
+# ============================================================================
+
+ITEM_TEXT = (
+    "ITEM_ID: potion\n"
+    "NAME: Potion\n"
+    "TYPE: consumable\n"
+    "EFFECT: health:20\n"
+    "COST: 25\n"
+    "DESCRIPTION: Restores health\n"
+    "\n"
+    "ITEM_ID: sword\n"
+    "NAME: Sword\n"
+    "TYPE: weapon\n"
+    "EFFECT: Strength : 5\n"
+    "COST: 50\n"
+    "DESCRIPTION: A sword\n"
+)
+
+def test_item_effects_parsed_at_load(tmp_path):
+    """Test that loaded items carry their effect as a (stat, value) tuple"""
+    path = tmp_path / "items.txt"
+    path.write_text(ITEM_TEXT)
+    items = game_data.load_items(str(path))
+
+    assert items["potion"].effect_stats == ("health", 20)
+    assert items["sword"].effect_stats == ("strength", 5)
+    assert items["potion"]["effect"] == "health:20"
+    assert "effect_stats" not in items["potion"]
+
+    # Reloading from the cache rebuilds the parsed effect
+    cached = game_data.load_items(str(path))
+    assert cached["sword"].effect_stats == ("strength", 5)
+
+    items["sword"]["effect"] = "magic:3"
+    assert items["sword"].effect_stats == ("magic", 3)
+    items["sword"]["effect"] = "broken"
+    assert items["sword"].effect_stats is None
+
+def test_inventory_uses_parsed_effects(tmp_path):
+    """Test that equip, unequip and use read the pre-parsed effect"""
+    path = tmp_path / "items.txt"
+    path.write_text(ITEM_TEXT)
+    items = game_data.load_items(str(path))
+    character = {"name": "Hero", "health": 50, "max_health": 100,
+                 "strength": 10, "inventory": ["potion", "sword"]}
+
+    inventory_system.equip_weapon(character, "sword", items["sword"])
+    assert character["strength"] == 15
+    inventory_system.unequip_weapon(character, items["sword"])
+    assert character["strength"] == 10
+
+    inventory_system.use_item(character, "potion", items["potion"])
+    assert character["health"] == 70
+
+def test_malformed_effect_still_rejected(tmp_path):
+    """Test that a record with a malformed effect falls back to the old errors"""
+    path = tmp_path / "items.txt"
+    path.write_text(ITEM_TEXT.replace("health:20", "health:lots"))
+    items = game_data.load_items(str(path))
+    character = {"name": "Hero", "health": 50, "max_health": 100, "inventory": ["potion"]}
+
+    assert items["potion"].effect_stats is None
+    with pytest.raises(InvalidItemTypeError):
+        inventory_system.use_item(character, "potion", items["potion"])
+
+# ============================================================================
+# SYNTHETIC DATA TESTS
+# ============================================================================
+
+def test_generated_catalogs_load_and_validate(tmp_path):
+    """Test that the benchmark data generator writes valid, loadable files"""
+    import benchmarks
+
+    quests_path = benchmarks.generate_quests_file(str(tmp_path / "quests.txt"), 300)
+    items_path = benchmarks.generate_items_file(str(tmp_path / "items.txt"), 300)
+    quests = game_data.load_quests(quests_path, use_cache=False)
+    items = game_data.load_items(items_path, use_cache=False)
+
+    assert len(quests) == 300 and len(items) == 300
+    assert game_data.validate_catalog(quests, "quest") == []
+    assert game_data.validate_catalog(items, "item") == []
+
+    # Prerequisites point at earlier quests that are not higher level
+    for quest_id, quest in quests.items():
+        prerequisite = quest["prerequisite"]
+        if prerequisite != "NONE":
+            assert int(prerequisite.split("_")[1]) < int(quest_id.split("_")[1])
+            assert quests[prerequisite]["required_level"] <= quest["required_level"]
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -14,6 +14,7 @@ import inventory_system
 import quest_handler
 import combat_system
 import game_data
+from custom_exceptions import InvalidCharacterClassError
 
 # ============================================================================
 # CHARACTER INTEGRATION TESTS
@@ -54,6 +55,69 @@ def test_character_leveling_system():
     assert char['max_health'] > original_health
     assert char['health'] == char['max_health']  # Health restored on level up
 
+def test_class_templates_from_data_file(tmp_path):
+    """Test that classes come from the classes file and bulk creation uses them"""
+    classes_file = tmp_path / "classes.txt"
+    classes_file.write_text(
+        "NAME: Paladin\nHEALTH: 110\nSTRENGTH: 13\nMAGIC: 12\n\n"
+        "NAME: Mage\nHEALTH: 70\nSTRENGTH: 6\nMAGIC: 25\n"
+    )
+    try:
+        assert character_manager.load_class_templates(str(classes_file)) == ["Paladin", "Mage"]
+        paladin = character_manager.create_character("Pal", "Paladin")
+        assert (paladin["health"], paladin["max_health"], paladin["strength"], paladin["magic"]) == (110, 110, 13, 12)
+        with pytest.raises(InvalidCharacterClassError):
+            character_manager.create_character("War", "Warrior")
+
+        party = character_manager.create_characters([("A", "Mage"), ("B", "Paladin"), ("C", "Mage")])
+        assert [char["name"] for char in party] == ["A", "B", "C"]
+        assert party[0] == character_manager.create_character("A", "Mage")
+        party[0]["inventory"].append("health_potion")
+        assert party[2]["inventory"] == []
+        with pytest.raises(InvalidCharacterClassError):
+            character_manager.create_characters([("D", "Mage"), ("E", "Bard")])
+
+        # Without a classes file the built-in classes are used
+        character_manager.load_class_templates(str(tmp_path / "missing.txt"))
+        assert character_manager.list_character_classes() == ["Warrior", "Mage", "Rogue", "Cleric"]
+    finally:
+        character_manager.load_class_templates()
+
+def test_large_xp_grant_levels_up_many_times():
+    """Test that one XP grant applies every level up it pays for"""
+    char = character_manager.create_character("BigGrant", "Warrior")
+    char["health"] = 1
+
+    # 100 + 200 + ... + 900 = 4500 XP reaches level 10, 50 XP left over
+    character_manager.gain_experience(char, 4550)
+
+    assert char["level"] == 10
+    assert char["experience"] == 50
+    assert char["max_health"] == 120 + 9 * 10
+    assert char["strength"] == 15 + 9 * 2
+    assert char["magic"] == 5 + 9 * 2
+    assert char["health"] == char["max_health"]
+
+    character_manager.gain_experience(char, 10 ** 12)
+    assert char["level"] == 141421
+    assert 0 <= char["experience"] < char["level"] * 100
+
+def test_gain_experience_batch():
+    """Test batch XP with shared and per-character amounts"""
+    party = [character_manager.create_character(name, "Rogue") for name in ("A", "B", "C")]
+    party[2]["health"] = 0
+
+    errors = character_manager.gain_experience_batch(party, 300)
+    assert [char["level"] for char in party] == [3, 3, 1]
+    assert list(errors) == ["C"]
+    assert party[2]["experience"] == 0
+
+    character_manager.gain_experience_batch(party[:2], [0, 299])
+    assert [char["level"] for char in party[:2]] == [3, 3]
+    assert party[1]["experience"] == 299
+    with pytest.raises(ValueError):
+        character_manager.gain_experience_batch(party, [1, 2])
+
 def test_character_gold_management():
     """Test adding and spending gold"""
     char = character_manager.create_character("GoldTest", "Rogue")
@@ -69,6 +133,40 @@ def test_character_gold_management():
     with pytest.raises(ValueError):
         character_manager.add_gold(char, -1000)
 
+def test_character_object_behaves_like_dict():
+    """Test that Character supports the dictionary operations the game uses"""
+    char = character_manager.create_character("Slotted", "Mage")
+    assert isinstance(char, character_manager.Character)
+    assert not hasattr(char, "__dict__")
+
+    assert char == {
+        "name": "Slotted", "class": "Mage", "level": 1, "health": 80, "max_health": 80,
+        "strength": 8, "magic": 20, "experience": 0, "gold": 100,
+        "inventory": [], "active_quests": [], "completed_quests": [],
+    }
+    assert char.level == char["level"] == char.get("level") == 1
+    assert getattr(char, "class") == "Mage"
+    assert "equipped_weapon" not in char and char.get("equipped_weapon") is None
+    char.setdefault("inventory", []).append("health_potion")
+    char["equipped_weapon"] = "iron_sword"
+    assert "equipped_weapon" in char and char["equipped_weapon"] == "iron_sword"
+    assert char["inventory"] == ["health_potion"]
+    with pytest.raises(KeyError):
+        char["missing"]
+    assert character_manager.validate_character_data(char)
+
+def test_loaded_character_is_character_object(tmp_path):
+    """Test that saved characters load back as Character objects"""
+    save_dir = str(tmp_path)
+    char = character_manager.create_character("RoundTrip", "Rogue")
+    char["inventory"].append("health_potion")
+    character_manager.save_character(char, save_dir)
+
+    loaded = character_manager.load_character("RoundTrip", save_dir)
+    assert isinstance(loaded, character_manager.Character)
+    assert loaded == char
+    character_manager.close_save_stores()
+
 # ============================================================================
 # INVENTORY INTEGRATION TESTS
 # ============================================================================
@@ -0,0 +1,889 @@
+"""
+Test Save Storage
+Tests the character save backends and save/load helpers
+"""
+
+import pytest
+import sys
+import os
+import threading
+import time
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+from custom_exceptions import (
+    GameError,
+    CharacterNotFoundError,
+    InvalidSaveDataError
+)
+
+@pytest.fixture
+def save_dir(tmp_path):
+    """A fresh save directory whose stores are closed after the test"""
+    yield str(tmp_path / "saves")
+    character_manager.close_save_stores()
+
+# ============================================================================
+# SQLITE BACKEND TESTS
+# ============================================================================
+
+def test_text_backend_is_default(save_dir):
+    """Test that directories use one text file per character by default"""
+    char = character_manager.create_character("TextHero", "Warrior")
+    character_manager.save_character(char, save_dir)
+
+    assert isinstance(character_manager.get_save_store(save_dir), character_manager.TextSaveStore)
+    assert os.path.exists(os.path.join(save_dir, "TextHero_save.txt"))
+
+def test_sqlite_backend_round_trip(save_dir):
+    """Test saving, loading, listing and deleting with the sqlite backend"""
+    character_manager.set_save_backend("sqlite", save_dir)
+    char = character_manager.create_character("SqlHero", "Mage")
+    char["inventory"] = ["health_potion", "iron_sword"]
+    char["completed_quests"] = ["first_steps"]
+
+    assert character_manager.save_character(char, save_dir) == True
+    assert os.path.exists(os.path.join(save_dir, "characters.db"))
+    assert not os.path.exists(os.path.join(save_dir, "SqlHero_save.txt"))
+
+    loaded = character_manager.load_character("SqlHero", save_dir)
+    assert loaded == char
+    assert character_manager.validate_character_data(loaded)
+    assert character_manager.list_saved_characters(save_dir) == ["SqlHero"]
+
+    # Saving again replaces the row
+    char["gold"] = 5
+    character_manager.save_character(char, save_dir)
+    assert character_manager.load_character("SqlHero", save_dir)["gold"] == 5
+
+    assert character_manager.delete_character("SqlHero", save_dir) == True
+    assert character_manager.list_saved_characters(save_dir) == []
+
+def test_sqlite_backend_missing_character(save_dir):
+    """Test that the sqlite backend raises the same errors as the text one"""
+    character_manager.set_save_backend("sqlite", save_dir)
+
+    with pytest.raises(CharacterNotFoundError):
+        character_manager.load_character("Nobody", save_dir)
+    with pytest.raises(CharacterNotFoundError):
+        character_manager.delete_character("Nobody", save_dir)
+    with pytest.raises(InvalidSaveDataError):
+        character_manager.save_character({"name": "Broken"}, save_dir)
+
+def test_sqlite_backend_persists_after_reopen(save_dir):
+    """Test that characters are still there after the store is reopened"""
+    character_manager.set_save_backend("sqlite", save_dir)
+    character_manager.save_character(character_manager.create_character("Keeper", "Cleric"), save_dir)
+    character_manager.close_save_stores()
+
+    character_manager.set_save_backend("sqlite", save_dir)
+    assert character_manager.load_character("Keeper", save_dir)["class"] == "Cleric"
+
+def test_sqlite_backend_chosen_by_later_runs(save_dir):
+    """Test that a directory holding characters.db opens with the sqlite backend"""
+    character_manager.set_save_backend("sqlite", save_dir)
+    character_manager.save_character(character_manager.create_character("Keeper", "Cleric"), save_dir)
+    character_manager.close_save_stores()
+
+    assert isinstance(character_manager.get_save_store(save_dir), character_manager.SQLiteSaveStore)
+    assert character_manager.list_saved_characters(save_dir) == ["Keeper"]
+    assert character_manager.load_character("Keeper", save_dir)["class"] == "Cleric"
+
+def test_unknown_backend_rejected(save_dir):
+    """Test that set_save_backend only accepts known backends"""
+    with pytest.raises(ValueError):
+        character_manager.set_save_backend("floppy", save_dir)
+
+# ============================================================================
+# ATOMIC SAVE TESTS
+# ============================================================================
+
+def test_failed_save_keeps_previous_file(save_dir, monkeypatch):
+    """Test that a save interrupted before the rename leaves the old save"""
+    char = character_manager.create_character("Atomic", "Rogue")
+    character_manager.save_character(char, save_dir)
+
+    def crash(*args):
+        raise OSError("disk unplugged")
+
+    char["gold"] = 999
+    monkeypatch.setattr(character_manager.os, "replace", crash)
+    with pytest.raises(OSError):
+        character_manager.save_character(char, save_dir)
+    monkeypatch.undo()
+
+    assert character_manager.load_character("Atomic", save_dir)["gold"] == 100
+    assert [name for name in os.listdir(save_dir) if name.endswith(".tmp")] == []
+
+def test_fsync_durability(save_dir):
+    """Test that fsync mode saves normally"""
+    character_manager.set_save_backend("text", save_dir, durability="fsync")
+    char = character_manager.create_character("Durable", "Cleric")
+
+    character_manager.save_character(char, save_dir)
+    assert character_manager.load_character("Durable", save_dir) == char
+
+def test_group_commit_shares_syncs(save_dir, monkeypatch):
+    """Test that concurrent saves in group mode share one sync per batch"""
+    character_manager.set_save_backend("text", save_dir, durability="group", commit_window=0.2)
+    syncs = []
+    fsync_directory = character_manager._fsync_directory
+
+    def counting_fsync_directory(directory):
+        syncs.append(directory)
+        fsync_directory(directory)
+
+    def no_global_sync():
+        raise AssertionError("group commit must not sync the whole machine")
+
+    # The files are really fsynced; only the directory syncs are counted
+    monkeypatch.setattr(character_manager, "_fsync_directory", counting_fsync_directory)
+    monkeypatch.setattr(character_manager.os, "sync", no_global_sync, raising=False)
+
+    characters = [character_manager.create_character(f"Group{i}", "Warrior") for i in range(8)]
+    threads = [
+        threading.Thread(target=character_manager.save_character, args=(char, save_dir))
+        for char in characters
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert 1 <= len(syncs) < len(characters)
+    assert sorted(character_manager.list_saved_characters(save_dir)) == sorted(
+        char["name"] for char in characters
+    )
+    assert character_manager.load_character("Group3", save_dir)["class"] == "Warrior"
+    assert not [name for name in os.listdir(save_dir) if name.endswith(".tmp")]
+
+def test_group_commit_writers_sync_their_own_files(save_dir, monkeypatch):
+    """Test that group mode fsyncs each save file in its own thread, journals included"""
+    character_manager.set_save_backend("text", save_dir, durability="group", journal=True)
+    syncing_threads = set()
+    fsync = character_manager.os.fsync
+
+    def recording_fsync(descriptor):
+        syncing_threads.add(threading.get_ident())
+        fsync(descriptor)
+
+    characters = [character_manager.create_character(f"Writer{i}", "Rogue") for i in range(4)]
+    for char in characters:
+        character_manager.save_character(char, save_dir)
+        char["gold"] += 1
+
+    monkeypatch.setattr(character_manager.os, "fsync", recording_fsync)
+    threads = [
+        threading.Thread(target=character_manager.save_character, args=(char, save_dir))
+        for char in characters
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert {thread.ident for thread in threads} <= syncing_threads
+    assert character_manager.load_character("Writer2", save_dir)["gold"] == 101
+
+def test_unknown_durability_rejected(save_dir):
+    """Test that the text backend only accepts known durability modes"""
+    with pytest.raises(ValueError):
+        character_manager.set_save_backend("text", save_dir, durability="maybe")
+
+# ============================================================================
+# BULK SAVE/LOAD TESTS
+# ============================================================================
+
+def test_bulk_save_and_load(save_dir):
+    """Test that bulk save/load keep input order"""
+    characters = [character_manager.create_character(f"Bulk{i}", "Mage") for i in range(20)]
+    for i, char in enumerate(characters):
+        char["gold"] = i
+
+    results, errors = character_manager.save_characters(characters, save_dir)
+    assert results == [True] * 20
+    assert errors == {}
+
+    names = [char["name"] for char in reversed(characters)]
+    loaded, errors = character_manager.load_characters(names, save_dir)
+    assert errors == {}
+    assert [char["gold"] for char in loaded] == list(range(19, -1, -1))
+
+def test_bulk_errors_are_collected(save_dir):
+    """Test that failures are reported per name without stopping the batch"""
+    character_manager.save_character(character_manager.create_character("Good", "Rogue"), save_dir)
+    with open(os.path.join(save_dir, "Bad_save.txt"), "w") as file:
+        file.write("NAME Bad\n")
+
+    loaded, errors = character_manager.load_characters(["Good", "Missing", "Bad"], save_dir)
+    assert loaded[0]["name"] == "Good"
+    assert loaded[1:] == [None, None]
+    assert isinstance(errors["Missing"], CharacterNotFoundError)
+    assert isinstance(errors["Bad"], InvalidSaveDataError)
+
+    results, errors = character_manager.save_characters(
+        [{"name": "Incomplete"}, character_manager.create_character("Fine", "Cleric")], save_dir
+    )
+    assert results == [None, True]
+    assert isinstance(errors["Incomplete"], InvalidSaveDataError)
+
+# ============================================================================
+# SAVE JOURNAL TESTS
+# ============================================================================
+
+def test_journal_appends_only_changed_fields(save_dir):
+    """Test that journal saves write just the fields that changed"""
+    character_manager.set_save_backend("text", save_dir, journal=True)
+    char = character_manager.create_character("Journal", "Warrior")
+    character_manager.save_character(char, save_dir)
+    journal_path = os.path.join(save_dir, "Journal_save.journal")
+    assert not os.path.exists(journal_path)
+
+    char["gold"] = 250
+    character_manager.save_character(char, save_dir)
+    char["health"] = 30
+    char["inventory"].append("iron_sword")
+    character_manager.save_character(char, save_dir)
+    character_manager.save_character(char, save_dir)
+
+    with open(journal_path) as file:
+        entries = file.read().splitlines()
+    assert entries == ["GOLD: 250\t#", "HEALTH: 30\tINVENTORY: iron_sword\t#"]
+
+    # A fresh store replays the journal over the save file
+    character_manager.close_save_stores()
+    assert character_manager.load_character("Journal", save_dir) == char
+
+def test_journal_skips_torn_entry(save_dir):
+    """Test that an entry cut short by a crash is ignored"""
+    character_manager.set_save_backend("text", save_dir, journal=True)
+    char = character_manager.create_character("Torn", "Mage")
+    character_manager.save_character(char, save_dir)
+    with open(os.path.join(save_dir, "Torn_save.journal"), "w") as file:
+        file.write("GOLD: 5")
+
+    assert character_manager.load_character("Torn", save_dir)["gold"] == 100
+    char["level"] = 2
+    character_manager.save_character(char, save_dir)
+    loaded = character_manager.load_character("Torn", save_dir)
+    assert loaded["gold"] == 100 and loaded["level"] == 2
+
+def test_journal_compaction(save_dir):
+    """Test that a long journal is folded back into the save file"""
+    store = character_manager.set_save_backend("text", save_dir, journal=True, compact_threshold=100)
+    char = character_manager.create_character("Compact", "Rogue")
+    for gold in range(30):
+        char["gold"] = gold
+        character_manager.save_character(char, save_dir)
+    store.close()
+
+    journal_path = os.path.join(save_dir, "Compact_save.journal")
+    assert not os.path.exists(journal_path) or os.path.getsize(journal_path) <= 100
+    with open(os.path.join(save_dir, "Compact_save.txt")) as file:
+        assert "GOLD: " in file.read()
+    assert character_manager.load_character("Compact", save_dir)["gold"] == 29
+
+def test_plain_save_folds_existing_journal(save_dir):
+    """Test that saving without journaling does not lose to an old journal"""
+    character_manager.set_save_backend("text", save_dir, journal=True)
+    char = character_manager.create_character("Switch", "Cleric")
+    character_manager.save_character(char, save_dir)
+    char["gold"] = 1
+    character_manager.save_character(char, save_dir)
+
+    character_manager.set_save_backend("text", save_dir)
+    char["gold"] = 2
+    character_manager.save_character(char, save_dir)
+    assert not os.path.exists(os.path.join(save_dir, "Switch_save.journal"))
+    assert character_manager.load_character("Switch", save_dir)["gold"] == 2
+
+# ============================================================================
+# SAVE MANIFEST TESTS
+# ============================================================================
+
+def make_party(save_dir):
+    """Save a few characters of different classes and levels"""
+    for name, character_class, level in [("Ann", "Warrior", 3), ("Bob", "Mage", 7),
+                                         ("Cat", "Warrior", 9), ("Dan", "Rogue", 1)]:
+        char = character_manager.create_character(name, character_class)
+        char["level"] = level
+        char["gold"] = level * 10
+        character_manager.save_character(char, save_dir)
+
+@pytest.mark.parametrize("backend", ["text", "sqlite"])
+def test_manifest_filter_and_sort(save_dir, backend):
+    """Test listing characters by class and level range from the manifest"""
+    character_manager.set_save_backend(backend, save_dir)
+    make_party(save_dir)
+
+    warriors = character_manager.list_characters(save_dir, character_class="Warrior")
+    assert [entry["name"] for entry in warriors] == ["Ann", "Cat"]
+    assert warriors[1]["level"] == 9 and warriors[1]["gold"] == 90
+
+    by_level = character_manager.list_characters(save_dir, min_level=2, max_level=8,
+                                                 sort_by="level", descending=True)
+    assert [entry["name"] for entry in by_level] == ["Bob", "Ann"]
+
+    character_manager.delete_character("Bob", save_dir)
+    assert sorted(character_manager.list_saved_characters(save_dir)) == ["Ann", "Cat", "Dan"]
+
+    with pytest.raises(ValueError):
+        character_manager.list_characters(save_dir, sort_by="health")
+
+def test_manifest_does_not_open_save_files(save_dir, monkeypatch):
+    """Test that listing reads only the manifest"""
+    make_party(save_dir)
+    character_manager.close_save_stores()
+
+    def fail(*args):
+        raise AssertionError("save file opened")
+
+    monkeypatch.setattr(character_manager.TextSaveStore, "_load_unlocked", fail)
+    assert len(character_manager.list_characters(save_dir, min_level=3)) == 3
+
+def test_manifest_rebuild(save_dir):
+    """Test that the manifest is built for old directories and can be rebuilt"""
+    make_party(save_dir)
+    manifest_path = os.path.join(save_dir, character_manager.MANIFEST_NAME)
+    os.remove(manifest_path)
+    character_manager.close_save_stores()
+
+    # A directory without a manifest gets one built on first use; it is
+    # only written to disk by the next save
+    assert len(character_manager.list_characters(save_dir)) == 4
+    assert not os.path.exists(manifest_path)
+    character_manager.save_character(character_manager.create_character("Fay", "Cleric"), save_dir)
+    with open(manifest_path) as file:
+        assert len(file.readlines()) == 5
+    character_manager.close_save_stores()
+    assert len(character_manager.list_characters(save_dir)) == 5
+    character_manager.delete_character("Fay", save_dir)
+
+    # A save copied in by hand shows up after a rebuild
+    with open(os.path.join(save_dir, "Ann_save.txt")) as file:
+        content = file.read()
+    with open(os.path.join(save_dir, "Eve_save.txt"), "w") as file:
+        file.write(content.replace("NAME: Ann", "NAME: Eve"))
+    assert character_manager.rebuild_manifest(save_dir) == 5
+    assert character_manager.list_characters(save_dir, sort_by="gold")[0]["gold"] == 10
+
+def test_manifest_follows_other_processes(save_dir, monkeypatch):
+    """Test that two stores on one directory (like two processes) keep each other's entries"""
+    first = character_manager.TextSaveStore(save_dir)
+    second = character_manager.TextSaveStore(save_dir)
+    first.save(character_manager.create_character("Ann", "Warrior"))
+    second.save(character_manager.create_character("Bob", "Mage"))
+    first.save(character_manager.create_character("Cat", "Rogue"))
+    assert first.list_names() == second.list_names() == ["Ann", "Bob", "Cat"]
+
+    # A rewrite of the file from memory keeps the other store's entries
+    monkeypatch.setattr(character_manager, "MANIFEST_SLACK_LINES", 0)
+    second.save(character_manager.create_character("Dan", "Cleric"))
+    first.delete("Ann")
+    second.save(character_manager.create_character("Bob", "Mage"))
+    assert first.list_names() == second.list_names() == ["Bob", "Cat", "Dan"]
+
+def test_delete_removes_stale_manifest_entry(save_dir):
+    """Test that a listed character whose save file is gone can still be deleted"""
+    character_manager.save_character(character_manager.create_character("Ghost", "Mage"), save_dir)
+    os.remove(os.path.join(save_dir, "Ghost_save.txt"))
+    assert character_manager.list_saved_characters(save_dir) == ["Ghost"]
+
+    assert character_manager.delete_character("Ghost", save_dir) == True
+    assert character_manager.list_saved_characters(save_dir) == []
+    with pytest.raises(CharacterNotFoundError):
+        character_manager.delete_character("Ghost", save_dir)
+
+def test_manifest_synced_outside_its_lock(save_dir, monkeypatch):
+    """Test that saves do not hold the manifest lock while it is fsynced"""
+    store = character_manager.set_save_backend("text", save_dir, durability="fsync")
+    synced = []
+    fsync_file = character_manager._fsync_file
+
+    def checking_fsync_file(path):
+        assert not store._manifest_lock.locked()
+        synced.append(os.path.basename(path))
+        fsync_file(path)
+
+    monkeypatch.setattr(character_manager, "_fsync_file", checking_fsync_file)
+    for name in ("Ann", "Bob", "Cat"):
+        character_manager.save_character(character_manager.create_character(name, "Rogue"), save_dir)
+    assert synced.count(character_manager.MANIFEST_NAME) == 2  # the first save writes it whole
+
+def test_listing_missing_directory_has_no_side_effects(save_dir):
+    """Test that listing a directory that does not exist leaves it missing"""
+    assert character_manager.list_saved_characters(save_dir) == []
+    assert character_manager.list_characters(save_dir) == []
+    assert not os.path.exists(save_dir)
+
+    character_manager.save_character(character_manager.create_character("Gil", "Mage"), save_dir)
+    assert character_manager.list_saved_characters(save_dir) == ["Gil"]
+    character_manager.delete_character("Gil", save_dir)
+    assert os.listdir(save_dir) == []
+
+# ============================================================================
+# SHARDED LAYOUT TESTS
+# ============================================================================
+
+def test_sharded_layout_round_trip(save_dir):
+    """Test that sharded saves live in hash subdirectories"""
+    store = character_manager.set_save_backend("text", save_dir, layout="sharded")
+    char = character_manager.create_character("Shard", "Mage")
+    character_manager.save_character(char, save_dir)
+
+    path = store.path_for("Shard")
+    assert os.path.exists(path)
+    assert os.path.dirname(os.path.dirname(os.path.dirname(path))) == save_dir
+    assert not os.path.exists(os.path.join(save_dir, "Shard_save.txt"))
+    assert character_manager.load_character("Shard", save_dir) == char
+    assert character_manager.rebuild_manifest(save_dir) == 1
+
+    character_manager.delete_character("Shard", save_dir)
+    assert not os.path.exists(path)
+
+def test_sharded_layout_kept_by_later_runs(save_dir):
+    """Test that a migrated directory stays sharded after the store is reopened"""
+    make_party(save_dir)
+    store = character_manager.get_save_store(save_dir)
+    assert character_manager.migrate_save_layout("sharded", save_dir) == 4
+    path = store.path_for("Ann")
+    character_manager.close_save_stores()
+
+    ann = character_manager.load_character("Ann", save_dir)
+    ann["gold"] = 1
+    character_manager.save_character(ann, save_dir)
+    assert character_manager.get_save_store(save_dir).layout == "sharded"
+    assert os.path.exists(path)
+    assert not os.path.exists(os.path.join(save_dir, "Ann_save.txt"))
+
+    # Moving back to flat forgets the layout again
+    character_manager.migrate_save_layout("flat", save_dir)
+    character_manager.close_save_stores()
+    assert character_manager.get_save_store(save_dir).layout == "flat"
+    assert not os.path.exists(os.path.join(save_dir, character_manager.SAVE_LAYOUT_NAME))
+
+def test_sharded_reads_fall_back_to_flat(save_dir):
+    """Test that flat saves can still be read and move on their next save"""
+    make_party(save_dir)
+    store = character_manager.set_save_backend("text", save_dir, layout="sharded")
+
+    ann = character_manager.load_character("Ann", save_dir)
+    assert ann["level"] == 3
+    assert os.path.exists(os.path.join(save_dir, "Ann_save.txt"))
+
+    character_manager.save_character(ann, save_dir)
+    assert not os.path.exists(os.path.join(save_dir, "Ann_save.txt"))
+    assert os.path.exists(store.path_for("Ann"))
+
+def test_migrate_layout_both_ways(save_dir):
+    """Test moving a flat directory to shards and back"""
+    character_manager.set_save_backend("text", save_dir, journal=True)
+    make_party(save_dir)
+    cat = character_manager.load_character("Cat", save_dir)
+    cat["gold"] = 1
+    character_manager.save_character(cat, save_dir)
+
+    assert character_manager.migrate_save_layout("sharded", save_dir) == 4
+    assert [name for name in os.listdir(save_dir) if name.endswith("_save.txt")] == []
+    assert character_manager.load_character("Cat", save_dir)["gold"] == 1
+
+    assert character_manager.migrate_save_layout("flat", save_dir) == 4
+    assert sorted(os.listdir(save_dir)) == [
+        "Ann_save.txt", "Bob_save.txt", "Cat_save.journal", "Cat_save.txt",
+        "Dan_save.txt", character_manager.MANIFEST_NAME,
+    ]
+    assert character_manager.load_character("Cat", save_dir)["gold"] == 1
+
+    with pytest.raises(ValueError):
+        character_manager.migrate_save_layout("tree", save_dir)
+
+# ============================================================================
+# BINARY FORMAT TESTS
+# ============================================================================
+
+def test_binary_format_round_trip(save_dir):
+    """Test that binary saves load back exactly, floats and unicode included"""
+    store = character_manager.set_save_backend("text", save_dir, save_format="binary")
+    char = character_manager.create_character("Zoë", "Cleric")
+    char["health"] = 50.5
+    char["inventory"] = ["health_potion", "iron_sword", "health_potion"]
+    char["active_quests"] = ["first_steps"]
+    character_manager.save_character(char, save_dir)
+
+    with open(store.path_for("Zoë"), "rb") as file:
+        data = file.read()
+    assert data.startswith(character_manager.BINARY_SAVE_MAGIC)
+
+    loaded = character_manager.load_character("Zoë", save_dir)
+    assert loaded == char
+    assert isinstance(loaded["level"], int) and isinstance(loaded["health"], float)
+
+def test_mixed_formats_are_detected(save_dir):
+    """Test that a directory can hold text and binary saves at once"""
+    make_party(save_dir)
+    character_manager.set_save_backend("text", save_dir, save_format="binary")
+    bob = character_manager.load_character("Bob", save_dir)
+    bob["gold"] = 3
+    character_manager.save_character(bob, save_dir)
+
+    loaded, errors = character_manager.load_characters(["Ann", "Bob"], save_dir)
+    assert errors == {}
+    assert loaded[0]["level"] == 3 and loaded[1]["gold"] == 3
+
+def test_corrupted_binary_save_rejected(save_dir):
+    """Test that truncated or unknown-version binary saves raise InvalidSaveDataError"""
+    store = character_manager.set_save_backend("text", save_dir, save_format="binary")
+    character_manager.save_character(character_manager.create_character("Cut", "Rogue"), save_dir)
+    with open(store.path_for("Cut"), "rb") as file:
+        data = file.read()
+
+    with open(store.path_for("Cut"), "wb") as file:
+        file.write(data[:-3])
+    with pytest.raises(InvalidSaveDataError):
+        character_manager.load_character("Cut", save_dir)
+
+    with open(store.path_for("Cut"), "wb") as file:
+        file.write(data[:6] + bytes([99]) + data[7:])
+    with pytest.raises(InvalidSaveDataError):
+        character_manager.load_character("Cut", save_dir)
+
+# ============================================================================
+# COLD TIER TESTS
+# ============================================================================
+
+def age_saves(save_dir, days):
+    """Make every save file in save_dir look days old"""
+    old = os.path.getmtime(save_dir) - days * 24 * 60 * 60
+    for filename in os.listdir(save_dir):
+        if filename.endswith("_save.txt"):
+            os.utime(os.path.join(save_dir, filename), (old, old))
+
+def directory_size(save_dir):
+    """Total bytes of the save and pack files"""
+    return sum(
+        os.path.getsize(os.path.join(save_dir, name)) for name in os.listdir(save_dir)
+        if name.endswith(("_save.txt", ".pack"))
+    )
+
+@pytest.mark.parametrize("codec", ["zlib", "lzma"])
+def test_cold_archive_and_promote(save_dir, codec):
+    """Test that old saves are packed, still listed, and promoted on load"""
+    characters = [character_manager.create_character(f"Old{i}", "Warrior") for i in range(100)]
+    for char in characters:
+        char["inventory"] = ["health_potion", "iron_sword", "leather_armor"]
+    character_manager.save_characters(characters, save_dir)
+    character_manager.save_character(character_manager.create_character("Fresh", "Mage"), save_dir)
+    age_saves(save_dir, 200)
+    os.utime(os.path.join(save_dir, "Fresh_save.txt"))
+    size_before = directory_size(save_dir)
+
+    assert character_manager.archive_cold_saves(90, codec, save_dir) == 100
+    assert not os.path.exists(os.path.join(save_dir, "Old7_save.txt"))
+    assert os.path.exists(os.path.join(save_dir, "Fresh_save.txt"))
+    assert directory_size(save_dir) < size_before / 2
+    assert len(character_manager.list_saved_characters(save_dir)) == 101
+
+    # A fresh store reads the cold index from disk
+    character_manager.close_save_stores()
+    assert character_manager.load_character("Old7", save_dir) == characters[7]
+    assert os.path.exists(os.path.join(save_dir, "Old7_save.txt"))
+    assert character_manager.load_character("Old7", save_dir) == characters[7]
+
+def test_cold_saves_can_be_saved_and_deleted(save_dir):
+    """Test that saving or deleting an archived character drops its cold copy"""
+    make_party(save_dir)
+    age_saves(save_dir, 200)
+    assert character_manager.archive_cold_saves(90, save_directory=save_dir) == 4
+
+    ann = character_manager.create_character("Ann", "Warrior")
+    ann["level"] = 20
+    character_manager.save_character(ann, save_dir)
+    character_manager.delete_character("Bob", save_dir)
+    with pytest.raises(CharacterNotFoundError):
+        character_manager.load_character("Bob", save_dir)
+
+    character_manager.close_save_stores()
+    assert character_manager.load_character("Ann", save_dir)["level"] == 20
+    assert character_manager.rebuild_manifest(save_dir) == 3
+
+    # Once nothing in a pack is cold any more, the pack is deleted
+    character_manager.load_character("Cat", save_dir)
+    character_manager.load_character("Dan", save_dir)
+    assert [name for name in os.listdir(save_dir) if name.endswith(".pack")] == []
+
+def test_cold_moves_sync_before_deleting(save_dir, monkeypatch):
+    """Test that archiving and promoting sync the new copy first, even with durability none"""
+    make_party(save_dir)
+    age_saves(save_dir, 200)
+    events = []
+    fsync, remove = os.fsync, os.remove
+
+    def recording_fsync(descriptor):
+        events.append("fsync")
+        fsync(descriptor)
+
+    def recording_remove(path):
+        events.append(os.path.basename(path))
+        remove(path)
+
+    monkeypatch.setattr(character_manager.os, "fsync", recording_fsync)
+    monkeypatch.setattr(character_manager.os, "remove", recording_remove)
+
+    assert character_manager.archive_cold_saves(90, save_directory=save_dir) == 4
+    first_removal = events.index("Ann_save.txt")
+    assert events[:first_removal].count("fsync") >= 3  # pack, index, directory
+
+    pack_name = next(name for name in os.listdir(save_dir) if name.endswith(".pack"))
+    events.clear()
+    for name in ("Ann", "Bob", "Cat", "Dan"):
+        character_manager.load_character(name, save_dir)
+    # Each promotion syncs the hot file (and its directory) and the index
+    assert events[:events.index(pack_name)].count("fsync") >= 12
+
+def test_recent_saves_stay_hot(save_dir):
+    """Test that nothing is archived when every save is recent"""
+    make_party(save_dir)
+    assert character_manager.archive_cold_saves(90, save_directory=save_dir) == 0
+    assert [name for name in os.listdir(save_dir) if name.endswith(".pack")] == []
+
+    with pytest.raises(ValueError):
+        character_manager.archive_cold_saves(90, "zip", save_dir)
+
+# ============================================================================
+# SAVE CACHE TESTS
+# ============================================================================
+
+def test_cache_hits_and_write_back(save_dir):
+    """Test that loads come from memory and saves wait for a flush"""
+    make_party(save_dir)
+    cache = character_manager.enable_save_cache(save_dir, flush_interval=0)
+
+    ann = character_manager.load_character("Ann", save_dir)
+    assert character_manager.load_character("Ann", save_dir) == ann
+    assert character_manager.get_save_cache_stats(save_dir)["hits"] == 1
+    assert character_manager.get_save_cache_stats(save_dir)["misses"] == 1
+
+    # Changing a loaded copy does not touch the cache
+    ann["gold"] = 12345
+    assert character_manager.load_character("Ann", save_dir)["gold"] == 30
+
+    character_manager.save_character(ann, save_dir)
+    with open(os.path.join(save_dir, "Ann_save.txt")) as file:
+        assert "GOLD: 30\n" in file.read()
+    assert character_manager.load_character("Ann", save_dir)["gold"] == 12345
+
+    cache.flush()
+    with open(os.path.join(save_dir, "Ann_save.txt")) as file:
+        assert "GOLD: 12345\n" in file.read()
+    assert cache.stats()["writes"] == 1 and cache.stats()["dirty"] == 0
+
+def test_cache_keeps_only_saved_fields(save_dir):
+    """Test that a cached load matches what the disk would load"""
+    cache = character_manager.enable_save_cache(save_dir, flush_interval=0)
+    char = character_manager.create_character("Extra", "Warrior")
+    char["equipped_weapon"] = "iron_sword"
+    character_manager.save_character(char, save_dir)
+
+    cached = character_manager.load_character("Extra", save_dir)
+    assert "equipped_weapon" not in cached
+    cache.flush()
+    assert cached == character_manager.Character.from_dict(cache.store.load("Extra"))
+
+def test_cache_notices_changed_files(save_dir):
+    """Test that a save file changed behind the cache is read again"""
+    make_party(save_dir)
+    character_manager.enable_save_cache(save_dir, flush_interval=0)
+    assert character_manager.load_character("Bob", save_dir)["gold"] == 70
+
+    path = os.path.join(save_dir, "Bob_save.txt")
+    with open(path) as file:
+        content = file.read()
+    with open(path, "w") as file:
+        file.write(content.replace("GOLD: 70", "GOLD: 71"))
+    os.utime(path, ns=(0, 0))
+
+    assert character_manager.load_character("Bob", save_dir)["gold"] == 71
+    assert character_manager.get_save_cache_stats(save_dir)["misses"] == 2
+
+def test_cache_evicts_and_flushes_on_close(save_dir):
+    """Test that evicted and remaining dirty characters reach the disk"""
+    cache = character_manager.enable_save_cache(save_dir, capacity=2, flush_interval=0)
+    for i in range(5):
+        character_manager.save_character(character_manager.create_character(f"Lru{i}", "Rogue"), save_dir)
+
+    assert cache.stats()["evictions"] == 3
+    assert cache.stats()["writes"] == 3
+    assert sorted(os.listdir(save_dir))[:3] == ["Lru0_save.txt", "Lru1_save.txt", "Lru2_save.txt"]
+
+    character_manager.close_save_stores()
+    assert len(character_manager.list_saved_characters(save_dir)) == 5
+
+def test_cache_periodic_flush_and_delete(save_dir):
+    """Test interval write-back and deleting a character that was never written"""
+    character_manager.enable_save_cache(save_dir, flush_interval=0.05)
+    character_manager.save_character(character_manager.create_character("Tick", "Mage"), save_dir)
+    character_manager.save_character(character_manager.create_character("Gone", "Mage"), save_dir)
+    character_manager.delete_character("Gone", save_dir)
+
+    for _ in range(100):
+        if os.path.exists(os.path.join(save_dir, "Tick_save.txt")):
+            break
+        time.sleep(0.02)
+    assert os.path.exists(os.path.join(save_dir, "Tick_save.txt"))
+    assert character_manager.list_saved_characters(save_dir) == ["Tick"]
+    with pytest.raises(CharacterNotFoundError):
+        character_manager.load_character("Gone", save_dir)
+
+def test_cache_miss_does_not_overwrite_newer_save(save_dir, monkeypatch):
+    """Test that a load racing a save cannot replace the saved copy"""
+    make_party(save_dir)
+    cache = character_manager.enable_save_cache(save_dir, flush_interval=0)
+    read_done = threading.Event()
+    saved = threading.Event()
+    store_load = cache.store.load
+
+    def slow_load(character_name):
+        character = store_load(character_name)
+        read_done.set()
+        saved.wait(5)
+        return character
+
+    monkeypatch.setattr(cache.store, "load", slow_load)
+    loader = threading.Thread(target=character_manager.load_character, args=("Ann", save_dir))
+    loader.start()
+    assert read_done.wait(5)
+    ann = character_manager.create_character("Ann", "Warrior")
+    ann["gold"] = 999
+    character_manager.save_character(ann, save_dir)
+    saved.set()
+    loader.join()
+
+    assert cache.stats()["dirty"] == 1
+    character_manager.close_save_stores()
+    with open(os.path.join(save_dir, "Ann_save.txt")) as file:
+        assert "GOLD: 999\n" in file.read()
+
+# ============================================================================
+# ASYNC SAVE TESTS
+# ============================================================================
+
+def test_async_save_returns_before_write(save_dir, monkeypatch):
+    """Test that async saves queue a copy and coalesce repeated saves"""
+    gate = threading.Event()
+    store_save = character_manager.TextSaveStore.save
+
+    def slow_save(store, character):
+        gate.wait(5)
+        return store_save(store, character)
+
+    monkeypatch.setattr(character_manager.TextSaveStore, "save", slow_save)
+    writer = character_manager._async_writer
+    submitted, written = writer.submitted, writer.written
+    hero = character_manager.create_character("Async", "Warrior")
+    for gold in range(1, 51):
+        hero["gold"] = gold
+        assert character_manager.save_character_async(hero, save_dir) is True
+    hero["gold"] = 999
+
+    assert not os.path.exists(os.path.join(save_dir, "Async_save.txt"))
+    gate.set()
+    assert character_manager.flush_saves(timeout=5) == {}
+    assert character_manager.load_character("Async", save_dir)["gold"] == 50
+    assert writer.submitted - submitted == 50
+    assert writer.written - written <= 2
+
+def test_async_save_errors_reported_by_flush(save_dir):
+    """Test that bad saves fail early and failed writes surface on flush"""
+    with pytest.raises(InvalidSaveDataError):
+        character_manager.save_character_async({"name": "Broken"}, save_dir)
+
+    blocked = os.path.join(save_dir, "blocked")
+    os.makedirs(save_dir)
+    with open(blocked, "w") as file:
+        file.write("not a directory")
+    character_manager.save_character_async(character_manager.create_character("Ok", "Mage"), save_dir)
+    character_manager.save_character_async(character_manager.create_character("Lost", "Mage"), blocked)
+
+    errors = character_manager.flush_saves(timeout=5)
+    assert list(errors) == ["Lost"]
+    assert character_manager.list_saved_characters(save_dir) == ["Ok"]
+    assert character_manager.flush_saves() == {}
+
+def test_load_waits_for_queued_save(save_dir, monkeypatch):
+    """Test that loading a character sees its queued async save"""
+    hero = character_manager.create_character("Queued", "Warrior")
+    hero["gold"] = 100
+    character_manager.save_character(hero, save_dir)
+
+    gate = threading.Event()
+    store_save = character_manager.TextSaveStore.save
+
+    def slow_save(store, character):
+        gate.wait(5)
+        return store_save(store, character)
+
+    monkeypatch.setattr(character_manager.TextSaveStore, "save", slow_save)
+    hero["gold"] = 999
+    character_manager.save_character_async(hero, save_dir)
+    loaded = []
+    loader = threading.Thread(
+        target=lambda: loaded.append(character_manager.load_character("Queued", save_dir)))
+    loader.start()
+    loader.join(0.1)
+    assert loader.is_alive()
+    gate.set()
+    loader.join(5)
+    assert loaded[0]["gold"] == 999
+
+def test_delete_drops_queued_save(save_dir):
+    """Test that a deleted character stays deleted after flush_saves"""
+    make_party(save_dir)
+    ann = character_manager.load_character("Ann", save_dir)
+    ann["gold"] = 999
+    character_manager.save_character_async(ann, save_dir)
+    assert character_manager.delete_character("Ann", save_dir) is True
+
+    # A character that only ever existed in the queue can be deleted too
+    character_manager.save_character_async(character_manager.create_character("Fresh", "Mage"), save_dir)
+    assert character_manager.delete_character("Fresh", save_dir) is True
+
+    assert character_manager.flush_saves(timeout=5) == {}
+    assert "Ann" not in character_manager.list_saved_characters(save_dir)
+    assert "Fresh" not in character_manager.list_saved_characters(save_dir)
+    with pytest.raises(CharacterNotFoundError):
+        character_manager.load_character("Ann", save_dir)
+
+def test_close_writes_queued_saves(save_dir):
+    """Test that closing the stores writes saves still in the queue"""
+    for i in range(20):
+        character_manager.save_character_async(character_manager.create_character(f"Q{i}", "Rogue"), save_dir)
+    character_manager.close_save_stores()
+    assert len(character_manager.list_saved_characters(save_dir)) == 20
+
+def test_queued_saves_written_at_interpreter_exit(tmp_path):
+    """Test that saves still queued when the program exits reach the disk"""
+    save_dir = str(tmp_path / "saves")
+    script = (
+        "import sys\n"
+        f"sys.path.insert(0, {os.path.dirname(os.path.dirname(os.path.abspath(__file__)))!r})\n"
+        "import character_manager\n"
+        "for name in ('A', 'B', 'C'):\n"
+        f"    character_manager.save_character_async(character_manager.create_character(name, 'Mage'), {save_dir!r})\n"
+    )
+    subprocess.run([sys.executable, "-c", script], check=True)
+    assert character_manager.list_saved_characters(save_dir) == ["A", "B", "C"]
+
+def test_close_reports_failed_queued_saves(save_dir):
+    """Test that close_save_stores raises for queued saves it could not write"""
+    os.makedirs(save_dir)
+    blocked = os.path.join(save_dir, "blocked")
+    with open(blocked, "w") as file:
+        file.write("not a directory")
+    character_manager.save_character_async(character_manager.create_character("Lost", "Mage"), blocked)
+    with pytest.raises(GameError, match="Lost"):
+        character_manager.close_save_stores()
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])